@@ -0,0 +1,92 @@
+import threading
+
+import numpy as np
+import pyorbbecsdk as ob
+
+FILTER_FRAMES = 120
+
+
+def test_point_cloud(benchmark, depth_frame, camera_param):
+    point_cloud_filter = ob.PointCloudFilter()
+    point_cloud_filter.set_camera_param(camera_param)
+    point_cloud_filter.set_create_point_format(ob.OBFormat.POINT)
+
+    def run():
+        points_frame = point_cloud_filter.process(depth_frame)
+        return point_cloud_filter.calculate(points_frame)
+
+    points = benchmark(run)
+    assert len(points) > 0
+
+
+def test_depth_filter_chain(benchmark, depth_frame):
+    threshold_filter = ob.ThresholdFilter()
+    threshold_filter.set_value_range(300, 4000)
+    chain = [threshold_filter, ob.SpatialAdvancedFilter(), ob.TemporalFilter(), ob.HoleFillingFilter()]
+
+    def run():
+        frame = depth_frame
+        for post_filter in chain:
+            frame = post_filter.process(frame)
+        return frame
+
+    assert benchmark(run) is not None
+
+
+def test_transformation2dto3d(benchmark, camera_param):
+    rng = np.random.default_rng(0)
+    pixels = [ob.OBPoint2f(float(x), float(y)) for x, y in rng.uniform(0, 480, (1000, 2))]
+    intrinsic = camera_param.depth_intrinsic
+    extrinsic = camera_param.transform
+
+    def run():
+        return [ob.transformation2dto3d(p, 1000.0, intrinsic, extrinsic) for p in pixels]
+
+    benchmark(run)
+
+
+def test_transformation3dto2d(benchmark, camera_param):
+    rng = np.random.default_rng(0)
+    points = [ob.OBPoint3f(float(x), float(y), float(z)) for x, y, z in rng.uniform(100, 1000, (1000, 3))]
+    intrinsic = camera_param.rgb_intrinsic
+    distortion = camera_param.rgb_distortion
+    extrinsic = camera_param.transform
+
+    def run():
+        return [ob.transformation3dto2d(p, intrinsic, distortion, extrinsic) for p in points]
+
+    benchmark(run)
+
+
+def test_callback_delivery(benchmark, depth_frame):
+    """Frames per second handed from an SDK worker thread to a Python callback.
+
+    A pipeline callback needs a device, so the asynchronous filter path is used
+    instead: ``push_frame`` queues the frame inside the SDK and the result comes
+    back on an SDK thread that has to take the GIL, the same handoff a
+    ``Pipeline.start(config, callback)`` delivery goes through.
+    """
+    threshold_filter = ob.ThresholdFilter()
+    delivered = threading.Event()
+    received = [0]
+
+    def on_frame(frame):
+        received[0] += 1
+        delivered.set()
+
+    threshold_filter.set_callback(on_frame)
+
+    def run():
+        # The filter keeps a short input queue and drops what does not fit, so each
+        # push waits for its callback: the round measures delivery, not drops.
+        received[0] = 0
+        for _ in range(FILTER_FRAMES):
+            delivered.clear()
+            threshold_filter.push_frame(depth_frame)
+            if not delivered.wait(1):
+                break
+        assert received[0] == FILTER_FRAMES, f"only {received[0]} of {FILTER_FRAMES} frames delivered"
+
+    benchmark(run)
+    benchmark.extra_info["delivered_per_round"] = received[0]
+    benchmark.extra_info["frames_per_round"] = FILTER_FRAMES
@@ -0,0 +1,79 @@
+import numpy as np
+
+from conftest import make_color_frame
+from utils import FrameConverter, frame_to_bgr_image
+
+
+def test_get_data(benchmark, color_frame):
+    benchmark(color_frame.get_data)
+
+
+def test_asanyarray(benchmark, color_frame):
+    benchmark(lambda: np.asanyarray(color_frame.get_data()))
+
+
+def test_frombuffer_depth(benchmark, depth_frame):
+    width, height = depth_frame.get_width(), depth_frame.get_height()
+    benchmark(lambda: np.frombuffer(depth_frame.get_data(), dtype=np.uint16).reshape((height, width)))
+
+
+def test_frame_to_bgr_image(benchmark, color_frame):
+    image = benchmark(frame_to_bgr_image, color_frame)
+    assert image.shape == (color_frame.get_height(), color_frame.get_width(), 3)
+
+
+def test_frame_converter(benchmark, color_frame):
+    converter = FrameConverter.for_frame(color_frame)
+    image = benchmark(converter.convert, color_frame)
+    assert image.shape == (color_frame.get_height(), color_frame.get_width(), 3)
+
+
+def test_frame_converter_rgb(benchmark, color_frame):
+    benchmark(FrameConverter.for_frame(color_frame, output="rgb").convert, color_frame)
+
+
+def test_frame_converter_sdk(benchmark, color_frame):
+    benchmark(FrameConverter.for_frame(color_frame, use_sdk=True).convert, color_frame)
+
+
+def test_create_video_frame(benchmark):
+    # Cost of building the synthetic input itself, to subtract from the numbers above
+    benchmark(make_color_frame, "RGB", 640, 480)
+
+
+def test_metadata_per_type(benchmark, depth_frame):
+    from pyorbbecsdk import OBFrameMetadataType
+
+    types = list(OBFrameMetadataType.__members__.values())
+    benchmark(lambda: {t: depth_frame.get_metadata_value(t) for t in types if depth_frame.has_metadata(t)})
+
+
+def test_get_all_metadata(benchmark, depth_frame):
+    benchmark(depth_frame.get_all_metadata)
+
+
+def test_fill_metadata_batch(benchmark, depth_frame):
+    from pyorbbecsdk import fill_metadata, get_metadata_dtype
+
+    frames = [depth_frame] * 64
+    log = np.zeros(len(frames), dtype=get_metadata_dtype())
+    benchmark(fill_metadata, frames, log)
+    benchmark.extra_info["frames_per_round"] = len(frames)
+
+
+def test_mjpeg_decoder_pool(benchmark):
+    from mjpeg_decoder import MJPEGDecoder
+    from synthetic import encode, make_bgr_image
+
+    data = encode(make_bgr_image(1920, 1080), "MJPG")
+    frames = 30
+
+    with MJPEGDecoder(num_workers=3, max_pending=frames, target_width=640) as decoder:
+        def run():
+            for i in range(frames):
+                decoder.submit(data, 1920, i)
+            for _ in range(frames):
+                decoder.get()
+
+        benchmark(run)
+    benchmark.extra_info["frames_per_round"] = frames
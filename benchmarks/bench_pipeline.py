@@ -0,0 +1,38 @@
+import os
+import threading
+import time
+
+import pytest
+import pyorbbecsdk as ob
+
+# Needs a connected camera, opt in with OB_BENCH_DEVICE=1
+pytestmark = pytest.mark.skipif(os.environ.get("OB_BENCH_DEVICE") != "1", reason="OB_BENCH_DEVICE=1 not set")
+
+MEASURE_SECONDS = 5.0
+
+
+def test_pipeline_callback_rate(benchmark):
+    pipeline = ob.Pipeline()
+    config = ob.Config()
+    config.enable_stream(ob.OBStreamType.COLOR_STREAM)
+    config.enable_stream(ob.OBStreamType.DEPTH_STREAM)
+    lock = threading.Lock()
+    arrivals = []
+
+    def on_frames(frames):
+        with lock:
+            arrivals.append(time.perf_counter())
+
+    pipeline.start(config, on_frames)
+    try:
+        time.sleep(1.0)  # skip the start-up burst
+        with lock:
+            arrivals.clear()
+        benchmark.pedantic(time.sleep, args=(MEASURE_SECONDS,), rounds=1, iterations=1)
+    finally:
+        pipeline.stop()
+    with lock:
+        count = len(arrivals)
+    benchmark.extra_info["framesets"] = count
+    benchmark.extra_info["fps"] = round(count / MEASURE_SECONDS, 2)
+    assert count > 0
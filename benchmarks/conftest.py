@@ -0,0 +1,71 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples"))
+
+try:
+    import pyorbbecsdk as ob
+except ImportError:
+    # Without the compiled binding there is nothing to measure
+    ob = None
+    collect_ignore_glob = ["bench_*.py"]
+
+from synthetic import RESOLUTIONS, encode, make_bgr_image, make_depth_image
+
+COLOR_FORMATS = ["RGB", "BGR", "YUYV", "UYVY", "I420", "NV12", "NV21", "MJPG"]
+DEPTH_SIZE = (640, 480)
+
+
+def make_intrinsic(width, height):
+    intrinsic = ob.OBCameraIntrinsic()
+    intrinsic.fx = intrinsic.fy = width * 0.8
+    intrinsic.cx = width / 2
+    intrinsic.cy = height / 2
+    intrinsic.width = width
+    intrinsic.height = height
+    return intrinsic
+
+
+def make_color_frame(fmt, width, height, timestamp_us=0):
+    data = encode(make_bgr_image(width, height), fmt)
+    return ob.create_video_frame(ob.OBFrameType.COLOR_FRAME, getattr(ob.OBFormat, fmt),
+                                 width, height, data, timestamp_us=timestamp_us)
+
+
+@pytest.fixture(scope="session")
+def depth_profile():
+    width, height = DEPTH_SIZE
+    return ob.create_video_stream_profile(ob.OBStreamType.DEPTH_STREAM, ob.OBFormat.Y16, width, height, 30,
+                                          make_intrinsic(width, height), ob.OBCameraDistortion())
+
+
+@pytest.fixture(scope="session")
+def depth_frame(depth_profile):
+    width, height = DEPTH_SIZE
+    data = make_depth_image(width, height).view(np.uint8).reshape(-1)
+    return ob.create_video_frame(ob.OBFrameType.DEPTH_FRAME, ob.OBFormat.Y16, width, height, data,
+                                 stream_profile=depth_profile, depth_scale=1.0)
+
+
+@pytest.fixture(scope="session")
+def camera_param():
+    width, height = DEPTH_SIZE
+    param = ob.OBCameraParam()
+    param.depth_intrinsic = make_intrinsic(width, height)
+    param.rgb_intrinsic = make_intrinsic(width, height)
+    extrinsic = ob.OBExtrinsic()
+    extrinsic.rot = np.eye(3, dtype=np.float32)
+    extrinsic.transform = np.zeros(3, dtype=np.float32)
+    param.transform = extrinsic
+    return param
+
+
+@pytest.fixture(params=[(fmt, res) for res in RESOLUTIONS for fmt in COLOR_FORMATS],
+                ids=lambda p: f"{p[0]}-{p[1]}")
+def color_frame(request):
+    fmt, res = request.param
+    return make_color_frame(fmt, *RESOLUTIONS[res])
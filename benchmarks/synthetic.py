@@ -0,0 +1,75 @@
+# ******************************************************************************
+#  Copyright (c) 2024 Orbbec 3D Technology, Inc
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http:# www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ******************************************************************************
+import cv2
+import numpy as np
+
+RESOLUTIONS = {
+    "vga": (640, 480),
+    "fhd": (1920, 1080),
+}
+
+
+def make_bgr_image(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Gradient plus noise, so JPEG sizes and filter costs resemble a real scene"""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    image = np.empty((height, width, 3), dtype=np.float32)
+    image[..., 0] = x
+    image[..., 1] = y
+    image[..., 2] = (x + y) * 0.5
+    image += rng.normal(0, 12, image.shape)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def make_depth_image(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Y16 depth in millimeters: a slanted plane with noise and a few holes"""
+    rng = np.random.default_rng(seed)
+    depth = np.linspace(500, 3000, width, dtype=np.float32)[None, :].repeat(height, axis=0)
+    depth += rng.normal(0, 5, depth.shape)
+    depth = depth.astype(np.uint16)
+    depth[rng.random(depth.shape) < 0.02] = 0
+    return depth
+
+
+def encode(bgr: np.ndarray, fmt: str) -> np.ndarray:
+    """Return the raw bytes a camera would deliver for ``bgr`` in format ``fmt``"""
+    height, width = bgr.shape[:2]
+    if fmt == "RGB":
+        data = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    elif fmt == "BGR":
+        data = bgr
+    elif fmt == "YUYV":
+        data = cv2.cvtColor(bgr, cv2.COLOR_BGR2YUV_YUYV)
+    elif fmt == "UYVY":
+        data = cv2.cvtColor(bgr, cv2.COLOR_BGR2YUV_UYVY)
+    elif fmt == "I420":
+        data = cv2.cvtColor(bgr, cv2.COLOR_BGR2YUV_I420)
+    elif fmt in ("NV12", "NV21"):
+        i420 = cv2.cvtColor(bgr, cv2.COLOR_BGR2YUV_I420).reshape(-1)
+        y_size = width * height
+        u = i420[y_size:y_size + y_size // 4]
+        v = i420[y_size + y_size // 4:]
+        uv = np.empty(y_size // 2, dtype=np.uint8)
+        uv[0::2], uv[1::2] = (u, v) if fmt == "NV12" else (v, u)
+        data = np.concatenate([i420[:y_size], uv])
+    elif fmt == "MJPG":
+        ok, data = cv2.imencode(".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return np.ascontiguousarray(data).reshape(-1)
@@ -16,7 +16,7 @@
 import cv2
 
 from pyorbbecsdk import *
-from utils import frame_to_bgr_image
+from utils import FrameConverter
 
 ESC_KEY = 27
 
@@ -37,6 +37,7 @@ def main():
         print(e)
         return
     pipeline.start(config)
+    converter = None
     while True:
         try:
             frames: FrameSet = pipeline.wait_for_frames(100)
@@ -45,8 +46,10 @@ def main():
             color_frame = frames.get_color_frame()
             if color_frame is None:
                 continue
-            # covert to RGB format
-            color_image = frame_to_bgr_image(color_frame)
+            # covert to BGR format, the image buffer is reused for every frame
+            if converter is None or not converter.matches(color_frame):
+                converter = FrameConverter.for_frame(color_frame)
+            color_image = converter.convert(color_frame)
             if color_image is None:
                 print("failed to convert frame to image")
                 continue
@@ -0,0 +1,237 @@
+# ******************************************************************************
+#  Copyright (c) 2024 Orbbec 3D Technology, Inc
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http:# www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ******************************************************************************
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from queue import Empty, SimpleQueue
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from frame_synchronizer import MultiDeviceFrameSynchronizer, frame_timestamp_us
+from profile_cache import DEFAULT_STREAMS, ProfileCache, StreamRequest, build_config
+
+DEFAULT_SYNC_CONFIG_FILE = os.path.join(os.path.abspath(os.path.dirname(__file__)),
+                                        "../config/multi_device_sync_config.json")
+
+
+class FrameFanIn:
+    """Bounded per-source buffers drained through a single iterator.
+
+    ``put`` appends to the source's own deque (dropping its oldest item once
+    ``max_buffer_size`` is reached) and posts the source index on one shared
+    queue, so the consumer never polls sources one by one: every ``get`` is a
+    single blocking wait regardless of how many sources there are. A source
+    that overflows does not post a second index for the evicted item, so the
+    number of posted indices always equals the number of buffered items.
+    """
+
+    def __init__(self, num_sources: int, max_buffer_size: int = 4):
+        self._buffers = [deque(maxlen=max_buffer_size) for _ in range(num_sources)]
+        self._ready = SimpleQueue()
+        self._lock = threading.Lock()
+        self.received = [0] * num_sources
+        self.dropped = [0] * num_sources
+
+    def put(self, index: int, item: Any):
+        buffer = self._buffers[index]
+        with self._lock:
+            self.received[index] += 1
+            full = len(buffer) == buffer.maxlen
+            buffer.append(item)
+            if full:
+                self.dropped[index] += 1
+                return
+        self._ready.put(index)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[int, Any]]:
+        """Return (source index, oldest buffered item) of the next ready source, or None"""
+        try:
+            index = self._ready.get(timeout=timeout)
+        except Empty:
+            return None
+        if index is None:
+            return None
+        with self._lock:
+            return index, self._buffers[index].popleft()
+
+    def wake(self):
+        """Make a blocked ``get`` return None"""
+        self._ready.put(None)
+
+    def pending(self) -> List[int]:
+        with self._lock:
+            return [len(buffer) for buffer in self._buffers]
+
+
+def sync_mode_from_str(sync_mode_str: str):
+    from pyorbbecsdk import OBMultiDeviceSyncMode
+    try:
+        return OBMultiDeviceSyncMode.__members__[sync_mode_str.upper()]
+    except KeyError:
+        raise ValueError(f"Invalid sync mode: {sync_mode_str}") from None
+
+
+def load_sync_config(config_file: str) -> Dict[str, dict]:
+    """Read multi_device_sync_config.json into {serial_number: config}"""
+    with open(config_file, "r") as f:
+        config = json.load(f)
+    return {device["serial_number"]: device["config"] for device in config["devices"]}
+
+
+def apply_sync_config(device, config: dict):
+    sync_config = device.get_multi_device_sync_config()
+    sync_config.mode = sync_mode_from_str(config["mode"])
+    sync_config.color_delay_us = config["color_delay_us"]
+    sync_config.depth_delay_us = config["depth_delay_us"]
+    sync_config.trigger_out_enable = config["trigger_out_enable"]
+    sync_config.trigger_out_delay_us = config["trigger_out_delay_us"]
+    sync_config.frames_per_trigger = config["frames_per_trigger"]
+    device.set_multi_device_sync_config(sync_config)
+
+
+class DeviceGroup:
+    """Open, configure and stream every connected device as one unit.
+
+    Devices are opened, configured and started on a thread pool, so bring-up
+    time does not grow linearly with the device count. With a ProfileCache the
+    stream profiles resolved on the first start are reused on later starts. Each pipeline callback
+    only appends to its own bounded buffer; iterate the group to receive
+    (device index, FrameSet) from all devices in arrival order. With
+    ``tolerance_us`` set, frame sets are matched across devices by a
+    MultiDeviceFrameSynchronizer instead and iteration yields FrameGroups.
+    """
+
+    def __init__(self, sync_config_file: Optional[str] = None, max_buffer_size: int = 4,
+                 streams: Sequence[StreamRequest] = DEFAULT_STREAMS, profile_cache: Optional[ProfileCache] = None,
+                 tolerance_us: Optional[int] = None, max_workers: int = 8, context=None):
+        from pyorbbecsdk import Context
+        self.context = context if context is not None else Context()
+        self.sync_config = load_sync_config(sync_config_file) if sync_config_file else {}
+        self.max_buffer_size = max_buffer_size
+        self.streams = streams
+        self.profile_cache = profile_cache
+        self.tolerance_us = tolerance_us
+        self.max_workers = max_workers
+        self.devices = []
+        self.serial_numbers: List[str] = []
+        self.pipelines = []
+        self.fan_in: Optional[FrameFanIn] = None
+        self.synchronizer: Optional[MultiDeviceFrameSynchronizer] = None
+        self._started = False
+
+    def __len__(self):
+        return len(self.devices)
+
+    def _open(self, device_list, index: int):
+        from pyorbbecsdk import Pipeline
+        device = device_list.get_device_by_index(index)
+        serial_number = device.get_device_info().get_serial_number()
+        if serial_number in self.sync_config:
+            apply_sync_config(device, self.sync_config[serial_number])
+        pipeline = Pipeline(device)
+        return device, serial_number, pipeline, build_config(pipeline, self.streams, serial_number,
+                                                             self.profile_cache)
+
+    def open(self) -> int:
+        """Open all connected devices, return how many were opened"""
+        device_list = self.context.query_devices()
+        count = device_list.get_count()
+        if count == 0:
+            return 0
+        with ThreadPoolExecutor(max_workers=min(count, self.max_workers)) as executor:
+            opened = list(executor.map(partial(self._open, device_list), range(count)))
+        self.devices = [item[0] for item in opened]
+        self.serial_numbers = [item[1] for item in opened]
+        self.pipelines = [item[2] for item in opened]
+        self._configs = [item[3] for item in opened]
+        if self.tolerance_us is not None:
+            self.synchronizer = MultiDeviceFrameSynchronizer(count, self.tolerance_us, self.max_buffer_size)
+        else:
+            self.fan_in = FrameFanIn(count, self.max_buffer_size)
+        return count
+
+    def _on_frames(self, index: int, frames):
+        if frames is None:
+            return
+        if self.synchronizer is None:
+            self.fan_in.put(index, frames)
+            return
+        frame = frames.get_depth_frame()
+        if frame is None:
+            frame = frames.get_color_frame()
+        if frame is not None:
+            self.synchronizer.push(index, frames, frame_timestamp_us(frame, self.synchronizer.use_global_timestamp))
+
+    def _start(self, index: int):
+        from pyorbbecsdk import OBError
+        pipeline = self.pipelines[index]
+        try:
+            pipeline.start(self._configs[index], partial(self._on_frames, index))
+        except OBError:
+            if self.profile_cache is None:
+                raise
+            # the cached profiles may be stale (e.g. new firmware), search them again once
+            serial_number = self.serial_numbers[index]
+            self.profile_cache.invalidate(serial_number)
+            self._configs[index] = build_config(pipeline, self.streams, serial_number, self.profile_cache)
+            pipeline.start(self._configs[index], partial(self._on_frames, index))
+
+    def start(self):
+        if not self.devices and not self.open():
+            raise RuntimeError("No device connected")
+        with ThreadPoolExecutor(max_workers=min(len(self.pipelines), self.max_workers)) as executor:
+            list(executor.map(self._start, range(len(self.pipelines))))
+        if self.profile_cache is not None and self.profile_cache.misses:
+            self.profile_cache.save()
+        if self.sync_config:
+            self.context.enable_multi_device_sync(60000)
+        self._started = True
+
+    def stop(self):
+        if not self._started:
+            return
+        self._started = False
+        with ThreadPoolExecutor(max_workers=min(len(self.pipelines), self.max_workers)) as executor:
+            list(executor.map(lambda pipeline: pipeline.stop(), self.pipelines))
+        if self.fan_in is not None:
+            self.fan_in.wake()
+
+    def get(self, timeout: Optional[float] = None):
+        """Return the next (index, FrameSet), or FrameGroup when synchronizing, or None on timeout"""
+        if self.synchronizer is not None:
+            return self.synchronizer.get(timeout)
+        return self.fan_in.get(timeout)
+
+    def __iter__(self) -> Iterator:
+        while self._started:
+            item = self.get(timeout=0.1)
+            if item is not None:
+                yield item
+
+    def get_stats(self) -> dict:
+        if self.synchronizer is not None:
+            return self.synchronizer.get_stats()
+        return {"received": list(self.fan_in.received), "dropped": list(self.fan_in.dropped),
+                "pending": self.fan_in.pending()}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,154 @@
+# ******************************************************************************
+#  Copyright (c) 2024 Orbbec 3D Technology, Inc
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http:# www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ******************************************************************************
+import threading
+from collections import deque
+from typing import Any, Callable, List, NamedTuple, Optional
+
+import numpy as np
+
+_EMPTY = np.iinfo(np.int64).max
+
+
+def frame_timestamp_us(frame: Any, use_global: bool = True) -> int:
+    """Global timestamp of a frame, or its device timestamp if global time is not enabled"""
+    if use_global:
+        timestamp = frame.get_global_timestamp_us()
+        if timestamp:
+            return timestamp
+    return frame.get_timestamp_us()
+
+
+class FrameGroup(NamedTuple):
+    timestamp_us: int  # oldest timestamp in the group
+    skew_us: int  # newest minus oldest timestamp
+    frames: List[Any]  # one frame per device, in device index order
+
+
+class MultiDeviceFrameSynchronizer:
+    """Match frames from N devices whose timestamps lie within ``tolerance_us``.
+
+    Every device pushes its frames (or frame sets) in capture order. Once each
+    device has a frame pending, the oldest frames of all devices are compared:
+    if they span at most ``tolerance_us`` they are emitted as one FrameGroup,
+    otherwise every head frame older than ``newest - tolerance_us`` can no
+    longer be matched and is dropped. Device queues are bounded by
+    ``max_queue_size`` so a stalled device makes the others drop their oldest
+    frames instead of growing without limit. Use ``get`` to poll groups or pass
+    ``on_group`` to receive them on the pushing thread.
+    """
+
+    def __init__(self, num_devices: int, tolerance_us: int = 5000, max_queue_size: int = 8,
+                 max_groups: int = 4, use_global_timestamp: bool = True,
+                 on_group: Optional[Callable[[FrameGroup], None]] = None, window: int = 1024):
+        if num_devices < 1:
+            raise ValueError("num_devices must be at least 1")
+        self.num_devices = num_devices
+        self.tolerance_us = tolerance_us
+        self.max_queue_size = max_queue_size
+        self.use_global_timestamp = use_global_timestamp
+        self.on_group = on_group
+        self._queues = [deque() for _ in range(num_devices)]
+        self._heads = np.full(num_devices, _EMPTY, dtype=np.int64)
+        self._sizes = np.zeros(num_devices, dtype=np.int64)
+        self._groups = deque(maxlen=max_groups)
+        self._cond = threading.Condition()
+        self._skews = deque(maxlen=window)
+        self.matched = 0
+        self.unmatched = np.zeros(num_devices, dtype=np.int64)
+        self.overflowed = np.zeros(num_devices, dtype=np.int64)
+        self.groups_dropped = 0
+
+    def push(self, index: int, frame: Any, timestamp_us: Optional[int] = None):
+        """Add a frame of device ``index``, ``timestamp_us`` defaults to frame_timestamp_us(frame)"""
+        if timestamp_us is None:
+            timestamp_us = frame_timestamp_us(frame, self.use_global_timestamp)
+        emitted = []
+        with self._cond:
+            queue = self._queues[index]
+            if len(queue) >= self.max_queue_size:
+                self._pop(index)
+                self.overflowed[index] += 1
+            queue.append((timestamp_us, frame))
+            self._sizes[index] += 1
+            if self._sizes[index] == 1:
+                self._heads[index] = timestamp_us
+            self._match(emitted)
+            if emitted:
+                self._cond.notify_all()
+        if self.on_group is not None:
+            for group in emitted:
+                self.on_group(group)
+
+    def _pop(self, index: int):
+        queue = self._queues[index]
+        _, frame = queue.popleft()
+        self._sizes[index] -= 1
+        self._heads[index] = queue[0][0] if queue else _EMPTY
+        return frame
+
+    def _match(self, emitted: list):
+        while self._sizes.all():
+            newest = int(self._heads.max())
+            oldest = int(self._heads.min())
+            if newest - oldest <= self.tolerance_us:
+                frames = [self._pop(i) for i in range(self.num_devices)]
+                group = FrameGroup(oldest, newest - oldest, frames)
+                self.matched += 1
+                self._skews.append(newest - oldest)
+                if len(self._groups) == self._groups.maxlen:
+                    self.groups_dropped += 1  # the reader is slower than the cameras, the oldest group is evicted
+                self._groups.append(group)
+                emitted.append(group)
+                continue
+            for i in np.flatnonzero(self._heads < newest - self.tolerance_us):
+                self._pop(i)
+                self.unmatched[i] += 1
+
+    def get(self, timeout: Optional[float] = None) -> Optional[FrameGroup]:
+        """Return the oldest matched group, waiting up to ``timeout`` seconds, or None"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._groups, timeout):
+                return None
+            return self._groups.popleft()
+
+    def pending(self) -> List[int]:
+        with self._cond:
+            return self._sizes.tolist()
+
+    def reset(self):
+        """Forget all pending frames and groups, counters are kept"""
+        with self._cond:
+            for queue in self._queues:
+                queue.clear()
+            self._heads.fill(_EMPTY)
+            self._sizes.fill(0)
+            self._groups.clear()
+
+    def get_stats(self) -> dict:
+        """Return match/drop counters and the skew of recent groups in us"""
+        with self._cond:
+            skews = np.asarray(self._skews, dtype=np.float64)
+            stats = {
+                "matched": self.matched,
+                "unmatched": self.unmatched.tolist(),
+                "overflowed": self.overflowed.tolist(),
+                "groups_dropped": self.groups_dropped,
+            }
+        if skews.size:
+            p50, p95 = np.percentile(skews, [50, 95])
+            stats.update(skew_mean_us=float(skews.mean()), skew_p50_us=float(p50),
+                         skew_p95_us=float(p95), skew_max_us=float(skews.max()))
+        return stats
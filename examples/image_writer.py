@@ -0,0 +1,155 @@
+# ******************************************************************************
+#  Copyright (c) 2024 Orbbec 3D Technology, Inc
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http:# www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ******************************************************************************
+import os
+import threading
+import time
+from queue import Queue, Full, Empty
+from typing import Optional
+
+import cv2
+import numpy as np
+
+DROP_POLICY = "drop"
+BLOCK_POLICY = "block"
+
+
+class ImageWriter:
+    """Write images to disk from background threads through a bounded queue.
+
+    The caller hands over ownership of the array passed to ``submit``; it must
+    not be modified afterwards. ``.jpg``/``.png`` files are encoded with
+    ``cv2.imwrite`` (which releases the GIL), ``.raw`` files are written with
+    ``ndarray.tofile``.
+    """
+
+    def __init__(self, num_workers: int = 1, max_queue_size: int = 32,
+                 policy: str = DROP_POLICY, jpeg_quality: int = 95,
+                 png_compression: int = 3):
+        if policy not in (DROP_POLICY, BLOCK_POLICY):
+            raise ValueError(f"Invalid policy: {policy}")
+        self.policy = policy
+        self.jpeg_quality = jpeg_quality
+        self.png_compression = png_compression
+        self._queue = Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._stopped = False
+        self._workers = []
+        for i in range(num_workers):
+            worker = threading.Thread(target=self._run, name=f"ImageWriter-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, path: str, image: np.ndarray) -> bool:
+        """Queue an image for writing, return False if it was dropped"""
+        if self._stopped:
+            raise RuntimeError("ImageWriter is closed")
+        item = (path, image, time.perf_counter())
+        if self.policy == BLOCK_POLICY:
+            self._queue.put(item)
+            return True
+        try:
+            self._queue.put_nowait(item)
+        except Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+        return True
+
+    def _encode_params(self, path: str):
+        ext = os.path.splitext(path)[1].lower()
+        if ext in (".jpg", ".jpeg"):
+            return [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        if ext == ".png":
+            return [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        return []
+
+    def _write(self, path: str, image: np.ndarray) -> bool:
+        if path.endswith(".raw"):
+            image.tofile(path)
+            return True
+        return cv2.imwrite(path, image, self._encode_params(path))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            path, image, submitted_at = item
+            try:
+                ok = self._write(path, image)
+            except (cv2.error, OSError) as e:
+                print(f"Failed to write {path}: {e}")
+                ok = False
+            latency = time.perf_counter() - submitted_at
+            with self._lock:
+                if ok:
+                    self._written += 1
+                else:
+                    self._failed += 1
+                self._total_latency += latency
+                self._max_latency = max(self._max_latency, latency)
+            self._queue.task_done()
+
+    def get_stats(self) -> dict:
+        """Return queue depth, write counters and submit-to-disk latency in ms"""
+        with self._lock:
+            done = self._written + self._failed
+            return {
+                "queue_depth": self._queue.qsize(),
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "avg_latency_ms": self._total_latency / done * 1000.0 if done else 0.0,
+                "max_latency_ms": self._max_latency * 1000.0,
+            }
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued image has been written"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self, wait: bool = True):
+        """Stop the workers, writing out whatever is still queued if wait is True"""
+        if self._stopped:
+            return
+        self._stopped = True
+        if not wait:
+            try:
+                while True:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+            except Empty:
+                pass
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
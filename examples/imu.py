@@ -13,48 +13,54 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 # ******************************************************************************
-import time
-import cv2
 import numpy as np
+
 from pyorbbecsdk import *
 
-ESC_KEY = 27
+CHUNK_SIZE = 200  # samples per chunk, 0.2 s at 1 kHz
+
+
+def start_batcher(device: Device, sensor_type: OBSensorType) -> IMUBatcher:
+    """Start an IMU sensor whose samples are collected natively and read in chunks"""
+    sensor = device.get_sensor(sensor_type)
+    profile = sensor.get_stream_profile_list().get_stream_profile_by_index(0)
+    batcher = IMUBatcher(CHUNK_SIZE)
+    batcher.start(sensor, profile)
+    return batcher
+
+
+def print_chunk(name: str, samples: np.ndarray, temperatures: np.ndarray):
+    timestamps = samples[:, 0]
+    duration_s = (timestamps[-1] - timestamps[0]) / 1e6
+    rate = (len(samples) - 1) / duration_s if duration_s > 0 else 0.0
+    x, y, z = samples[:, 1:].mean(axis=0)
+    print(f"{name}: {len(samples)} samples ending at ts={int(timestamps[-1])}us, {rate:.0f} Hz, "
+          f"mean x={x:.4f}, y={y:.4f}, z={z:.4f}, temperature={temperatures.mean():.1f}C")
+
 
 def main():
-    config = Config()
     pipeline = Pipeline()
-    config.enable_accel_stream()
-    config.enable_gyro_stream()
-    config.set_frame_aggregate_output_mode(OBFrameAggregateOutputMode.FULL_FRAME_REQUIRE)
-    pipeline.start(config)
-    while True:
+    device = pipeline.get_device()
+    batchers = {}
+    for name, sensor_type in (("Accel", OBSensorType.ACCEL_SENSOR), ("Gyro", OBSensorType.GYRO_SENSOR)):
         try:
-            frames = pipeline.wait_for_frames(100)
-            if frames is None:
-                continue
-            
-            accel_frame = frames.get_frame(OBFrameType.ACCEL_FRAME)
-            accel_frame = accel_frame.as_accel_frame()
-            
-            if accel_frame is not None:
-                accel_index = accel_frame.get_index()
-                if accel_index % 50 == 0:
-                    print("AccelFrame: ts={}".format(accel_frame.get_timestamp()))
-                    print("AccelFrame: x={}, y={}, z={}".format(accel_frame.get_x(), accel_frame.get_y(),accel_frame.get_z()))    
-
-            gyro_frame = frames.get_frame(OBFrameType.GYRO_FRAME)
-            gyro_frame = gyro_frame.as_gyro_frame()
-            if gyro_frame is not None:
-                gyro_index = gyro_frame.get_index()
-                if gyro_index % 50 == 0:
-                    print("GyroFrame: ts={}".format(gyro_frame.get_timestamp()))
-                    print("GyroFrame: x={}, y={}, z={}".format(gyro_frame.get_x(), gyro_frame.get_y(),gyro_frame.get_z()))  
-
-            key = cv2.waitKey(1)
-            if key == ord('q') or key == ESC_KEY:
-                break            
-        except KeyboardInterrupt:
-            break           
+            batchers[name] = start_batcher(device, sensor_type)
+        except OBError as e:
+            print(f"Failed to start {name} sensor: {e}")
+    if not batchers:
+        return
+    try:
+        while True:
+            for name, batcher in batchers.items():
+                chunk = batcher.read(timeout_ms=10)
+                if chunk is not None:
+                    print_chunk(name, *chunk)
+    except KeyboardInterrupt:
+        pass
+    for name, batcher in batchers.items():
+        batcher.stop()
+        print(f"{name}: dropped {batcher.get_dropped_samples()} samples")
+
 
 if __name__ == "__main__":
     main()
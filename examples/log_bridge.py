@@ -0,0 +1,173 @@
+# ******************************************************************************
+#  Copyright (c) 2024 Orbbec 3D Technology, Inc
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http:# www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ******************************************************************************
+import logging
+import logging.handlers
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+SDK_LOGGER_NAME = "pyorbbecsdk"
+DEFAULT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# OBLogLevel member name -> logging level
+SDK_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "FATAL": logging.CRITICAL,
+}
+
+_DIGITS = re.compile(r"\d+")
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most ``rate`` similar messages per second through, with bursts of ``burst``.
+
+    Messages are "similar" when they come from the same logger at the same level
+    and only differ in their numbers, so "frame 1021 dropped" and "frame 1022
+    dropped" share one token bucket. The first message let through after some
+    were suppressed says how many were skipped. Only the ``max_keys`` most
+    recently seen kinds of message are remembered.
+    """
+
+    def __init__(self, rate: float = 5.0, burst: int = 10, max_keys: int = 1024):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.suppressed = 0
+        self._buckets = OrderedDict()  # key -> [tokens, last_time, suppressed]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(record: logging.LogRecord):
+        return record.name, record.levelno, _DIGITS.sub("#", str(record.msg))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = self.key(record)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] -= 1.0
+            skipped, bucket[2] = bucket[2], 0
+        if skipped:
+            record.msg = f"{record.getMessage()} (suppressed {skipped} similar)"
+            record.args = None
+        return True
+
+
+class SDKLogBridge:
+    """Forward the SDK's log messages into the ``pyorbbecsdk`` Python logger.
+
+    The SDK callback only appends to a bounded native queue and never takes the
+    GIL; a daemon thread drains it in batches with the GIL released while it
+    waits. When the queue is full the oldest messages are overwritten, see
+    ``dropped``.
+    """
+
+    def __init__(self, level=None, capacity: int = 1024, logger_name: str = SDK_LOGGER_NAME,
+                 batch_size: int = 256, poll_ms: int = 100):
+        self.level = level
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.poll_ms = poll_ms
+        self.logger = logging.getLogger(logger_name)
+        self.forwarded = 0
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        from pyorbbecsdk import Context, OBLogLevel
+
+        if self._running:
+            return
+        level = self.level if self.level is not None else OBLogLevel.INFO
+        Context.set_logger_to_queue(level, self.capacity)
+        self._running = True
+        self._thread = threading.Thread(target=self._drain_loop, name="SDKLogBridge", daemon=True)
+        self._thread.start()
+
+    def _drain_loop(self):
+        from pyorbbecsdk import Context
+
+        while self._running:
+            for severity, message in Context.pop_log_messages(self.batch_size, self.poll_ms):
+                self.logger.log(SDK_LEVELS.get(severity.name, logging.INFO), message.rstrip())
+                self.forwarded += 1
+
+    @property
+    def dropped(self) -> int:
+        from pyorbbecsdk import Context
+
+        return Context.get_dropped_log_count()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def setup_logging(level: int = logging.INFO, rate: float = 5.0, burst: int = 10,
+                  handlers=None, fmt: str = DEFAULT_FORMAT,
+                  logger: Optional[logging.Logger] = None) -> logging.handlers.QueueListener:
+    """Route ``logger`` (the root logger by default) through a queue to ``handlers``.
+
+    Emitting a record only rate-limits it and puts it on an in-memory queue; a
+    QueueListener thread does the formatting and the console or file I/O.
+    ``handlers`` defaults to a single stderr StreamHandler. Call ``stop()`` on
+    the returned listener at exit to flush what is still queued.
+    """
+    logger = logger if logger is not None else logging.getLogger()
+    if not handlers:
+        handlers = [logging.StreamHandler()]
+    formatter = logging.Formatter(fmt)
+    for handler in handlers:
+        if handler.formatter is None:
+            handler.setFormatter(formatter)
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(RateLimitFilter(rate, burst))
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+    logger.setLevel(level)
+    listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -14,14 +14,22 @@
 #  limitations under the License.
 # ******************************************************************************
 
+import logging
 import os
-from pyorbbecsdk import *
 import time
 
+from pyorbbecsdk import *
+from log_bridge import SDKLogBridge, setup_logging
+
+
 def main():
-    # Set console logger (INFO level)
-    # if you DO NOT want to see the log message in console, you can set the log level to OBLogLevel.NONE
-    Context.set_logger_to_console(OBLogLevel.INFO)
+    # Python logging writes to the console from its own thread
+    listener = setup_logging(logging.INFO)
+
+    # Forward SDK log messages (INFO level) into the "pyorbbecsdk" Python logger.
+    # The SDK only appends them to a native queue, a background thread drains it.
+    bridge = SDKLogBridge(OBLogLevel.INFO)
+    bridge.start()
 
     # Set file logger (DEBUG level)
     log_path = "Log/Custom/"
@@ -48,6 +56,10 @@ def main():
     # Stop pipeline
     pipeline.stop()
 
+    bridge.stop()
+    listener.stop()
+    print(f"Forwarded {bridge.forwarded} SDK log messages, dropped {bridge.dropped}")
+
     print("\nPress any key to exit.")
     input()  # Wait for user input to exit
 
@@ -14,9 +14,20 @@
 #  limitations under the License.
 # ******************************************************************************
 
+import numpy as np
+
 from pyorbbecsdk import *
 
 ESC_KEY = 27
+LOG_SIZE = 30 * 60  # one minute of records per stream at 30 fps
+LOG_FIELDS = ("timestamp", "frame_number", "exposure", "gain", "laser_power", "laser_status")
+
+
+def present_fields(record):
+    """Names of the metadata fields the frame actually carried"""
+    names = record.dtype.names[1:]
+    return [name for i, name in enumerate(names) if int(record["present"]) >> i & 1]
+
 
 def main():
     # Initialize Pipeline
@@ -26,7 +37,10 @@ def main():
     print("Pipeline started. Press Ctrl+C to exit.")
 
     frame_counter = 0  # Add frame counter
-    
+    # Preallocated per-stream logs, every frame's metadata is written in place in one native call
+    logs = {}
+    rows = {}
+
     while True:
         try:
             # Get frameSet from Pipeline
@@ -35,21 +49,21 @@ def main():
                 continue
 
             frame_counter += 1  # Increment counter
-            
-            # Only print metadata every 30 frames
-            if frame_counter % 30 == 0:
-                for i in range(len(frame_set)):
-                    frame = frame_set[i]
+            for i in range(len(frame_set)):
+                frame = frame_set[i]
+                frame_type = frame.get_type()
+                if frame_type not in logs:
+                    logs[frame_type] = np.zeros(LOG_SIZE, dtype=get_metadata_dtype())
+                    rows[frame_type] = 0
+                row = rows[frame_type] % LOG_SIZE
+                record = frame.get_all_metadata(logs[frame_type], row)
+                rows[frame_type] += 1
 
-                    # Print frame metadata
-                    print(f"Frame type: {frame.get_type()}")
-                    metadata_types = [getattr(OBFrameMetadataType, attr) for attr in dir(OBFrameMetadataType) 
-                                    if not attr.startswith('__') and isinstance(getattr(OBFrameMetadataType, attr), OBFrameMetadataType)]
-                    
-                    for metadata_type in metadata_types:
-                        if frame.has_metadata(metadata_type):
-                            metadata_value = frame.get_metadata_value(metadata_type)
-                            print(f"  Metadata type: {metadata_type.name}, value: {metadata_value}")
+                # Only print metadata every 30 frames
+                if frame_counter % 30 == 0:
+                    print(f"Frame type: {frame_type}")
+                    for name in present_fields(record):
+                        print(f"  Metadata type: {name.upper()}, value: {record[name]}")
 
         except KeyboardInterrupt:
             break
@@ -59,6 +73,19 @@ def main():
 
     pipeline.stop()
     print("Pipeline stopped.")
+    for frame_type, log in logs.items():
+        count = min(rows[frame_type], LOG_SIZE)
+        recent = log[:count]
+        print(f"{frame_type}: last {count} frames")
+        for name in LOG_FIELDS:
+            # absent fields are written as 0, leave them out of the summary
+            bit = np.uint64(1) << np.uint64(log.dtype.names.index(name) - 1)
+            values = recent[name][(recent["present"] & bit) != 0]
+            if len(values) == 0:
+                print(f"  {name}: not present")
+                continue
+            print(f"  {name}: min={values.min()} max={values.max()} ({len(values)} frames)")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,81 @@
+# ******************************************************************************
+#  Copyright (c) 2024 Orbbec 3D Technology, Inc
+#  
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.  
+#  You may obtain a copy of the License at
+#  
+#      http:# www.apache.org/licenses/LICENSE-2.0
+#  
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ******************************************************************************
+import concurrent.futures
+import time
+
+import cv2
+import numpy as np
+
+from pyorbbecsdk import *
+from mjpeg_decoder import MJPEGDecoder
+
+ESC_KEY = 27
+DISPLAY_WIDTH = 640
+
+
+def main():
+    config = Config()
+    pipeline = Pipeline()
+    try:
+        profile_list = pipeline.get_stream_profile_list(OBSensorType.COLOR_SENSOR)
+        color_profile = profile_list.get_video_stream_profile(1920, 0, OBFormat.MJPG, 30)
+        config.enable_stream(color_profile)
+    except Exception as e:
+        print("MJPG 1920 is not supported by this device:", e)
+        return
+
+    # Decode on a pool so the SDK callback never waits for a JPEG, and only as large as we display
+    decoder = MJPEGDecoder(num_workers=3, max_pending=6, target_width=DISPLAY_WIDTH)
+    print("libjpeg-turbo scaled decode:", decoder.uses_turbojpeg)
+
+    def on_new_frame_callback(frames: FrameSet):
+        color_frame = frames.get_color_frame() if frames else None
+        if color_frame is None:
+            return
+        data = np.asanyarray(color_frame.get_data())
+        decoder.submit(data, color_frame.get_width(), color_frame.get_timestamp_us())
+
+    pipeline.start(config, on_new_frame_callback)
+    shown = 0
+    start = time.time()
+    while True:
+        try:
+            try:
+                result = decoder.get(timeout=1)
+            except concurrent.futures.TimeoutError:
+                continue
+            if result is None:
+                time.sleep(0.005)
+                continue
+            timestamp_us, color_image = result
+            if color_image is None:
+                continue
+            shown += 1
+            cv2.imshow("MJPG Viewer", color_image)
+            key = cv2.waitKey(1)
+            if key == ord('q') or key == ESC_KEY:
+                break
+        except KeyboardInterrupt:
+            break
+    elapsed = time.time() - start
+    print(f"shown {shown} frames, {shown / elapsed:.1f} fps, dropped {decoder.dropped}")
+    cv2.destroyAllWindows()
+    pipeline.stop()
+    decoder.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# ******************************************************************************
+#  Copyright (c) 2024 Orbbec 3D Technology, Inc
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http:# www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ******************************************************************************
+import concurrent.futures
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from image_writer import DROP_POLICY, BLOCK_POLICY
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+except ImportError:  # PyTurboJPEG is optional, OpenCV can scale by 1/2, 1/4 and 1/8 as well
+    TurboJPEG = None
+
+_CV_REDUCED = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+               4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+
+class MJPEGDecoder:
+    """Decode MJPG frames on a thread pool and hand them back in submission order.
+
+    ``cv2.imdecode`` and libjpeg-turbo release the GIL, so decoding 1080p MJPG on
+    two or three workers keeps up with 30 fps while the consumer thread only
+    waits for results. When ``target_width`` is set the JPEG is decoded at the
+    smallest DCT scale factor that is still at least that wide, which skips most
+    of the IDCT work instead of resizing a full-size image afterwards.
+    ``get`` is meant to be called from a single consumer thread.
+    """
+
+    def __init__(self, num_workers: int = 2, max_pending: int = 4, target_width: Optional[int] = None,
+                 policy: str = DROP_POLICY, use_turbojpeg: bool = True):
+        if policy not in (DROP_POLICY, BLOCK_POLICY):
+            raise ValueError(f"Invalid policy: {policy}")
+        self.target_width = target_width
+        self.policy = policy
+        self.dropped = 0
+        self._turbo = TurboJPEG() if use_turbojpeg and TurboJPEG is not None else None
+        self._executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="MJPEGDecoder")
+        self._pending = deque()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+    @property
+    def uses_turbojpeg(self) -> bool:
+        return self._turbo is not None
+
+    def _turbo_factor(self, width: int):
+        if not self.target_width:
+            return None
+        candidates = [f for f in self._turbo.scaling_factors
+                      if f[0] <= f[1] and width * f[0] // f[1] >= self.target_width]
+        return min(candidates, key=lambda f: f[0] / f[1]) if candidates else None
+
+    def _cv_flag(self, width: int) -> int:
+        denom = 1
+        if self.target_width:
+            for candidate in (8, 4, 2):
+                if width // candidate >= self.target_width:
+                    denom = candidate
+                    break
+        return _CV_REDUCED[denom]
+
+    def decode(self, data: np.ndarray, width: int = 0) -> Optional[np.ndarray]:
+        """Decode one JPEG to BGR on the calling thread, ``width`` is needed for scaled decode"""
+        if self._turbo is not None:
+            try:
+                return self._turbo.decode(data, pixel_format=TJPF_BGR,
+                                          scaling_factor=self._turbo_factor(width) if width else None)
+            except (OSError, ValueError):
+                return None
+        return cv2.imdecode(data, self._cv_flag(width) if width else cv2.IMREAD_COLOR)
+
+    def submit(self, data: np.ndarray, width: int = 0, context: Any = None) -> bool:
+        """Queue a JPEG for decoding, return False if it was dropped because too many are pending"""
+        if self.policy == BLOCK_POLICY:
+            self._slots.acquire()
+        elif not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.dropped += 1
+            return False
+        future = self._executor.submit(self.decode, data, width)
+        with self._lock:
+            self._pending.append((context, future))
+        return True
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[Any, Optional[np.ndarray]]]:
+        """Return (context, image) of the oldest submitted frame, or None if nothing is pending
+
+        A decode error is raised after the frame is removed from the queue, a timeout
+        leaves it queued.
+        """
+        with self._lock:
+            if not self._pending:
+                return None
+            context, future = self._pending[0]
+        timed_out = False
+        try:
+            return context, future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # still decoding: leave it queued so the next get() waits on it again
+            timed_out = not future.done()
+            raise
+        finally:
+            if not timed_out:
+                with self._lock:
+                    self._pending.popleft()
+                self._slots.release()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -14,7 +14,23 @@
 #  limitations under the License.
 # ******************************************************************************
 
+import sys
+
 import pyorbbecsdk as ob
+from preset_manager import PresetManager
+
+READABLE = (ob.OBPermissionType.PERMISSION_READ, ob.OBPermissionType.PERMISSION_READ_WRITE)
+
+
+def readable_properties(device):
+    """IDs of the int, float and bool properties that can be read"""
+    property_ids = []
+    for i in range(device.get_support_property_count()):
+        item = device.get_supported_property(i)
+        if item.type != ob.OBPropertyType.OB_STRUCT_PROPERTY and item.permission in READABLE:
+            property_ids.append(item.id)
+    return property_ids
+
 
 def main():
     # Create a pipeline with default device
@@ -22,11 +38,21 @@ def main():
 
     # Get the device from the pipeline
     device = pipe.get_device()
+    property_ids = readable_properties(device)
+    manager = PresetManager(device)
+    if len(sys.argv) > 1:
+        # Folder or file with JSON presets exported by export_settings_as_preset_json_file
+        print(f"Preloaded: {manager.preload(sys.argv[1])}")
+
+    # Keep streaming while presets are switched, every frameset is tagged with its preset
+    config = ob.Config()
+    config.enable_stream(ob.OBSensorType.DEPTH_SENSOR)
+    pipe.start(config, manager.on_frames)
 
     try:
         while True:
-            # Get preset list from device
-            preset_list = device.get_available_preset_list()
+            # Preset names are read from the device once and cached
+            preset_list = manager.available()
             if len(preset_list) == 0:
                 print("The current device does not support preset mode")
                 break
@@ -36,7 +62,7 @@ def main():
                 print(f" - {index}. {preset_list[index]}")
 
             # Print current preset name
-            print(f"\nCurrent PresetName: {device.get_current_preset_name()}")
+            print(f"\nCurrent PresetName: {manager.current}")
 
             # Select preset to load
             try:
@@ -51,17 +77,27 @@ def main():
 
             preset_name = preset_list[input_option]
 
-            # Load preset
-            device.load_preset(preset_name)
+            # Load preset without stopping the stream and wait for its first frameset,
+            # reading all properties before and after in one call each
+            before = device.get_properties(property_ids)
+            switch = manager.apply(preset_name)
+            if not manager.wait(timeout=5.0):
+                print(f"\nNo frames under preset {preset_name} after 5 s")
+                continue
 
-            # Print current preset name
-            print(f"\nPreset loaded. Current PresetName: {device.get_current_preset_name()}")
+            print(f"\nPreset loaded. Current PresetName: {manager.current}")
+            print(f"Apply took {switch['apply_ms']:.1f} ms, first frame after {switch['first_frame_ms']:.1f} ms, "
+                  f"{switch['stale_frames']} frames arrived during the switch")
+            for property_id, value in device.get_properties(property_ids).items():
+                if before[property_id] != value:
+                    print(f" - {property_id.name}: {before[property_id]} -> {value}")
 
     except ob.OBError as e:
         print(f"Error: {str(e)}")
     finally:
         # Stop Pipeline
         pipe.stop()
+        print("Switch stats:", manager.get_stats())
 
 if __name__ == "__main__":
     main()
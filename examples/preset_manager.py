@@ -0,0 +1,181 @@
+# ******************************************************************************
+#  Copyright (c) 2024 Orbbec 3D Technology, Inc
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http:# www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ******************************************************************************
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Metadata fields (names of get_metadata_dtype()) that presets usually change.
+# A frame whose values differ from the ones seen before a switch was captured
+# with the new settings.
+SETTINGS_FIELDS = (
+    "auto_exposure", "exposure", "gain", "auto_white_balance", "white_balance",
+    "laser_power", "laser_power_level", "laser_status",
+    "hdr_sequence_size", "disparity_search_offset", "disparity_search_range",
+)
+
+
+def frame_settings(frames, fields=SETTINGS_FIELDS) -> tuple:
+    """Values of ``fields`` in the metadata of the depth and color frame of a frameset"""
+    settings = []
+    for frame in (frames.get_depth_frame(), frames.get_color_frame()):
+        if frame is None:
+            continue
+        record = frame.get_all_metadata()
+        settings.extend(int(record[name]) for name in fields)
+    return tuple(settings)
+
+
+class PresetManager:
+    """Switch device presets while the pipeline keeps streaming and time each switch.
+
+    The available preset names are read once and cached, JSON presets given to
+    ``preload`` are read into memory so ``apply`` does no file I/O. Call
+    ``on_frames`` with every frameset (it is cheap enough for the frame
+    callback); it returns the name of the preset the frameset was produced
+    under. After ``apply`` the first frameset that arrives after the device
+    accepted the preset and whose exposure/gain/laser metadata differ from the
+    frames before the switch is the first one of the new preset. If a preset
+    does not change any of these fields, the first frameset that arrived after
+    the device accepted it is used once ``settle_frames`` more have come in.
+
+    Every switch is a dict in ``switches``: preset, previous, apply_ms (time
+    spent in the SDK call), first_frame_ms (from the start of apply to the
+    first frameset of the new preset), stale_frames (framesets that arrived
+    during apply) and metadata_changed.
+    """
+
+    def __init__(self, device, settle_frames: int = 30, window: int = 64, fields=SETTINGS_FIELDS):
+        self.device = device
+        self.settle_frames = settle_frames
+        self.fields = fields
+        self.switches = deque(maxlen=window)
+        self.current = device.get_current_preset_name()
+        self._json = {}
+        self._available = None
+        self._baseline = None
+        self._pending = None
+        self._cond = threading.Condition()
+
+    def available(self) -> List[str]:
+        """Names of the presets on the device and the preloaded JSON presets"""
+        if self._available is None:
+            preset_list = self.device.get_available_preset_list()
+            self._available = [preset_list[i] for i in range(len(preset_list))]
+        return self._available + [name for name in self._json if name not in self._available]
+
+    def refresh(self):
+        """Forget the cached preset list, e.g. after a firmware update"""
+        self._available = None
+
+    def preload(self, path: str, name: Optional[str] = None) -> List[str]:
+        """Read a JSON preset file, or every .json file of a folder, return the preset names"""
+        if os.path.isdir(path):
+            names = []
+            for file_name in sorted(os.listdir(path)):
+                if file_name.lower().endswith(".json"):
+                    names += self.preload(os.path.join(path, file_name))
+            return names
+        with open(path, "r") as f:
+            data = f.read()
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        self._json[name] = data
+        return [name]
+
+    def apply(self, name: str) -> Dict:
+        """Load preset ``name`` on the device and return its (not yet complete) switch record"""
+        if name not in self._json and name not in self.available():
+            raise ValueError(f"Unknown preset: {name}")
+        with self._cond:
+            baseline = self._baseline
+            start = time.perf_counter()
+            record = {"preset": name, "previous": self.current, "apply_ms": None, "first_frame_ms": None,
+                      "stale_frames": 0, "metadata_changed": None}
+            self._pending = {"record": record, "start": start, "applied": None, "baseline": baseline,
+                             "first_after": None, "frames_after": 0}
+        try:
+            if name in self._json:
+                self.device.load_preset_from_json_data(name, self._json[name])
+            else:
+                self.device.load_preset(name)
+        except Exception:
+            with self._cond:
+                self._pending = None
+                self._cond.notify_all()
+            raise
+        applied = time.perf_counter()
+        with self._cond:
+            record["apply_ms"] = (applied - start) * 1000.0
+            if self._pending is not None and self._pending["record"] is record:
+                self._pending["applied"] = applied
+            self.switches.append(record)
+        return record
+
+    def on_frames(self, frames) -> Optional[str]:
+        """Track one frameset, return the name of the preset it was produced under"""
+        if frames is None:
+            return self.current
+        now = time.perf_counter()
+        settings = frame_settings(frames, self.fields)
+        with self._cond:
+            pending = self._pending
+            if pending is None:
+                self._baseline = settings
+                return self.current
+            record = pending["record"]
+            if pending["applied"] is None or now < pending["applied"]:
+                record["stale_frames"] += 1
+                return self.current
+            if pending["first_after"] is None:
+                pending["first_after"] = now
+            pending["frames_after"] += 1
+            if pending["baseline"] is not None and settings != pending["baseline"]:
+                record["metadata_changed"] = True
+                record["first_frame_ms"] = (now - pending["start"]) * 1000.0
+            elif pending["baseline"] is None or pending["frames_after"] > self.settle_frames:
+                record["metadata_changed"] = False
+                record["first_frame_ms"] = (pending["first_after"] - pending["start"]) * 1000.0
+            else:
+                return self.current
+            self._pending = None
+            self._baseline = settings
+            self.current = record["preset"]
+            self._cond.notify_all()
+            return self.current
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the last switch saw its first frameset, return False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None, timeout)
+
+    def get_stats(self) -> Dict:
+        done = [s for s in self.switches if s["first_frame_ms"] is not None]
+        stats = {"switches": len(self.switches), "completed": len(done)}
+        if done:
+            apply_ms = np.asarray([s["apply_ms"] for s in done])
+            first_ms = np.asarray([s["first_frame_ms"] for s in done])
+            stats.update({
+                "apply_p50_ms": round(float(np.percentile(apply_ms, 50)), 2),
+                "apply_p95_ms": round(float(np.percentile(apply_ms, 95)), 2),
+                "first_frame_p50_ms": round(float(np.percentile(first_ms, 50)), 2),
+                "first_frame_p95_ms": round(float(np.percentile(first_ms, 95)), 2),
+                "stale_frames": int(sum(s["stale_frames"] for s in done)),
+                "metadata_changed": sum(1 for s in done if s["metadata_changed"]),
+            })
+        return stats
@@ -0,0 +1,138 @@
+# ******************************************************************************
+#  Copyright (c) 2024 Orbbec 3D Technology, Inc
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http:# www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ******************************************************************************
+import json
+import os
+import threading
+from typing import NamedTuple, Optional, Sequence
+
+DEFAULT_PROFILE_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "pyorbbecsdk", "profiles.json")
+
+
+class StreamRequest(NamedTuple):
+    """Wanted stream of one sensor, zero/None fields mean "any" (all zero = default profile)"""
+    sensor: str  # OBSensorType member name, e.g. "COLOR_SENSOR"
+    width: int = 0
+    height: int = 0
+    format: Optional[str] = None  # OBFormat member name, e.g. "RGB"
+    fps: int = 0
+    optional: bool = False  # skip instead of failing if the device has no such sensor
+
+    def key(self) -> str:
+        return f"{self.sensor}:{self.width}x{self.height}:{self.format or 'ANY'}@{self.fps}"
+
+
+DEFAULT_STREAMS = (StreamRequest("COLOR_SENSOR", optional=True), StreamRequest("DEPTH_SENSOR"))
+
+
+def _resolve(pipeline, request: StreamRequest):
+    """Search the sensor's profile list, return the chosen VideoStreamProfile or None"""
+    from pyorbbecsdk import OBError, OBFormat, OBSensorType
+    try:
+        profile_list = pipeline.get_stream_profile_list(OBSensorType.__members__[request.sensor])
+        if not (request.width or request.height or request.format or request.fps):
+            return profile_list.get_default_video_stream_profile()
+        fmt = OBFormat.__members__[request.format] if request.format else OBFormat.UNKNOWN_FORMAT
+        return profile_list.get_video_stream_profile(request.width, request.height, fmt, request.fps)
+    except OBError as e:
+        if not request.optional:
+            raise
+        print(e)
+        return None
+
+
+class ProfileCache:
+    """Remember which stream profiles were chosen for each device serial number.
+
+    Resolving a request means reading the sensor's whole profile list from the
+    device, which takes tens of milliseconds per sensor and is repeated on every
+    start. Once resolved, the exact width/height/format/fps is stored in a JSON
+    file keyed by serial number and later starts enable the stream directly with
+    ``Config.enable_video_stream``. A request for a sensor the device does not
+    have is cached as absent. Call ``invalidate`` if a cached configuration no
+    longer starts (e.g. after a firmware update). With ``path=None`` the cache
+    only lives in memory.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_PROFILE_CACHE_FILE):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._profiles = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self._profiles = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring profile cache {path}: {e}")
+
+    def lookup(self, serial_number: str, request: StreamRequest):
+        """Return (found, [stream type, width, height, format, fps] or None if the sensor is absent)"""
+        with self._lock:
+            entry = self._profiles.get(serial_number, {})
+            if request.key() not in entry:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, entry[request.key()]
+
+    def put(self, serial_number: str, request: StreamRequest, profile):
+        entry = None
+        if profile is not None:
+            entry = [profile.get_type().name, profile.get_width(), profile.get_height(),
+                     profile.get_format().name, profile.get_fps()]
+        with self._lock:
+            self._profiles.setdefault(serial_number, {})[request.key()] = entry
+
+    def invalidate(self, serial_number: str):
+        with self._lock:
+            self._profiles.pop(serial_number, None)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._profiles, indent=4)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def build_config(self, pipeline, serial_number: str, requests: Sequence[StreamRequest] = DEFAULT_STREAMS):
+        return build_config(pipeline, requests, serial_number, self)
+
+
+def build_config(pipeline, requests: Sequence[StreamRequest] = DEFAULT_STREAMS,
+                 serial_number: Optional[str] = None, cache: Optional[ProfileCache] = None):
+    """Create a Config enabling every request, from the cache where possible"""
+    from pyorbbecsdk import Config, OBFormat, OBStreamType
+    config = Config()
+    for request in requests:
+        if cache is not None and serial_number:
+            found, entry = cache.lookup(serial_number, request)
+            if found:
+                if entry is not None:
+                    stream_type, width, height, fmt, fps = entry
+                    config.enable_video_stream(OBStreamType.__members__[stream_type], width, height, fps,
+                                               OBFormat.__members__[fmt])
+                continue
+        profile = _resolve(pipeline, request)
+        if profile is not None:
+            config.enable_stream(profile)
+        if cache is not None and serial_number:
+            cache.put(serial_number, request, profile)
+    return config
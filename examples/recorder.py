@@ -14,6 +14,9 @@
 #  limitations under the License.
 # ******************************************************************************
 
+import threading
+import time
+
 import cv2
 import numpy as np
 from pyorbbecsdk import *
@@ -28,9 +31,51 @@ cached_frames = {
     'right_ir': None,
     'ir': None
 }
-
-def setup_camera():
-    """Setup camera and stream configuration"""
+IMU_CHUNK_SIZE = 20  # IMU samples handed to Python at once
+
+
+class LatestValue:
+    """Single-slot handoff between threads: writers overwrite, readers take the newest"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = None
+        self._seq = 0
+
+    def put(self, value):
+        with self._lock:
+            self._value = value
+            self._seq += 1
+
+    def get(self):
+        """Return (sequence number, value), the number changes on every put"""
+        with self._lock:
+            return self._seq, self._value
+
+
+class RateMeter:
+    """Counts events and reports the achieved rate over the last interval"""
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.total = 0
+        self.rate = 0.0
+        self._count = 0
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def tick(self, count=1):
+        with self._lock:
+            self.total += count
+            self._count += count
+            now = time.perf_counter()
+            if now - self._start >= self.interval:
+                self.rate = self._count / (now - self._start)
+                self._count = 0
+                self._start = now
+
+def setup_camera(on_frames):
+    """Setup camera and stream configuration, frame sets are delivered to on_frames"""
     pipeline = Pipeline()
     config = Config()
     device = pipeline.get_device()
@@ -52,17 +97,33 @@ def setup_camera():
         except:
             continue
 
-    pipeline.start(config)
+    pipeline.start(config, on_frames)
     return pipeline
 
-def setup_imu():
-    """Setup IMU configuration"""
-    pipeline = Pipeline()   
-    config = Config()
-    config.enable_accel_stream()
-    config.enable_gyro_stream()
-    pipeline.start(config)
-    return pipeline
+def setup_imu(device, latest_imu, rates):
+    """Start accel and gyro sensors, their newest sample goes to latest_imu from the SDK threads"""
+    batchers = []
+    for name, sensor_type in (('accel', OBSensorType.ACCEL_SENSOR), ('gyro', OBSensorType.GYRO_SENSOR)):
+        try:
+            sensor = device.get_sensor(sensor_type)
+            profile = sensor.get_stream_profile_list().get_stream_profile_by_index(0)
+        except OBError as e:
+            print(f"No {name} sensor: {e}")
+            continue
+        latest = LatestValue()
+        latest_imu[name] = latest
+        rates[name] = RateMeter()
+
+        def on_chunk(chunk, latest=latest, rate=rates[name]):
+            samples, _ = chunk
+            rate.tick(len(samples))
+            latest.put(samples[-1])
+
+        batcher = IMUBatcher(IMU_CHUNK_SIZE)
+        batcher.set_callback(on_chunk)
+        batcher.start(sensor, profile)
+        batchers.append(batcher)
+    return batchers
 
 def process_color(frame):
     """Process color image"""
@@ -121,14 +182,14 @@ def process_ir(ir_frame):
     ir_data = ir_data.astype(data_type)
     return cv2.cvtColor(ir_data, cv2.COLOR_GRAY2RGB)
 
-def get_imu_text(frame, name):
-    """Format IMU data"""
-    if not frame:
+def get_imu_text(sample, name):
+    """Format IMU data, sample is [timestamp_us, x, y, z]"""
+    if sample is None:
         return []
     return [
-        f"{name} x: {frame.get_x():.2f}",
-        f"{name} y: {frame.get_y():.2f}",
-        f"{name} z: {frame.get_z():.2f}"
+        f"{name} x: {sample[1]:.2f}",
+        f"{name} y: {sample[2]:.2f}",
+        f"{name} z: {sample[3]:.2f}"
     ]
 
 
@@ -157,9 +218,32 @@ def create_display(frames, width=1280, height=720):
                             cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
             y_offset += 80
 
+    # Achieved rate of every stream
+    for i, line in enumerate(frames.get('rates', [])):
+        cv2.putText(display, line, (w + 10, height - 20 - i * 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+
     return display
 
 
+def process_video(frames):
+    """Convert a video FrameSet into the images shown by create_display"""
+    processed_frames = {'color': process_color(frames.get_color_frame()),
+                        'depth': process_depth(frames.get_depth_frame())}
+
+    # Process IR image: try stereo IR first, fallback to mono if unavailable
+    try:
+        left = process_ir(frames.get_frame(OBFrameType.LEFT_IR_FRAME).as_video_frame())
+        right = process_ir(frames.get_frame(OBFrameType.RIGHT_IR_FRAME).as_video_frame())
+        if left is not None and right is not None:
+            processed_frames['ir'] = np.hstack((left, right))
+    except:
+        ir_frame = frames.get_ir_frame()
+        if ir_frame:
+            processed_frames['ir'] = process_ir(ir_frame.as_video_frame())
+    return processed_frames
+
+
 def main():
     # Window settings
     WINDOW_NAME = "MultiStream Record Viewer"
@@ -168,52 +252,51 @@ def main():
     DISPLAY_WIDTH = 1280
     DISPLAY_HEIGHT = 720
 
+    # Video, IMU and display run independently: the SDK threads only store their newest
+    # data, the display (this thread) renders whatever is newest at its own pace. Recording
+    # happens inside the SDK and never waits for either.
+    latest_video = LatestValue()
+    latest_imu = {}
+    rates = {'video': RateMeter(), 'display': RateMeter()}
+
+    def on_video(frames):
+        if frames is not None:
+            rates['video'].tick()
+            latest_video.put(frames)
+
     # Initialize camera
-    pipeline = setup_camera()
+    pipeline = setup_camera(on_video)
     device = pipeline.get_device()
     # initialize recording
     recorder = RecordDevice(device, file_path)
-    imu_pipeline = setup_imu()
+    imu_batchers = setup_imu(device, latest_imu, rates)
     cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
     cv2.resizeWindow(WINDOW_NAME, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+    last_seq = 0
+    last_imu_seqs = {}
+    processed_frames = {}
     while True:
-        # Get all frames
-        frames = pipeline.wait_for_frames(100)
-        if not frames:
-            continue
-        # Process different frame types
-        processed_frames = {'color': process_color(frames.get_color_frame()),
-                            'depth': process_depth(frames.get_depth_frame())}
-
-        # Process IR image: try stereo IR first, fallback to mono if unavailable
-        try:
-            left = process_ir(frames.get_frame(OBFrameType.LEFT_IR_FRAME).as_video_frame())
-            right = process_ir(frames.get_frame(OBFrameType.RIGHT_IR_FRAME).as_video_frame())
-            if left is not None and right is not None:
-                processed_frames['ir'] = np.hstack((left, right))
-        except:
-            ir_frame = frames.get_ir_frame()
-            if ir_frame:
-                processed_frames['ir'] = process_ir(ir_frame.as_video_frame())
-
-        # Process IMU data
-        imu_frames = imu_pipeline.wait_for_frames(100)
-        if not imu_frames:
-            continue
-        accel = imu_frames.get_frame(OBFrameType.ACCEL_FRAME)
-        gyro = imu_frames.get_frame(OBFrameType.GYRO_FRAME)
-        if accel and gyro:
-            processed_frames['imu'] = {
-                'accel': accel.as_accel_frame(),
-                'gyro': gyro.as_gyro_frame()
-            }
-
-        # create display
-        display = create_display(processed_frames, DISPLAY_WIDTH, DISPLAY_HEIGHT)
-        cv2.imshow(WINDOW_NAME, display)
+        seq, frames = latest_video.get()
+        new_video = seq != last_seq
+        if new_video:
+            last_seq = seq
+            processed_frames = process_video(frames)
+        imu = {name: latest.get() for name, latest in latest_imu.items()}
+        imu_seqs = {name: value[0] for name, value in imu.items()}
+        if new_video or imu_seqs != last_imu_seqs:
+            last_imu_seqs = imu_seqs
+            processed_frames['imu'] = {name: value[1] for name, value in imu.items()}
+            processed_frames['rates'] = [f"{name}: {rate.rate:.1f} Hz" for name, rate in rates.items()]
+
+            # create display
+            display = create_display(processed_frames, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+            cv2.imshow(WINDOW_NAME, display)
+            if new_video:
+                # frame sets actually shown, not passes of this loop
+                rates['display'].tick()
 
         # check exit key
-        key = cv2.waitKey(1) & 0xFF
+        key = cv2.waitKey(10) & 0xFF
         if key == ord('s'):
             global is_paused
             if not is_paused:
@@ -227,9 +310,13 @@ def main():
         if key in (ord('q'), 27):
             break
 
+    for batcher in imu_batchers:
+        batcher.stop()
     pipeline.stop()
-    recorder = None 
+    recorder = None
     cv2.destroyAllWindows()
+    for name, rate in rates.items():
+        print(f"{name}: {rate.total} total, last {rate.rate:.1f} Hz")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,261 @@
+# ******************************************************************************
+#  Copyright (c) 2024 Orbbec 3D Technology, Inc
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http:# www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ******************************************************************************
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from profile_cache import DEFAULT_STREAMS, ProfileCache, StreamRequest, build_config
+
+CONNECTED = "connected"
+DISCONNECTED = "disconnected"
+RECONNECTING = "reconnecting"
+
+logger = logging.getLogger("resilient_pipeline")
+
+
+class ResilientPipeline:
+    """A Pipeline that comes back by itself when its device is unplugged and replugged.
+
+    The first start resolves the stream profiles through a ProfileCache and
+    remembers the properties set through ``set_property`` and the filters to
+    run on every frame set. When the device changed callback reports the same
+    serial number again, a worker thread reopens it, reapplies the properties
+    and starts a new Pipeline from the cached profiles, so no profile list is
+    read again. If the device is not connected when ``start`` is called, the
+    first plug-in of it (or of any device when no serial number was given) is
+    opened the same way. ``filters`` process the whole frame set (e.g.
+    AlignFilter) and ``depth_filters`` only its depth frame (e.g.
+    TemporalFilter, HoleFillingFilter); both run in order before
+    ``on_frames``. A failed reopen (e.g. the device is still enumerating) is
+    retried with exponential backoff from ``retry_delay_s`` up to
+    ``max_retry_delay_s`` until it succeeds or ``stop`` is called; another
+    plug-in event retries at once. Every attempt is recorded with the time from
+    the plug-in event to ``start`` returning and, once it succeeds, to the
+    first frame set.
+    """
+
+    def __init__(self, on_frames: Callable, serial_number: Optional[str] = None,
+                 streams: Sequence[StreamRequest] = DEFAULT_STREAMS, profile_cache: Optional[ProfileCache] = None,
+                 filters: Sequence = (), depth_filters: Sequence = (), context=None,
+                 retry_delay_s: float = 0.5, max_retry_delay_s: float = 8.0):
+        if context is None:
+            from pyorbbecsdk import Context
+            context = Context()
+        self.context = context
+        self.on_frames = on_frames
+        self.serial_number = serial_number
+        self.streams = streams
+        self.profile_cache = profile_cache if profile_cache is not None else ProfileCache(None)
+        self.filters = list(filters)
+        self.depth_filters = list(depth_filters)
+        self.retry_delay_s = retry_delay_s
+        self.max_retry_delay_s = max_retry_delay_s
+        self.properties: Dict = {}
+        self.state = DISCONNECTED
+        self.device = None
+        self.pipeline = None
+        self.reconnects: List[dict] = []
+        self._lock = threading.RLock()
+        self._disconnected_at = None
+        self._plugged_at = None
+        self._pending = None
+        self._running = False
+        self._reconnecting = False
+        self._wake = threading.Event()
+        self.context.set_device_changed_callback(self._on_device_changed)
+
+    def _create_pipeline(self, device):
+        from pyorbbecsdk import Pipeline
+        return Pipeline(device)
+
+    def _make_frame_set(self, frames):
+        from pyorbbecsdk import create_frame_set
+        return create_frame_set(frames)
+
+    def _build_config(self, pipeline):
+        return build_config(pipeline, self.streams, self.serial_number, self.profile_cache)
+
+    def _apply_property(self, device, property_id, value):
+        if isinstance(value, bool):
+            device.set_bool_property(property_id, value)
+        elif isinstance(value, float):
+            device.set_float_property(property_id, value)
+        else:
+            device.set_int_property(property_id, value)
+
+    def set_property(self, property_id, value):
+        """Set a device property now and again after every reconnect"""
+        with self._lock:
+            self.properties[property_id] = value
+            if self.device is not None:
+                self._apply_property(self.device, property_id, value)
+
+    def _open(self, device):
+        for property_id, value in self.properties.items():
+            self._apply_property(device, property_id, value)
+        pipeline = self._create_pipeline(device)
+        try:
+            pipeline.start(self._build_config(pipeline), self._on_frames)
+        except Exception:
+            # the cached profiles may be stale (e.g. new firmware), search them again once
+            self.profile_cache.invalidate(self.serial_number)
+            pipeline.start(self._build_config(pipeline), self._on_frames)
+        self.device = device
+        self.pipeline = pipeline
+        self.state = CONNECTED
+
+    def start(self):
+        """Open the device with ``serial_number`` (or the first one) and start streaming.
+
+        Without a matching device this returns at once and the device is opened
+        when it is plugged in.
+        """
+        device_list = self.context.query_devices()
+        serials = self._serials(device_list)
+        with self._lock:
+            self._running = True
+            self._wake.clear()
+            if self.serial_number is None and serials:
+                self.serial_number = serials[0]
+            if self.serial_number not in serials:
+                self._disconnected_at = time.perf_counter()
+                self.state = DISCONNECTED
+                logger.info("Waiting for device %s to be plugged in", self.serial_number or "")
+                return
+            self._open(device_list.get_device_by_serial_number(self.serial_number))
+        if self.profile_cache.misses:
+            self.profile_cache.save()
+
+    def _on_frames(self, frames):
+        if frames is None:
+            return
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            pending["first_frame_ms"] = (time.perf_counter() - self._plugged_at) * 1000.0
+            pending["downtime_ms"] = (time.perf_counter() - self._disconnected_at) * 1000.0
+            logger.info("Device %s back, first frame after %.0f ms", self.serial_number, pending["first_frame_ms"])
+        frames = self._apply_filters(frames)
+        if frames is not None:
+            self.on_frames(frames)
+
+    def _apply_filters(self, frames):
+        for frame_filter in self.filters:
+            # Filter.process hands back a plain Frame, the callback needs the FrameSet
+            frames = frame_filter.process(frames)
+            frames = frames.as_frame_set() if frames else None
+            if frames is None:
+                return None
+        if not self.depth_filters:
+            return frames
+        depth = frames.get_depth_frame()
+        if depth is None:
+            return frames
+        for frame_filter in self.depth_filters:
+            depth = frame_filter.process(depth)
+            if depth is None:
+                return None
+        others = [frames.get_frame_by_index(i) for i in range(frames.get_count())]
+        others = [frame for frame in others if frame.get_type() != depth.get_type()]
+        return self._make_frame_set(others + [depth])
+
+    def _serials(self, device_list):
+        return [device_list.get_device_serial_number_by_index(i) for i in range(device_list.get_count())]
+
+    def _on_device_changed(self, removed_list, added_list):
+        if not self._running:
+            return
+        if self.serial_number is None:
+            # started before any device was connected, take the first one plugged in
+            added = self._serials(added_list)
+            if not added:
+                return
+            with self._lock:
+                if self.serial_number is None:
+                    self.serial_number = added[0]
+        if self.serial_number in self._serials(removed_list):
+            with self._lock:
+                self._disconnected_at = time.perf_counter()
+                self.state = DISCONNECTED
+                pipeline, self.pipeline, self.device = self.pipeline, None, None
+            logger.warning("Device %s disconnected", self.serial_number)
+            if pipeline is not None:
+                # stop() waits for the SDK threads, don't block the SDK callback thread on it
+                threading.Thread(target=pipeline.stop, daemon=True).start()
+        if self.serial_number in self._serials(added_list):
+            self._plugged_at = time.perf_counter()
+            with self._lock:
+                if self._reconnecting:
+                    # a retry loop is already waiting, let it try again now
+                    self._wake.set()
+                    return
+                self._reconnecting = True
+            threading.Thread(target=self._reconnect, args=(added_list,), name="Reconnect", daemon=True).start()
+
+    def _try_reconnect(self, device_list) -> bool:
+        """One reopen attempt, return True when there is nothing left to retry"""
+        with self._lock:
+            if not self._running or self.state == CONNECTED:
+                self._reconnecting = False
+                return True
+            self.state = RECONNECTING
+            record = {"serial_number": self.serial_number}
+            try:
+                device = device_list.get_device_by_serial_number(self.serial_number)
+                self._pending = record
+                self._open(device)
+            except Exception as e:
+                self._pending = None
+                self.state = DISCONNECTED
+                record["error"] = str(e)
+                logger.warning("Reconnecting %s failed: %s", self.serial_number, e)
+            record["start_ms"] = (time.perf_counter() - self._plugged_at) * 1000.0
+            self.reconnects.append(record)
+            if self.state == CONNECTED:
+                self._reconnecting = False
+                if self.profile_cache.misses:
+                    self.profile_cache.save()
+                return True
+            return False
+
+    def _reconnect(self, added_list):
+        delay = self.retry_delay_s
+        device_list = added_list
+        while not self._try_reconnect(device_list):
+            self._wake.wait(delay)
+            self._wake.clear()
+            delay = min(delay * 2, self.max_retry_delay_s)
+            try:
+                device_list = self.context.query_devices()
+            except Exception as e:
+                logger.warning("Querying devices failed: %s", e)
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            pipeline, self.pipeline, self.device = self.pipeline, None, None
+            self.state = DISCONNECTED
+        self._wake.set()
+        if pipeline is not None:
+            pipeline.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
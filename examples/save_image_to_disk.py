@@ -15,14 +15,14 @@
 # ******************************************************************************
 import os
 
-import cv2
 import numpy as np
 
 from pyorbbecsdk import *
+from image_writer import ImageWriter
 from utils import frame_to_bgr_image
 
 
-def save_depth_frame(frame: DepthFrame, index):
+def save_depth_frame(frame: DepthFrame, index, writer: ImageWriter):
     if frame is None:
         return
     width = frame.get_width()
@@ -41,10 +41,10 @@ def save_depth_frame(frame: DepthFrame, index):
     if not os.path.exists(save_image_dir):
         os.mkdir(save_image_dir)
     raw_filename = save_image_dir + "/depth_{}x{}_{}_{}.raw".format(width, height, index, timestamp)
-    data.tofile(raw_filename)
+    writer.submit(raw_filename, data)
 
 
-def save_color_frame(frame: ColorFrame, index):
+def save_color_frame(frame: ColorFrame, index, writer: ImageWriter):
     if frame is None:
         return
     width = frame.get_width()
@@ -58,7 +58,7 @@ def save_color_frame(frame: ColorFrame, index):
     if image is None:
         print("failed to convert frame to image")
         return
-    cv2.imwrite(filename, image)
+    writer.submit(filename, image)
 
 
 def main():
@@ -80,6 +80,7 @@ def main():
         depth_profile = depth_profile_list.get_default_video_stream_profile()
         config.enable_stream(depth_profile)
     pipeline.start(config)
+    writer = ImageWriter(num_workers=2, max_queue_size=16)
     while True:
         try:
             frames = pipeline.wait_for_frames(100)
@@ -92,14 +93,17 @@ def main():
                 break
             color_frame = frames.get_color_frame()
             if color_frame is not None and saved_color_cnt < 5:
-                save_color_frame(color_frame, saved_color_cnt)
+                save_color_frame(color_frame, saved_color_cnt, writer)
                 saved_color_cnt += 1
             depth_frame = frames.get_depth_frame()
             if depth_frame is not None and saved_depth_cnt < 5:
-                save_depth_frame(depth_frame, saved_depth_cnt)
+                save_depth_frame(depth_frame, saved_depth_cnt, writer)
                 saved_depth_cnt += 1
         except KeyboardInterrupt:
             break
+    pipeline.stop()
+    writer.close()
+    print("write stats: {}".format(writer.get_stats()))
 
 
 if __name__ == "__main__":
@@ -22,58 +22,57 @@ from pyorbbecsdk import FormatConvertFilter, VideoFrame
 from pyorbbecsdk import OBFormat, OBConvertFormat
 
 
-def yuyv_to_bgr(frame: np.ndarray, width: int, height: int) -> np.ndarray:
-    yuyv = frame.reshape((height, width, 2))
-    bgr_image = cv2.cvtColor(yuyv, cv2.COLOR_YUV2BGR_YUY2)
-    return bgr_image
+def yuyv_to_bgr(frame: np.ndarray, width: int, height: int, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    yuyv = frame[:width * height * 2].reshape((height, width, 2))
+    return cv2.cvtColor(yuyv, cv2.COLOR_YUV2BGR_YUY2, dst=dst)
 
 
-def uyvy_to_bgr(frame: np.ndarray, width: int, height: int) -> np.ndarray:
-    uyvy = frame.reshape((height, width, 2))
-    bgr_image = cv2.cvtColor(uyvy, cv2.COLOR_YUV2BGR_UYVY)
-    return bgr_image
+def uyvy_to_bgr(frame: np.ndarray, width: int, height: int, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    uyvy = frame[:width * height * 2].reshape((height, width, 2))
+    return cv2.cvtColor(uyvy, cv2.COLOR_YUV2BGR_UYVY, dst=dst)
 
 
-def i420_to_bgr(frame: np.ndarray, width: int, height: int) -> np.ndarray:
-    y = frame[0:height, :]
-    u = frame[height:height + height // 4].reshape(height // 2, width // 2)
-    v = frame[height + height // 4:].reshape(height // 2, width // 2)
-    yuv_image = cv2.merge([y, u, v])
-    bgr_image = cv2.cvtColor(yuv_image, cv2.COLOR_YUV2BGR_I420)
-    return bgr_image
+# The planar and semi-planar YUV 4:2:0 formats are a single (height * 3 / 2, width)
+# plane as far as OpenCV is concerned, no need to split and merge the planes.
+def i420_to_bgr(frame: np.ndarray, width: int, height: int, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    yuv_image = frame[:width * height * 3 // 2].reshape((height * 3 // 2, width))
+    return cv2.cvtColor(yuv_image, cv2.COLOR_YUV2BGR_I420, dst=dst)
 
 
-def nv21_to_bgr(frame: np.ndarray, width: int, height: int) -> np.ndarray:
-    y = frame[0:height, :]
-    uv = frame[height:height + height // 2].reshape(height // 2, width)
-    yuv_image = cv2.merge([y, uv])
-    bgr_image = cv2.cvtColor(yuv_image, cv2.COLOR_YUV2BGR_NV21)
-    return bgr_image
+def nv21_to_bgr(frame: np.ndarray, width: int, height: int, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    yuv_image = frame[:width * height * 3 // 2].reshape((height * 3 // 2, width))
+    return cv2.cvtColor(yuv_image, cv2.COLOR_YUV2BGR_NV21, dst=dst)
 
 
-def nv12_to_bgr(frame: np.ndarray, width: int, height: int) -> np.ndarray:
-    y = frame[0:height, :]
-    uv = frame[height:height + height // 2].reshape(height // 2, width)
-    yuv_image = cv2.merge([y, uv])
-    bgr_image = cv2.cvtColor(yuv_image, cv2.COLOR_YUV2BGR_NV12)
-    return bgr_image
+def nv12_to_bgr(frame: np.ndarray, width: int, height: int, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    yuv_image = frame[:width * height * 3 // 2].reshape((height * 3 // 2, width))
+    return cv2.cvtColor(yuv_image, cv2.COLOR_YUV2BGR_NV12, dst=dst)
 
 
 def determine_convert_format(frame: VideoFrame):
-    if frame.get_format() == OBFormat.I420:
-        return OBConvertFormat.I420_TO_RGB888
-    elif frame.get_format() == OBFormat.MJPG:
-        return OBConvertFormat.MJPG_TO_RGB888
-    elif frame.get_format() == OBFormat.YUYV:
-        return OBConvertFormat.YUYV_TO_RGB888
-    elif frame.get_format() == OBFormat.NV21:
-        return OBConvertFormat.NV21_TO_RGB888
-    elif frame.get_format() == OBFormat.NV12:
-        return OBConvertFormat.NV12_TO_RGB888
-    elif frame.get_format() == OBFormat.UYVY:
-        return OBConvertFormat.UYVY_TO_RGB888
-    else:
-        return None
+    return _CONVERT_FORMATS.get(frame.get_format())
+
+
+_CONVERT_FORMATS = {
+    OBFormat.I420: OBConvertFormat.I420_TO_RGB888,
+    OBFormat.MJPG: OBConvertFormat.MJPG_TO_RGB888,
+    OBFormat.YUYV: OBConvertFormat.YUYV_TO_RGB888,
+    OBFormat.NV21: OBConvertFormat.NV21_TO_RGB888,
+    OBFormat.NV12: OBConvertFormat.NV12_TO_RGB888,
+    OBFormat.UYVY: OBConvertFormat.UYVY_TO_RGB888,
+}
+
+# One FormatConvertFilter per conversion, creating a filter for every frame is expensive
+_convert_filters = {}
+
+
+def get_format_convert_filter(convert_format: OBConvertFormat) -> FormatConvertFilter:
+    convert_filter = _convert_filters.get(convert_format)
+    if convert_filter is None:
+        convert_filter = FormatConvertFilter()
+        convert_filter.set_format_convert_format(convert_format)
+        _convert_filters[convert_format] = convert_filter
+    return convert_filter
 
 
 def frame_to_rgb_frame(frame: VideoFrame) -> Union[Optional[VideoFrame], Any]:
@@ -83,45 +82,111 @@ def frame_to_rgb_frame(frame: VideoFrame) -> Union[Optional[VideoFrame], Any]:
     if convert_format is None:
         print("Unsupported format")
         return None
-    print("covert format: {}".format(convert_format))
-    convert_filter = FormatConvertFilter()
-    convert_filter.set_format_convert_format(convert_format)
-    rgb_frame = convert_filter.process(frame)
+    rgb_frame = get_format_convert_filter(convert_format).process(frame)
     if rgb_frame is None:
         print("Convert {} to RGB failed".format(frame.get_format()))
     return rgb_frame
 
 
+_YUV_TO_BGR = {
+    OBFormat.YUYV: yuyv_to_bgr,
+    OBFormat.UYVY: uyvy_to_bgr,
+    OBFormat.I420: i420_to_bgr,
+    OBFormat.NV12: nv12_to_bgr,
+    OBFormat.NV21: nv21_to_bgr,
+}
+
+
 def frame_to_bgr_image(frame: VideoFrame) -> Union[Optional[np.array], Any]:
     width = frame.get_width()
     height = frame.get_height()
     color_format = frame.get_format()
     data = np.asanyarray(frame.get_data())
-    image = np.zeros((height, width, 3), dtype=np.uint8)
     if color_format == OBFormat.RGB:
-        image = np.resize(data, (height, width, 3))
+        image = data[:width * height * 3].reshape((height, width, 3))
         image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
     elif color_format == OBFormat.BGR:
-        image = np.resize(data, (height, width, 3))
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    elif color_format == OBFormat.YUYV:
-        image = np.resize(data, (height, width, 2))
-        image = cv2.cvtColor(image, cv2.COLOR_YUV2BGR_YUYV)
+        # get_data already returns a copy, the bytes are in BGR order as they are
+        image = data[:width * height * 3].reshape((height, width, 3))
     elif color_format == OBFormat.MJPG:
         image = cv2.imdecode(data, cv2.IMREAD_COLOR)
-    elif color_format == OBFormat.I420:
-        image = i420_to_bgr(data, width, height)
-        return image
-    elif color_format == OBFormat.NV12:
-        image = nv12_to_bgr(data, width, height)
-        return image
-    elif color_format == OBFormat.NV21:
-        image = nv21_to_bgr(data, width, height)
-        return image
-    elif color_format == OBFormat.UYVY:
-        image = np.resize(data, (height, width, 2))
-        image = cv2.cvtColor(image, cv2.COLOR_YUV2BGR_UYVY)
+    elif color_format in _YUV_TO_BGR:
+        image = _YUV_TO_BGR[color_format](data, width, height)
     else:
         print("Unsupported color format: {}".format(color_format))
         return None
     return image
+
+
+# (channels of the packed input, BGR code, RGB code); 1 channel means a (height * 3 / 2, width) YUV 4:2:0 plane
+_CVT_CODES = {
+    OBFormat.RGB: (3, cv2.COLOR_RGB2BGR, None),
+    OBFormat.BGR: (3, None, cv2.COLOR_BGR2RGB),
+    OBFormat.YUYV: (2, cv2.COLOR_YUV2BGR_YUY2, cv2.COLOR_YUV2RGB_YUY2),
+    OBFormat.UYVY: (2, cv2.COLOR_YUV2BGR_UYVY, cv2.COLOR_YUV2RGB_UYVY),
+    OBFormat.I420: (1, cv2.COLOR_YUV2BGR_I420, cv2.COLOR_YUV2RGB_I420),
+    OBFormat.NV12: (1, cv2.COLOR_YUV2BGR_NV12, cv2.COLOR_YUV2RGB_NV12),
+    OBFormat.NV21: (1, cv2.COLOR_YUV2BGR_NV21, cv2.COLOR_YUV2RGB_NV21),
+}
+
+
+class FrameConverter:
+    """Convert color frames of one (format, width, height) into a reused output buffer.
+
+    ``convert`` writes into the same preallocated array on every call, so the
+    result is only valid until the next call; copy it if it has to be kept.
+    When the frame already is in the requested channel order (RGB frame with
+    ``output="rgb"``, BGR frame with ``output="bgr"``) the data is only reshaped.
+    With ``use_sdk=True`` the frame goes through a cached native
+    ``FormatConvertFilter`` to RGB first, e.g. for MJPG, which OpenCV can not
+    decode into an existing buffer.
+    """
+
+    def __init__(self, color_format: OBFormat, width: int, height: int, output: str = "bgr",
+                 use_sdk: bool = False):
+        if output not in ("bgr", "rgb"):
+            raise ValueError(f"Invalid output: {output}")
+        self.color_format = color_format
+        self.width = width
+        self.height = height
+        self.output = output
+        self._dst = np.empty((height, width, 3), dtype=np.uint8)
+        self._convert_filter = None
+        if use_sdk and color_format in _CONVERT_FORMATS:
+            self._convert_filter = get_format_convert_filter(_CONVERT_FORMATS[color_format])
+
+    @classmethod
+    def for_frame(cls, frame: VideoFrame, **kwargs) -> "FrameConverter":
+        return cls(frame.get_format(), frame.get_width(), frame.get_height(), **kwargs)
+
+    def matches(self, frame: VideoFrame) -> bool:
+        return (frame.get_format() == self.color_format and frame.get_width() == self.width
+                and frame.get_height() == self.height)
+
+    def convert(self, frame: VideoFrame) -> Optional[np.ndarray]:
+        color_format = self.color_format
+        if self._convert_filter is not None:
+            frame = self._convert_filter.process(frame)
+            if frame is None:
+                return None
+            color_format = OBFormat.RGB
+        data = np.asanyarray(frame.get_data())
+        if color_format == OBFormat.MJPG:
+            image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+            if image is not None and self.output == "rgb":
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._dst)
+            return image
+        codes = _CVT_CODES.get(color_format)
+        if codes is None:
+            print("Unsupported color format: {}".format(color_format))
+            return None
+        channels, bgr_code, rgb_code = codes
+        width, height = self.width, self.height
+        if channels == 1:
+            packed = data[:width * height * 3 // 2].reshape((height * 3 // 2, width))
+        else:
+            packed = data[:width * height * channels].reshape((height, width, channels))
+        code = bgr_code if self.output == "bgr" else rgb_code
+        if code is None:
+            return packed
+        return cv2.cvtColor(packed, code, dst=self._dst)
@@ -0,0 +1,638 @@
+# ******************************************************************************
+#  Copyright (c) 2024 Orbbec 3D Technology, Inc
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http:# www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ******************************************************************************
+import csv
+import json
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+# Set to a recording folder to make create_pipeline() play it instead of opening a camera.
+VIRTUAL_SOURCE_ENV = "ORBBEC_VIRTUAL_SOURCE"
+VIRTUAL_FPS_ENV = "ORBBEC_VIRTUAL_FPS"
+CAMERA_PARAM_FILE = "camera_param.json"
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+# depth_640x480_12_1700000000.raw as written by save_image_to_disk.py
+FRAME_SIZE_PATTERN = re.compile(r"_(\d+)x(\d+)_")
+
+STREAMING = "streaming"
+STOPPED = "stopped"
+FINISHED = "finished"  # every frame was served once and loop is off
+
+
+class Sample(NamedTuple):
+    """One recorded color/depth pair, paths or None for a missing stream"""
+    color: Optional[str]
+    depth: Optional[str]
+    depth_scale: float = 1.0
+
+
+def _is_depth_file(path: str) -> bool:
+    name = os.path.basename(path).lower()
+    folder = os.path.basename(os.path.dirname(path)).lower()
+    return name.endswith((".raw", ".png")) and (name.endswith(".raw") or name.startswith("depth") or
+                                                folder in ("depth", "depth_images"))
+
+
+def scan_source(path: str) -> List[Sample]:
+    """List the recorded pairs of a session folder or of a folder of images.
+
+    A folder with ``manifest.csv`` (DatasetRecorder) is read row by row. Any
+    other folder is searched one level deep: ``.raw`` files and files named
+    ``depth*`` or inside a ``depth``/``depth_images`` folder are depth, every
+    other image is color, and the two sorted lists are paired by position.
+    """
+    manifest = os.path.join(path, "manifest.csv")
+    if os.path.exists(manifest):
+        samples = []
+        with open(manifest, newline="") as f:
+            for row in csv.DictReader(f):
+                color = os.path.join(path, row["color_file"]) if row.get("color_file") else None
+                depth = os.path.join(path, row["depth_file"]) if row.get("depth_file") else None
+                scale = float(row["depth_scale"]) if row.get("depth_scale") else 1.0
+                samples.append(Sample(color, depth, scale))
+        return samples
+
+    files = []
+    for name in sorted(os.listdir(path)):
+        full = os.path.join(path, name)
+        if os.path.isdir(full):
+            files += [os.path.join(full, n) for n in sorted(os.listdir(full))]
+        else:
+            files.append(full)
+    colors, depths = [], []
+    for file_path in files:
+        lower = file_path.lower()
+        if _is_depth_file(file_path):
+            depths.append(file_path)
+        elif lower.endswith(IMAGE_EXTS):
+            colors.append(file_path)
+    count = max(len(colors), len(depths))
+    return [Sample(colors[i] if i < len(colors) else None, depths[i] if i < len(depths) else None)
+            for i in range(count)]
+
+
+def read_color(path: str) -> np.ndarray:
+    """RGB image of a color file, as an RGB color frame carries it"""
+    image = cv2.imread(path, cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError(f"Cannot read image {path}")
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def read_depth(path: str) -> np.ndarray:
+    """uint16 depth of a 16-bit PNG or of a .raw file with its size in the name"""
+    if path.lower().endswith(".raw"):
+        match = FRAME_SIZE_PATTERN.search(os.path.basename(path))
+        if match is None:
+            raise ValueError(f"No <width>x<height> in the name of {path}")
+        width, height = int(match.group(1)), int(match.group(2))
+        return np.fromfile(path, dtype=np.uint16).reshape((height, width))
+    depth = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if depth is None or depth.dtype != np.uint16:
+        raise ValueError(f"{path} is not a 16-bit depth image")
+    return depth
+
+
+def camera_param_to_dict(param) -> Dict:
+    """Intrinsics of an OBCameraParam as a JSON friendly dict"""
+    keys = ("fx", "fy", "cx", "cy", "width", "height")
+    return {name: {key: getattr(getattr(param, name), key) for key in keys}
+            for name in ("rgb_intrinsic", "depth_intrinsic")}
+
+
+def save_camera_param(param, folder: str) -> str:
+    """Write the camera intrinsics next to a recording so VirtualPipeline can serve them"""
+    path = os.path.join(folder, CAMERA_PARAM_FILE)
+    with open(path, "w") as f:
+        json.dump(camera_param_to_dict(param), f, indent=4)
+    return path
+
+
+class CameraIntrinsic(NamedTuple):
+    fx: float
+    fy: float
+    cx: float
+    cy: float
+    width: int
+    height: int
+
+
+class CameraParam:
+    """What Pipeline.get_camera_param returns, with the intrinsics only"""
+
+    def __init__(self, rgb_intrinsic: CameraIntrinsic, depth_intrinsic: CameraIntrinsic):
+        self.rgb_intrinsic = rgb_intrinsic
+        self.depth_intrinsic = depth_intrinsic
+
+    def __repr__(self):
+        return f"CameraParam(rgb_intrinsic={self.rgb_intrinsic}, depth_intrinsic={self.depth_intrinsic})"
+
+
+def default_intrinsic(width: int, height: int) -> CameraIntrinsic:
+    # ไม่มี camera_param.json: สมมติ FOV แนวนอนราว 53 องศา (fx = width)
+    return CameraIntrinsic(float(width), float(width), (width - 1) / 2.0, (height - 1) / 2.0, width, height)
+
+
+class VirtualFrame:
+    """Color or depth frame with the accessors of VideoFrame/ColorFrame/DepthFrame.
+
+    ``frame_type`` and ``format`` are OBFrameType/OBFormat member names
+    ("COLOR_FRAME", "RGB", ...). The data is shared with the pipeline's cache and
+    read only.
+    """
+
+    def __init__(self, frame_type: str, format: str, image: np.ndarray, timestamp_us: int, system_timestamp_us: int,
+                 index: int, stream_profile=None, depth_scale: float = 1.0):
+        self._type = frame_type
+        self._format = format
+        self._height, self._width = image.shape[:2]
+        self._data = image.reshape(-1).view(np.uint8)
+        self._timestamp_us = timestamp_us
+        self._system_timestamp_us = system_timestamp_us
+        self._index = index
+        self._profile = stream_profile
+        self._depth_scale = depth_scale
+
+    def __repr__(self):
+        return f"VirtualFrame({self._type}, {self._format}, {self._width}x{self._height}, index={self._index})"
+
+    def get_type(self):
+        return self._type
+
+    def get_format(self):
+        return self._format
+
+    def get_width(self) -> int:
+        return self._width
+
+    def get_height(self) -> int:
+        return self._height
+
+    def get_data(self) -> np.ndarray:
+        return self._data
+
+    def get_data_size(self) -> int:
+        return self._data.nbytes
+
+    def get_index(self) -> int:
+        return self._index
+
+    def get_timestamp(self) -> int:
+        return self._timestamp_us // 1000
+
+    def get_timestamp_us(self) -> int:
+        return self._timestamp_us
+
+    def get_system_timestamp(self) -> int:
+        return self._system_timestamp_us // 1000
+
+    def get_system_timestamp_us(self) -> int:
+        return self._system_timestamp_us
+
+    def get_stream_profile(self):
+        return self._profile
+
+    def get_depth_scale(self) -> float:
+        return self._depth_scale
+
+    def as_video_frame(self):
+        return self
+
+    def as_color_frame(self):
+        return self
+
+    def as_depth_frame(self):
+        return self
+
+
+class VirtualFrameSet:
+    """FrameSet look-alike holding VirtualFrames, index and timestamps are those of its frames"""
+
+    def __init__(self, frames: List[VirtualFrame]):
+        self._frames = frames
+
+    def get_type(self):
+        return "FRAME_SET"
+
+    def get_index(self) -> int:
+        return self._frames[0].get_index() if self._frames else 0
+
+    def get_timestamp(self) -> int:
+        return self.get_timestamp_us() // 1000
+
+    def get_timestamp_us(self) -> int:
+        return self._frames[0].get_timestamp_us() if self._frames else 0
+
+    def get_system_timestamp(self) -> int:
+        return self.get_system_timestamp_us() // 1000
+
+    def get_system_timestamp_us(self) -> int:
+        return self._frames[0].get_system_timestamp_us() if self._frames else 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __getitem__(self, index: int) -> VirtualFrame:
+        return self._frames[index]
+
+    def __repr__(self):
+        return f"VirtualFrameSet({self._frames})"
+
+    def get_count(self) -> int:
+        return len(self._frames)
+
+    def get_frame_count(self) -> int:
+        return len(self._frames)
+
+    def get_frame_by_index(self, index: int) -> VirtualFrame:
+        return self._frames[index]
+
+    def get_frame(self, frame_type):
+        name = getattr(frame_type, "name", frame_type)
+        for frame in self._frames:
+            if frame.get_type() == name:
+                return frame
+        return None
+
+    get_frame_by_type = get_frame
+
+    def get_color_frame(self) -> Optional[VirtualFrame]:
+        return self.get_frame("COLOR_FRAME")
+
+    def get_depth_frame(self) -> Optional[VirtualFrame]:
+        return self.get_frame("DEPTH_FRAME")
+
+    def as_frame_set(self):
+        return self
+
+
+class VirtualStreamProfile:
+    """VideoStreamProfile look-alike, ``format`` is an OBFormat member name"""
+
+    def __init__(self, stream_type: str, format: str, width: int, height: int, fps: int, intrinsic=None):
+        self._stream_type = stream_type
+        self._format = format
+        self._width = width
+        self._height = height
+        self._fps = fps
+        self._intrinsic = intrinsic
+
+    def __repr__(self):
+        return f"VirtualStreamProfile({self._stream_type}, {self._format}, {self._width}x{self._height}@{self._fps})"
+
+    def get_type(self):
+        return self._stream_type
+
+    def get_format(self):
+        return self._format
+
+    def get_width(self) -> int:
+        return self._width
+
+    def get_height(self) -> int:
+        return self._height
+
+    def get_fps(self) -> int:
+        return self._fps
+
+    def get_intrinsic(self):
+        return self._intrinsic
+
+    def as_video_stream_profile(self):
+        return self
+
+
+class VirtualStreamProfileList:
+    """StreamProfileList look-alike over the profiles a recording can serve"""
+
+    def __init__(self, profiles: list):
+        self._profiles = profiles
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def __getitem__(self, index: int):
+        return self._profiles[index]
+
+    def get_count(self) -> int:
+        return len(self._profiles)
+
+    def get_stream_profile_by_index(self, index: int):
+        return self._profiles[index]
+
+    def get_default_video_stream_profile(self):
+        return self._profiles[0]
+
+    def get_video_stream_profile(self, width: int = 0, height: int = 0, format=None, fps: int = 0):
+        """Profile matching width/height/format (0, None or UNKNOWN_FORMAT = any).
+
+        ``fps`` is not matched: the pipeline's own rate decides how fast frames come.
+        """
+        format_name = getattr(format, "name", format)
+        for profile in self._profiles:
+            if width and profile.get_width() != width:
+                continue
+            if height and profile.get_height() != height:
+                continue
+            if format_name not in (None, "UNKNOWN_FORMAT") and \
+                    getattr(profile.get_format(), "name", profile.get_format()) != format_name:
+                continue
+            return profile
+        raise ValueError(f"The recording has no {width}x{height} {format_name} stream")
+
+
+class PythonFrameFactory:
+    """Build VirtualFrameSets, works without the native module"""
+
+    def profile(self, sensor: str, width: int, height: int, fps: int, intrinsic: CameraIntrinsic):
+        stream, format = ("COLOR_STREAM", "RGB") if sensor == "COLOR" else ("DEPTH_STREAM", "Y16")
+        return VirtualStreamProfile(stream, format, width, height, fps, intrinsic)
+
+    def frame(self, sensor: str, image: np.ndarray, profile, timestamp_us: int, system_timestamp_us: int,
+              index: int, depth_scale: float = 1.0):
+        return VirtualFrame(sensor + "_FRAME", profile.get_format(), image, timestamp_us, system_timestamp_us, index, profile,
+                            depth_scale)
+
+    def frame_set(self, frames: list):
+        return VirtualFrameSet(frames)
+
+    def camera_param(self, rgb: CameraIntrinsic, depth: CameraIntrinsic):
+        return CameraParam(rgb, depth)
+
+
+class SDKFrameFactory:
+    """Build real FrameSets with create_video_frame/create_frame_set, so SDK filters accept them"""
+
+    def __init__(self):
+        import pyorbbecsdk
+
+        self.sdk = pyorbbecsdk
+
+    def _intrinsic(self, intrinsic: CameraIntrinsic):
+        value = self.sdk.OBCameraIntrinsic()
+        value.fx, value.fy, value.cx, value.cy = intrinsic.fx, intrinsic.fy, intrinsic.cx, intrinsic.cy
+        value.width, value.height = intrinsic.width, intrinsic.height
+        return value
+
+    def profile(self, sensor: str, width: int, height: int, fps: int, intrinsic: CameraIntrinsic):
+        sdk = self.sdk
+        stream, format = (sdk.OBStreamType.COLOR_STREAM, sdk.OBFormat.RGB) if sensor == "COLOR" else \
+            (sdk.OBStreamType.DEPTH_STREAM, sdk.OBFormat.Y16)
+        return sdk.create_video_stream_profile(stream, format, width, height, fps, self._intrinsic(intrinsic),
+                                               sdk.OBCameraDistortion())
+
+    def frame(self, sensor: str, image: np.ndarray, profile, timestamp_us: int, system_timestamp_us: int,
+              index: int, depth_scale: float = 1.0):
+        sdk = self.sdk
+        frame_type = sdk.OBFrameType.COLOR_FRAME if sensor == "COLOR" else sdk.OBFrameType.DEPTH_FRAME
+        height, width = image.shape[:2]
+        return sdk.create_video_frame(frame_type, profile.get_format(), width, height,
+                                      image.reshape(-1).view(np.uint8), timestamp_us, system_timestamp_us, profile,
+                                      depth_scale)
+
+    def frame_set(self, frames: list):
+        return self.sdk.create_frame_set(frames)
+
+    def camera_param(self, rgb: CameraIntrinsic, depth: CameraIntrinsic):
+        param = self.sdk.OBCameraParam()
+        param.rgb_intrinsic = self._intrinsic(rgb)
+        param.depth_intrinsic = self._intrinsic(depth)
+        return param
+
+
+def make_frame_factory(kind: str = "auto"):
+    """"sdk", "python" or "auto" (SDK frames when pyorbbecsdk can be imported)"""
+    if kind == "python":
+        return PythonFrameFactory()
+    if kind == "sdk":
+        return SDKFrameFactory()
+    try:
+        return SDKFrameFactory()
+    except ImportError:
+        return PythonFrameFactory()
+
+
+class VirtualPipeline:
+    """A Pipeline that plays a recording instead of opening a camera.
+
+    ``source`` is a DatasetRecorder session, a save_image_to_disk.py output
+    folder or any folder of color images (give ``depth_mm`` to pair them with
+    a flat depth). Frames are served as recorded: no alignment or flip is
+    applied. With ``fps`` > 0 frames come at that rate and, like a real
+    camera, frames the application is too slow to take are skipped and
+    counted in ``dropped``; with ``fps`` 0 every frame is served as soon as
+    it is asked for. ``start(config, callback)`` calls ``callback`` from a
+    producer thread, ``start(config)`` serves ``wait_for_frames``. The config
+    is accepted for compatibility, every stream of the recording is served.
+
+    Images are decoded once in ``__init__`` with ``preload`` so disk speed
+    does not show up in benchmarks; ``preload=False`` reads them on demand.
+    Intrinsics come from ``intrinsic``, a ``camera_param.json`` in the
+    source folder, or a nominal guess from the image size.
+    """
+
+    def __init__(self, source: str, fps: float = 30.0, loop: bool = True, preload: bool = True,
+                 depth_mm: Optional[float] = None, intrinsic=None, frames: str = "auto"):
+        self.source = source
+        self.samples = scan_source(source)
+        if not self.samples:
+            raise ValueError(f"No frames found in {source}")
+        self.fps = fps
+        self.loop = loop
+        self.depth_mm = depth_mm
+        self.factory = make_frame_factory(frames)
+        self.state = STOPPED
+        self.delivered = 0
+        self.dropped = 0
+        self._cache = [self._read(sample) for sample in self.samples] if preload else None
+        self._lock = threading.Lock()
+        self._callback = None
+        self._thread = None
+        self._running = False
+        self._slot = 0
+        self._start_time = None
+
+        color, depth = self._cache[0] if preload else self._read(self.samples[0])
+        param = self._load_camera_param(intrinsic, color, depth)
+        self._camera_param = self.factory.camera_param(*param)
+        self._profiles = {}
+        nominal_fps = int(round(fps)) or 30
+        if color is not None:
+            self._profiles["COLOR_SENSOR"] = self.factory.profile("COLOR", color.shape[1], color.shape[0],
+                                                                  nominal_fps, param[0])
+        if depth is not None:
+            self._profiles["DEPTH_SENSOR"] = self.factory.profile("DEPTH", depth.shape[1], depth.shape[0],
+                                                                  nominal_fps, param[1])
+
+    def _read(self, sample: Sample):
+        color = read_color(sample.color) if sample.color else None
+        depth = read_depth(sample.depth) if sample.depth else None
+        if depth is None and color is not None and self.depth_mm is not None:
+            depth = np.full(color.shape[:2], round(self.depth_mm), dtype=np.uint16)
+        for image in (color, depth):
+            if image is not None:
+                image.flags.writeable = False
+        return color, depth
+
+    def _load_camera_param(self, intrinsic, color, depth):
+        size = color.shape[:2] if color is not None else depth.shape[:2]
+        if intrinsic is not None:
+            fx, fy, cx, cy = (intrinsic.fx, intrinsic.fy, intrinsic.cx, intrinsic.cy) if hasattr(intrinsic, "fx") \
+                else tuple(intrinsic[:4])
+            rgb = CameraIntrinsic(fx, fy, cx, cy, size[1], size[0])
+            return rgb, rgb
+        path = os.path.join(self.source, CAMERA_PARAM_FILE)
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                data = json.load(f)
+            return CameraIntrinsic(**data["rgb_intrinsic"]), CameraIntrinsic(**data["depth_intrinsic"])
+        rgb = default_intrinsic(size[1], size[0])
+        depth_size = depth.shape[:2] if depth is not None else size
+        return rgb, default_intrinsic(depth_size[1], depth_size[0])
+
+    # ----------------------------- Pipeline API -----------------------------
+    def get_stream_profile_list(self, sensor_type) -> VirtualStreamProfileList:
+        name = getattr(sensor_type, "name", sensor_type)
+        if name not in self._profiles:
+            raise ValueError(f"The recording has no {name} stream")
+        return VirtualStreamProfileList([self._profiles[name]])
+
+    def get_camera_param(self):
+        return self._camera_param
+
+    def enable_frame_sync(self):
+        pass  # frames of a recording are already paired
+
+    def disable_frame_sync(self):
+        pass
+
+    def start(self, config=None, callback: Optional[Callable] = None):
+        with self._lock:
+            if self.state == STREAMING:
+                return
+            self._slot = 0
+            self._start_time = time.perf_counter()
+            self.state = STREAMING
+        self._callback = callback
+        if callback is not None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="VirtualPipeline", daemon=True)
+            self._thread.start()
+
+    def wait_for_frames(self, timeout_ms: int = 1000):
+        """Next frameset, None on timeout or once a non-looping recording is finished"""
+        return self._next(timeout_ms / 1000.0)
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+        with self._lock:
+            if self.state == STREAMING:
+                self.state = STOPPED
+
+    def get_stats(self) -> Dict:
+        elapsed = time.perf_counter() - self._start_time if self._start_time else 0.0
+        return {
+            "state": self.state,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "elapsed_s": round(elapsed, 3),
+            "fps": round(self.delivered / elapsed, 2) if elapsed else 0.0,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    # ------------------------------- playback -------------------------------
+    def _run(self):
+        while self._running:
+            frames = self._next(0.1)
+            if frames is not None:
+                self._callback(frames)
+            elif self.state != STREAMING:
+                break
+
+    def _next(self, timeout: float):
+        # จองลำดับเฟรมภายใต้ lock แล้วค่อยรอนอก lock ไม่ให้ start/stop หรือผู้อ่านอื่นต้องรอไปด้วย
+        with self._lock:
+            if self.state != STREAMING:
+                return None
+            now = time.perf_counter()
+            due = now
+            if self.fps > 0:
+                due = self._start_time + self._slot / self.fps
+                if now >= due:
+                    # ช้ากว่ากล้อง: ข้ามเฟรมที่เลยเวลาไปแล้วเหมือนกล้องจริง
+                    late = int((now - due) * self.fps)
+                    self._slot += late
+                    self.dropped += late
+                    due = now
+                elif due - now > timeout:
+                    due = None
+            if due is not None:
+                slot = self._slot
+                if slot >= len(self.samples) and not self.loop:
+                    self.state = FINISHED
+                    return None
+                self._slot += 1
+                self.delivered += 1
+        if due is None:
+            time.sleep(max(timeout, 0.0))
+            return None
+        if due > now:
+            time.sleep(due - now)
+            with self._lock:
+                if self.state != STREAMING:
+                    self.delivered -= 1
+                    return None
+        return self._build(slot, due)
+
+    def _build(self, slot: int, now: float):
+        sample_index = slot % len(self.samples)
+        sample = self.samples[sample_index]
+        color, depth = self._cache[sample_index] if self._cache is not None else self._read(sample)
+        timestamp_us = int((now - self._start_time) * 1e6)
+        system_timestamp_us = time.time_ns() // 1000
+        frames = []
+        if color is not None and "COLOR_SENSOR" in self._profiles:
+            frames.append(self.factory.frame("COLOR", color, self._profiles["COLOR_SENSOR"], timestamp_us,
+                                             system_timestamp_us, slot))
+        if depth is not None and "DEPTH_SENSOR" in self._profiles:
+            frames.append(self.factory.frame("DEPTH", depth, self._profiles["DEPTH_SENSOR"], timestamp_us,
+                                             system_timestamp_us, slot, sample.depth_scale))
+        return self.factory.frame_set(frames)
+
+
+def create_pipeline(source: Optional[str] = None, fps: Optional[float] = None, **kwargs):
+    """VirtualPipeline on ``source`` (or $ORBBEC_VIRTUAL_SOURCE) if given, else a camera Pipeline"""
+    source = source or os.environ.get(VIRTUAL_SOURCE_ENV)
+    if source:
+        if fps is None:
+            fps = float(os.environ.get(VIRTUAL_FPS_ENV, 30))
+        return VirtualPipeline(source, fps, **kwargs)
+    from pyorbbecsdk import Pipeline
+    return Pipeline()
@@ -0,0 +1,8 @@
+@echo off
+
+
+call venv\Scripts\activate.bat
+set PYTHONPATH=%PYTHONPATH%;install\lib
+python yoloCode\codever2\service.py
+
+pause
@@ -15,9 +15,34 @@
  *******************************************************************************/
 #include "context.hpp"
 
+#include <pybind11/stl.h>
+
+#include <chrono>
+#include <condition_variable>
+#include <deque>
+#include <mutex>
+
 #include "error.hpp"
 #include "utils.hpp"
 namespace pyorbbecsdk {
+namespace {
+// SDK log messages waiting for Python. The SDK callback only appends under a
+// short lock and never touches the GIL; a Python thread drains it.
+struct LogQueue {
+  std::mutex mutex;
+  std::condition_variable cv;
+  std::deque<std::pair<OBLogSeverity, std::string>> messages;
+  size_t capacity = 1024;
+  uint64_t dropped = 0;
+};
+
+LogQueue &log_queue() {
+  // Intentionally leaked, the SDK may still log while the process exits.
+  static auto *queue = new LogQueue();
+  return *queue;
+}
+}  // namespace
+
 Context::Context() noexcept { impl_ = std::make_shared<ob::Context>(); }
 
 Context::Context(const std::string &config_file_path) noexcept {
@@ -65,6 +90,49 @@ void Context::set_logger_to_file(OBLogSeverity level,
   OB_TRY_CATCH({ ob::Context::setLoggerToFile(level, file_path.c_str()); });
 }
 
+void Context::set_logger_to_queue(OBLogSeverity level, size_t capacity) {
+  {
+    auto &queue = log_queue();
+    std::lock_guard<std::mutex> lock(queue.mutex);
+    queue.capacity = capacity > 0 ? capacity : 1;
+  }
+  OB_TRY_CATCH({
+    ob::Context::setLoggerToCallback(
+        level, [](OBLogSeverity severity, const char *message) {
+          auto &queue = log_queue();
+          {
+            std::lock_guard<std::mutex> lock(queue.mutex);
+            if (queue.messages.size() >= queue.capacity) {
+              queue.messages.pop_front();
+              ++queue.dropped;
+            }
+            queue.messages.emplace_back(severity, message ? message : "");
+          }
+          queue.cv.notify_one();
+        });
+  });
+}
+
+std::vector<std::pair<OBLogSeverity, std::string>> Context::pop_log_messages(
+    size_t max_count, uint32_t timeout_ms) {
+  auto &queue = log_queue();
+  std::unique_lock<std::mutex> lock(queue.mutex);
+  queue.cv.wait_for(lock, std::chrono::milliseconds(timeout_ms),
+                    [&queue] { return !queue.messages.empty(); });
+  std::vector<std::pair<OBLogSeverity, std::string>> result;
+  while (!queue.messages.empty() && result.size() < max_count) {
+    result.push_back(std::move(queue.messages.front()));
+    queue.messages.pop_front();
+  }
+  return result;
+}
+
+uint64_t Context::get_dropped_log_count() {
+  auto &queue = log_queue();
+  std::lock_guard<std::mutex> lock(queue.mutex);
+  return queue.dropped;
+}
+
 void Context::enable_net_device_enumeration(bool enable) {
   OB_TRY_CATCH({ impl_->enableNetDeviceEnumeration(enable); });
 }
@@ -73,7 +141,8 @@ void define_context(py::object &m) {
   py::class_<Context>(m, "Context")
       .def(py::init<>())
       .def(py::init<const std::string &>())
-      .def("query_devices", &Context::query_devices, "Query devices")
+      .def("query_devices", &Context::query_devices, "Query devices",
+           py::call_guard<py::gil_scoped_release>())
       .def(
           "create_net_device",
           [](Context &self, const std::string &ip, uint16_t port) {
@@ -113,6 +182,27 @@ void define_context(py::object &m) {
           [](OBLogSeverity level, const std::string &file_path) {
             Context::set_logger_to_file(level, file_path);
           },
-          "Set logger to file");
+          "Set logger to file")
+      .def_static(
+          "set_logger_to_queue",
+          [](OBLogSeverity level, size_t capacity) {
+            Context::set_logger_to_queue(level, capacity);
+          },
+          "Send SDK log messages to a bounded native queue read with "
+          "pop_log_messages, instead of calling into Python per message",
+          py::arg("level"), py::arg("capacity") = 1024)
+      .def_static(
+          "pop_log_messages",
+          [](size_t max_count, uint32_t timeout_ms) {
+            return Context::pop_log_messages(max_count, timeout_ms);
+          },
+          "Wait up to timeout_ms for queued SDK log messages and return up to "
+          "max_count of them as [(OBLogLevel, message)]",
+          py::arg("max_count") = 256, py::arg("timeout_ms") = 100,
+          py::call_guard<py::gil_scoped_release>())
+      .def_static("get_dropped_log_count",
+                  []() { return Context::get_dropped_log_count(); },
+                  "Number of queued log messages overwritten because the "
+                  "queue was full");
 }
 }  // namespace pyorbbecsdk
@@ -18,6 +18,9 @@
 #include <pybind11/pybind11.h>
 
 #include <libobsensor/ObSensor.hpp>
+#include <string>
+#include <utility>
+#include <vector>
 namespace py = pybind11;
 
 namespace pyorbbecsdk {
@@ -47,6 +50,13 @@ class Context {
   static void set_logger_to_file(OBLogSeverity level,
                                  const std::string &file_path);
 
+  static void set_logger_to_queue(OBLogSeverity level, size_t capacity);
+
+  static std::vector<std::pair<OBLogSeverity, std::string>> pop_log_messages(
+      size_t max_count, uint32_t timeout_ms);
+
+  static uint64_t get_dropped_log_count();
+
  private:
   std::shared_ptr<ob::Context> impl_;
 };
@@ -15,11 +15,160 @@
  *******************************************************************************/
 #include "device.hpp"
 
+#include <pybind11/stl.h>
+
+#include <iterator>
+#include <mutex>
 #include <sstream>
+#include <stdexcept>
+#include <unordered_map>
+#include <vector>
 
 #include "error.hpp"
 
 namespace pyorbbecsdk {
+namespace {
+using PropertyTypes = std::unordered_map<int, OBPropertyType>;
+
+// Per-device property metadata that does not change while the device is
+// open: the type of every supported property and the min/max/step/default of
+// the ranges. `cur` is not cached: presets and auto modes change it on the
+// device, so it is read live on every range call.
+struct PropertyCache {
+  std::weak_ptr<ob::Device> device;
+  std::shared_ptr<const PropertyTypes> types;
+  std::unordered_map<int, OBIntPropertyRange> int_ranges;
+  std::unordered_map<int, OBFloatPropertyRange> float_ranges;
+  std::unordered_map<int, OBBoolPropertyRange> bool_ranges;
+};
+
+std::mutex property_cache_mutex;
+std::unordered_map<const ob::Device *, PropertyCache> property_caches;
+
+// Must be called with property_cache_mutex held.
+PropertyCache &property_cache(const std::shared_ptr<ob::Device> &device) {
+  auto it = property_caches.find(device.get());
+  if (it != property_caches.end() && it->second.device.lock() == device) {
+    return it->second;
+  }
+  for (auto entry = property_caches.begin(); entry != property_caches.end();) {
+    entry = entry->second.device.expired() ? property_caches.erase(entry)
+                                           : std::next(entry);
+  }
+  auto &cache = property_caches[device.get()];
+  cache = PropertyCache();
+  cache.device = device;
+  return cache;
+}
+
+std::shared_ptr<const PropertyTypes> property_types(
+    const std::shared_ptr<ob::Device> &device) {
+  {
+    std::lock_guard<std::mutex> lock(property_cache_mutex);
+    auto types = property_cache(device).types;
+    if (types) {
+      return types;
+    }
+  }
+  auto types = std::make_shared<PropertyTypes>();
+  OB_TRY_CATCH({
+    uint32_t count = device->getSupportedPropertyCount();
+    for (uint32_t i = 0; i < count; i++) {
+      auto item = device->getSupportedProperty(i);
+      (*types)[item.id] = item.type;
+    }
+  });
+  std::lock_guard<std::mutex> lock(property_cache_mutex);
+  property_cache(device).types = types;
+  return types;
+}
+
+template <typename Range, typename Fetch, typename Current>
+Range cached_range(const std::shared_ptr<ob::Device> &device,
+                   OBPropertyID property_id,
+                   std::unordered_map<int, Range> PropertyCache::*ranges,
+                   Fetch fetch, Current current) {
+  {
+    std::unique_lock<std::mutex> lock(property_cache_mutex);
+    auto &cached = property_cache(device).*ranges;
+    auto it = cached.find(property_id);
+    if (it != cached.end()) {
+      Range range = it->second;
+      lock.unlock();
+      OB_TRY_CATCH({ range.cur = current(); });
+      return range;
+    }
+  }
+  Range range;
+  OB_TRY_CATCH({ range = fetch(); });
+  std::lock_guard<std::mutex> lock(property_cache_mutex);
+  (property_cache(device).*ranges)[property_id] = range;
+  return range;
+}
+
+struct PropertyValue {
+  OBPropertyID id;
+  OBPropertyType type;
+  int int_value = 0;
+  float float_value = 0.0f;
+  bool bool_value = false;
+};
+
+std::vector<PropertyValue> read_properties(
+    const std::shared_ptr<ob::Device> &device,
+    const std::vector<OBPropertyID> &property_ids) {
+  auto types = property_types(device);
+  std::vector<PropertyValue> values;
+  values.reserve(property_ids.size());
+  for (auto property_id : property_ids) {
+    auto it = types->find(property_id);
+    if (it == types->end()) {
+      throw std::invalid_argument("Property " + std::to_string(property_id) +
+                                  " is not supported by the device");
+    }
+    PropertyValue value{property_id, it->second};
+    OB_TRY_CATCH({
+      switch (value.type) {
+        case OB_INT_PROPERTY:
+          value.int_value = device->getIntProperty(property_id);
+          break;
+        case OB_FLOAT_PROPERTY:
+          value.float_value = device->getFloatProperty(property_id);
+          break;
+        case OB_BOOL_PROPERTY:
+          value.bool_value = device->getBoolProperty(property_id);
+          break;
+        default:
+          throw std::invalid_argument(
+              "Property " + std::to_string(property_id) +
+              " is a struct property and has no single value");
+      }
+    });
+    values.push_back(value);
+  }
+  return values;
+}
+
+void write_properties(const std::shared_ptr<ob::Device> &device,
+                      const std::vector<PropertyValue> &values) {
+  for (const auto &value : values) {
+    OB_TRY_CATCH({
+      switch (value.type) {
+        case OB_INT_PROPERTY:
+          device->setIntProperty(value.id, value.int_value);
+          break;
+        case OB_FLOAT_PROPERTY:
+          device->setFloatProperty(value.id, value.float_value);
+          break;
+        default:
+          device->setBoolProperty(value.id, value.bool_value);
+          break;
+      }
+    });
+  }
+}
+}  // namespace
+
 void define_device_info(const py::object &m) {
   py::class_<ob::DeviceInfo, std::shared_ptr<ob::DeviceInfo>>(m, "DeviceInfo")
       .def(
@@ -152,10 +301,12 @@ void define_depth_work_mode_list(const py::object &m) {
 
 void define_device(const py::object &m) {
   py::class_<ob::Device, std::shared_ptr<ob::Device>>(m, "Device")
-      .def("get_device_info",
-           [](const std::shared_ptr<ob::Device> &self) {
-             return self->getDeviceInfo();
-           })
+      .def(
+          "get_device_info",
+          [](const std::shared_ptr<ob::Device> &self) {
+            return self->getDeviceInfo();
+          },
+          py::call_guard<py::gil_scoped_release>())
       .def("get_sensor_list",
            [](const std::shared_ptr<ob::Device> &self) {
              return self->getSensorList();
@@ -167,7 +318,7 @@ void define_device(const py::object &m) {
       .def("set_int_property",
            [](const std::shared_ptr<ob::Device> &self, OBPropertyID property_id,
               int value) {
-             OB_TRY_CATCH({ return self->setIntProperty(property_id, value); });
+             OB_TRY_CATCH({ self->setIntProperty(property_id, value); });
            })
       .def("get_int_property",
            [](const std::shared_ptr<ob::Device> &self,
@@ -177,8 +328,7 @@ void define_device(const py::object &m) {
       .def("set_float_property",
            [](const std::shared_ptr<ob::Device> &self, OBPropertyID property_id,
               float value) {
-             OB_TRY_CATCH(
-                 { return self->setFloatProperty(property_id, value); });
+             OB_TRY_CATCH({ self->setFloatProperty(property_id, value); });
            })
       .def("get_float_property",
            [](const std::shared_ptr<ob::Device> &self,
@@ -189,28 +339,131 @@ void define_device(const py::object &m) {
           "set_bool_property",
           [](const std::shared_ptr<ob::Device> &self, OBPropertyID property_id,
              bool value) {
-            OB_TRY_CATCH({ return self->setBoolProperty(property_id, value); });
+            OB_TRY_CATCH({ self->setBoolProperty(property_id, value); });
           })
       .def("get_bool_property",
            [](const std::shared_ptr<ob::Device> &self,
               OBPropertyID property_id) {
              OB_TRY_CATCH({ return self->getBoolProperty(property_id); });
            })
-      .def("get_int_property_range",
-           [](const std::shared_ptr<ob::Device> &self,
-              OBPropertyID property_id) {
-             OB_TRY_CATCH({ return self->getIntPropertyRange(property_id); });
-           })
-      .def("get_float_property_range",
-           [](const std::shared_ptr<ob::Device> &self,
-              OBPropertyID property_id) {
-             OB_TRY_CATCH({ return self->getFloatPropertyRange(property_id); });
-           })
-      .def("get_bool_property_range",
-           [](const std::shared_ptr<ob::Device> &self,
-              OBPropertyID property_id) {
-             OB_TRY_CATCH({ return self->getBoolPropertyRange(property_id); });
-           })
+      .def(
+          "get_int_property_range",
+          [](const std::shared_ptr<ob::Device> &self,
+             OBPropertyID property_id) {
+            return cached_range(
+                self, property_id, &PropertyCache::int_ranges,
+                [&] { return self->getIntPropertyRange(property_id); },
+                [&] { return self->getIntProperty(property_id); });
+          },
+          "Get the range of an int property. min/max/step/default are cached "
+          "per device after the first call, cur is read from the device",
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "get_float_property_range",
+          [](const std::shared_ptr<ob::Device> &self,
+             OBPropertyID property_id) {
+            return cached_range(
+                self, property_id, &PropertyCache::float_ranges,
+                [&] { return self->getFloatPropertyRange(property_id); },
+                [&] { return self->getFloatProperty(property_id); });
+          },
+          "Get the range of a float property. min/max/step/default are cached "
+          "per device after the first call, cur is read from the device",
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "get_bool_property_range",
+          [](const std::shared_ptr<ob::Device> &self,
+             OBPropertyID property_id) {
+            return cached_range(
+                self, property_id, &PropertyCache::bool_ranges,
+                [&] { return self->getBoolPropertyRange(property_id); },
+                [&] { return self->getBoolProperty(property_id); });
+          },
+          "Get the range of a bool property. min/max/step/default are cached "
+          "per device after the first call, cur is read from the device",
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "get_properties",
+          [](const std::shared_ptr<ob::Device> &self,
+             const std::vector<OBPropertyID> &property_ids) {
+            std::vector<PropertyValue> values;
+            {
+              py::gil_scoped_release release;
+              values = read_properties(self, property_ids);
+            }
+            py::dict result;
+            for (const auto &value : values) {
+              auto key = py::cast(value.id);
+              switch (value.type) {
+                case OB_INT_PROPERTY:
+                  result[key] = value.int_value;
+                  break;
+                case OB_FLOAT_PROPERTY:
+                  result[key] = value.float_value;
+                  break;
+                default:
+                  result[key] = value.bool_value;
+                  break;
+              }
+            }
+            return result;
+          },
+          "Read several int, float or bool properties in one call, return "
+          "{property_id: value}",
+          py::arg("property_ids"))
+      .def(
+          "set_properties",
+          [](const std::shared_ptr<ob::Device> &self, const py::dict &values) {
+            std::shared_ptr<const PropertyTypes> types;
+            {
+              py::gil_scoped_release release;
+              types = property_types(self);
+            }
+            std::vector<PropertyValue> writes;
+            writes.reserve(values.size());
+            for (const auto &item : values) {
+              PropertyValue value{item.first.cast<OBPropertyID>(),
+                                  OB_BOOL_PROPERTY};
+              auto it = types->find(value.id);
+              if (it != types->end()) {
+                value.type = it->second;
+              } else if (py::isinstance<py::bool_>(item.second)) {
+                value.type = OB_BOOL_PROPERTY;
+              } else if (py::isinstance<py::int_>(item.second)) {
+                value.type = OB_INT_PROPERTY;
+              } else {
+                value.type = OB_FLOAT_PROPERTY;
+              }
+              switch (value.type) {
+                case OB_INT_PROPERTY:
+                  value.int_value = item.second.cast<int>();
+                  break;
+                case OB_FLOAT_PROPERTY:
+                  value.float_value = item.second.cast<float>();
+                  break;
+                case OB_BOOL_PROPERTY:
+                  value.bool_value = item.second.cast<bool>();
+                  break;
+                default:
+                  throw std::invalid_argument(
+                      "Property " + std::to_string(value.id) +
+                      " is a struct property and has no single value");
+              }
+              writes.push_back(value);
+            }
+            py::gil_scoped_release release;
+            write_properties(self, writes);
+          },
+          "Write several int, float or bool properties in one call, in the "
+          "order of the dict",
+          py::arg("values"))
+      .def(
+          "clear_property_cache",
+          [](const std::shared_ptr<ob::Device> &self) {
+            std::lock_guard<std::mutex> lock(property_cache_mutex);
+            property_caches.erase(self.get());
+          },
+          "Forget the cached property types and ranges of this device")
       .def("get_support_property_count",
            [](const std::shared_ptr<ob::Device> &self) {
              return self->getSupportedPropertyCount();
@@ -290,15 +543,19 @@ void define_device(const py::object &m) {
                return temperature;
              });
            })
-      .def("get_multi_device_sync_config",
-           [](const std::shared_ptr<ob::Device> &self) {
-             OB_TRY_CATCH({ return self->getMultiDeviceSyncConfig(); });
-           })
-      .def("set_multi_device_sync_config",
-           [](const std::shared_ptr<ob::Device> &self,
-              const OBMultiDeviceSyncConfig &config) {
-             OB_TRY_CATCH({ return self->setMultiDeviceSyncConfig(config); });
-           })
+      .def(
+          "get_multi_device_sync_config",
+          [](const std::shared_ptr<ob::Device> &self) {
+            OB_TRY_CATCH({ return self->getMultiDeviceSyncConfig(); });
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "set_multi_device_sync_config",
+          [](const std::shared_ptr<ob::Device> &self,
+             const OBMultiDeviceSyncConfig &config) {
+            OB_TRY_CATCH({ return self->setMultiDeviceSyncConfig(config); });
+          },
+          py::call_guard<py::gil_scoped_release>())
       .def("trigger_capture",
            [](const std::shared_ptr<ob::Device> &self) {
              OB_TRY_CATCH({ return self->triggerCapture(); });
@@ -326,35 +583,45 @@ void define_device(const py::object &m) {
              OB_TRY_CATCH(
                  { return self->loadDepthFilterConfig(file_path.c_str()); });
            })
-      .def("get_current_preset_name",
-           [](const std::shared_ptr<ob::Device> &self) {
-             return std::string(self->getCurrentPresetName());
-           })
-      .def("load_preset",
-           [](const std::shared_ptr<ob::Device> &self,
-              const std::string &preset_name) {
-             OB_TRY_CATCH({ return self->loadPreset(preset_name.c_str()); });
-           })
-      .def("get_available_preset_list",
-           [](const std::shared_ptr<ob::Device> &self) {
-             OB_TRY_CATCH({ return self->getAvailablePresetList(); });
-           })
-      .def("load_preset_from_json_file",
-           [](const std::shared_ptr<ob::Device> &self,
-              const std::string &file_path) {
-             OB_TRY_CATCH(
-                 { return self->loadPresetFromJsonFile(file_path.c_str()); });
-           })
-      .def("load_preset_from_json_data",
-           [](const std::shared_ptr<ob::Device> &self,
-              const std::string &preset_name, const std::string &data) {
-             OB_TRY_CATCH({
-               return self->loadPresetFromJsonData(
-                   preset_name.c_str(),
-                   reinterpret_cast<const uint8_t *>(data.c_str()),
-                   data.size());
-             });
-           })
+      .def(
+          "get_current_preset_name",
+          [](const std::shared_ptr<ob::Device> &self) {
+            return std::string(self->getCurrentPresetName());
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "load_preset",
+          [](const std::shared_ptr<ob::Device> &self,
+             const std::string &preset_name) {
+            OB_TRY_CATCH({ return self->loadPreset(preset_name.c_str()); });
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "get_available_preset_list",
+          [](const std::shared_ptr<ob::Device> &self) {
+            OB_TRY_CATCH({ return self->getAvailablePresetList(); });
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "load_preset_from_json_file",
+          [](const std::shared_ptr<ob::Device> &self,
+             const std::string &file_path) {
+            OB_TRY_CATCH(
+                { return self->loadPresetFromJsonFile(file_path.c_str()); });
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "load_preset_from_json_data",
+          [](const std::shared_ptr<ob::Device> &self,
+             const std::string &preset_name, const std::string &data) {
+            OB_TRY_CATCH({
+              return self->loadPresetFromJsonData(
+                  preset_name.c_str(),
+                  reinterpret_cast<const uint8_t *>(data.c_str()),
+                  data.size());
+            });
+          },
+          py::call_guard<py::gil_scoped_release>())
       .def("export_settings_as_preset_json_file",
            [](const std::shared_ptr<ob::Device> &self,
               const std::string &file_path) {
@@ -470,21 +737,26 @@ void define_device_list(const py::object &m) {
       .def("get_device_uid_by_index",
            [](const std::shared_ptr<ob::DeviceList> &self,
               int index) -> std::string { return self->uid(index); })
-      .def("get_device_by_index",
-           [](const std::shared_ptr<ob::DeviceList> &self, int index) {
-             OB_TRY_CATCH({ return self->getDevice(index); });
-           })
-      .def("get_device_by_serial_number",
-           [](const std::shared_ptr<ob::DeviceList> &self,
-              const std::string &serial_number) {
-             OB_TRY_CATCH(
-                 { return self->getDeviceBySN(serial_number.c_str()); });
-           })
-      .def("get_device_by_uid",
-           [](const std::shared_ptr<ob::DeviceList> &self,
-              const std::string &uid) {
-             OB_TRY_CATCH({ return self->getDeviceByUid(uid.c_str()); });
-           })
+      .def(
+          "get_device_by_index",
+          [](const std::shared_ptr<ob::DeviceList> &self, int index) {
+            OB_TRY_CATCH({ return self->getDevice(index); });
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "get_device_by_serial_number",
+          [](const std::shared_ptr<ob::DeviceList> &self,
+             const std::string &serial_number) {
+            OB_TRY_CATCH({ return self->getDeviceBySN(serial_number.c_str()); });
+          },
+          py::call_guard<py::gil_scoped_release>())
+      .def(
+          "get_device_by_uid",
+          [](const std::shared_ptr<ob::DeviceList> &self,
+             const std::string &uid) {
+            OB_TRY_CATCH({ return self->getDeviceByUid(uid.c_str()); });
+          },
+          py::call_guard<py::gil_scoped_release>())
       .def("__len__",
            [](const std::shared_ptr<ob::DeviceList> &self) {
              return self->deviceCount();
@@ -16,10 +16,107 @@
 #include "frame.hpp"
 
 #include <pybind11/numpy.h>
+#include <pybind11/stl.h>
 
 #include "error.hpp"
 
 namespace pyorbbecsdk {
+namespace {
+// Field names of the metadata record, in OBFrameMetadataType order
+const char* const kMetadataFields[OB_FRAME_METADATA_TYPE_COUNT] = {
+    "timestamp",
+    "sensor_timestamp",
+    "frame_number",
+    "auto_exposure",
+    "exposure",
+    "gain",
+    "auto_white_balance",
+    "white_balance",
+    "brightness",
+    "contrast",
+    "saturation",
+    "sharpness",
+    "backlight_compensation",
+    "hue",
+    "gamma",
+    "power_line_frequency",
+    "low_light_compensation",
+    "manual_white_balance",
+    "actual_frame_rate",
+    "frame_rate",
+    "ae_roi_left",
+    "ae_roi_top",
+    "ae_roi_right",
+    "ae_roi_bottom",
+    "exposure_priority",
+    "hdr_sequence_name",
+    "hdr_sequence_size",
+    "hdr_sequence_index",
+    "laser_power",
+    "laser_power_level",
+    "laser_status",
+    "gpio_input_data",
+    "disparity_search_offset",
+    "disparity_search_range",
+};
+
+// One record: a uint64 bitmask of the types the frame has ("present", bit i
+// = OBFrameMetadataType i) followed by one int64 value per type (0 if absent).
+constexpr size_t kMetadataRecordSize =
+    sizeof(uint64_t) * (OB_FRAME_METADATA_TYPE_COUNT + 1);
+
+const py::dtype& metadata_dtype() {
+  // Intentionally leaked so it is never destroyed after the interpreter.
+  static const py::dtype* dtype = [] {
+    py::list names, formats, offsets;
+    names.append("present");
+    formats.append("<u8");
+    offsets.append(0);
+    for (size_t i = 0; i < OB_FRAME_METADATA_TYPE_COUNT; ++i) {
+      names.append(kMetadataFields[i]);
+      formats.append("<i8");
+      offsets.append((i + 1) * sizeof(int64_t));
+    }
+    return new py::dtype(names, formats, offsets, kMetadataRecordSize);
+  }();
+  return *dtype;
+}
+
+// Write the metadata record of frame to dst, must be called without the GIL
+// being required (no Python objects are touched).
+void write_metadata_record(const std::shared_ptr<ob::Frame>& frame,
+                           uint8_t* dst) {
+  uint64_t present = 0;
+  int64_t values[OB_FRAME_METADATA_TYPE_COUNT] = {};
+  if (frame) {
+    for (int i = 0; i < OB_FRAME_METADATA_TYPE_COUNT; ++i) {
+      auto type = static_cast<OBFrameMetadataType>(i);
+      if (frame->hasMetadata(type)) {
+        values[i] = frame->getMetadataValue(type);
+        present |= uint64_t{1} << i;
+      }
+    }
+  }
+  std::memcpy(dst, &present, sizeof(present));
+  std::memcpy(dst + sizeof(present), values, sizeof(values));
+}
+
+uint8_t* metadata_row(py::array& out, size_t index, size_t count) {
+  if (!out.dtype().equal(metadata_dtype())) {
+    throw std::invalid_argument(
+        "out must be an array of dtype get_metadata_dtype()");
+  }
+  if (out.ndim() != 1 || out.strides(0) != kMetadataRecordSize) {
+    throw std::invalid_argument("out must be a contiguous 1-D array");
+  }
+  if (index + count > static_cast<size_t>(out.shape(0))) {
+    throw std::out_of_range("not enough rows left in out");
+  }
+  return static_cast<uint8_t*>(out.mutable_data()) +
+         index * kMetadataRecordSize;
+}
+}  // namespace
+
 void define_frame(const py::object& m) {
   py::class_<ob::Frame, std::shared_ptr<ob::Frame>>(m, "Frame")
       .def("get_type",
@@ -78,6 +175,29 @@ void define_frame(const py::object& m) {
           [](const std::shared_ptr<ob::Frame>& self, OBFrameMetadataType type) {
             return self->getMetadataValue(type);
           })
+      .def(
+          "get_all_metadata",
+          [](const std::shared_ptr<ob::Frame>& self, py::object out,
+             size_t index) -> py::object {
+            py::array record;
+            if (out.is_none()) {
+              record = py::array(metadata_dtype(), std::vector<py::ssize_t>{1});
+              index = 0;
+            } else if (py::isinstance<py::array>(out)) {
+              record = py::reinterpret_borrow<py::array>(out);
+            } else {
+              throw std::invalid_argument("out must be a numpy array");
+            }
+            auto* dst = metadata_row(record, index, 1);
+            {
+              py::gil_scoped_release release;
+              OB_TRY_CATCH({ write_metadata_record(self, dst); });
+            }
+            return record.attr("__getitem__")(index);
+          },
+          "Read every metadata type in one call into a structured record of "
+          "dtype get_metadata_dtype(), written to out[index] if out is given",
+          py::arg("out") = py::none(), py::arg("index") = 0)
       .def("as_video_frame",
            [](const std::shared_ptr<ob::Frame>& self) {
              if (!self->is<ob::VideoFrame>()) {
@@ -363,4 +483,137 @@ void define_gyro_frame(const py::object& m) {
       });
 }
 
+namespace {
+py::object cast_video_frame(const std::shared_ptr<ob::VideoFrame>& frame) {
+  switch (frame->type()) {
+    case OB_FRAME_COLOR:
+      return py::cast(frame->as<ob::ColorFrame>());
+    case OB_FRAME_DEPTH:
+      return py::cast(frame->as<ob::DepthFrame>());
+    case OB_FRAME_IR:
+    case OB_FRAME_IR_LEFT:
+    case OB_FRAME_IR_RIGHT:
+      return py::cast(frame->as<ob::IRFrame>());
+    default:
+      return py::cast(frame);
+  }
+}
+}  // namespace
+
+void define_frame_factory(py::module& m) {
+  m.def(
+       "create_video_frame",
+       [](OBFrameType frame_type, OBFormat format, uint32_t width,
+          uint32_t height,
+          const py::array_t<uint8_t, py::array::c_style |
+                                         py::array::forcecast>& data,
+          uint64_t timestamp_us, uint64_t system_timestamp_us,
+          const std::shared_ptr<ob::StreamProfile>& stream_profile,
+          float depth_scale) -> py::object {
+         auto data_size = static_cast<uint32_t>(data.nbytes());
+         std::shared_ptr<ob::VideoFrame> frame;
+         OB_TRY_CATCH({
+           // Compressed formats have no fixed size per row, reserve enough
+           // room for an uncompressed image so any encoded payload fits.
+           uint32_t stride = 0;
+           if (format == OB_FORMAT_MJPG || format == OB_FORMAT_H264 ||
+               format == OB_FORMAT_H265 || format == OB_FORMAT_HEVC) {
+             stride = width * 3;
+           }
+           frame = ob::FrameFactory::createVideoFrame(frame_type, format, width,
+                                                      height, stride);
+           if (data_size > frame->dataSize()) {
+             throw std::invalid_argument(
+                 "data is larger than the frame buffer for this format");
+           }
+           auto impl = const_cast<ob_frame*>(frame->getImpl());
+           ob_error* error = nullptr;
+           ob_frame_update_data(impl, data.data(), data_size, &error);
+           ob::Error::handle(&error);
+           ob::FrameHelper::setFrameDeviceTimestampUs(frame, timestamp_us);
+           ob_frame_set_system_timestamp_us(impl, system_timestamp_us, &error);
+           ob::Error::handle(&error);
+           if (stream_profile) {
+             ob_frame_set_stream_profile(impl, stream_profile->getImpl(),
+                                         &error);
+             ob::Error::handle(&error);
+           }
+           if (frame_type == OB_FRAME_DEPTH) {
+             ob_depth_frame_set_value_scale(impl, depth_scale, &error);
+             ob::Error::handle(&error);
+           }
+         });
+         return cast_video_frame(frame);
+       },
+       "Create a video frame filled with a copy of data, without a device",
+       py::arg("frame_type"), py::arg("format"), py::arg("width"),
+       py::arg("height"), py::arg("data"), py::arg("timestamp_us") = 0,
+       py::arg("system_timestamp_us") = 0,
+       py::arg("stream_profile") = nullptr, py::arg("depth_scale") = 1.0f)
+      .def(
+          "create_video_stream_profile",
+          [](OBStreamType stream_type, OBFormat format, uint32_t width,
+             uint32_t height, uint32_t fps, const OBCameraIntrinsic& intrinsic,
+             const OBCameraDistortion& distortion) {
+            OB_TRY_CATCH({
+              ob_error* error = nullptr;
+              auto impl = ob_create_video_stream_profile(
+                  stream_type, format, width, height, fps, &error);
+              ob::Error::handle(&error);
+              ob_video_stream_profile_set_intrinsic(impl, intrinsic, &error);
+              ob::Error::handle(&error);
+              ob_video_stream_profile_set_distortion(impl, distortion, &error);
+              ob::Error::handle(&error);
+              return ob::StreamProfileFactory::create(impl)
+                  ->as<ob::VideoStreamProfile>();
+            });
+          },
+          "Create a video stream profile with the given intrinsics",
+          py::arg("stream_type"), py::arg("format"), py::arg("width"),
+          py::arg("height"), py::arg("fps"), py::arg("intrinsic"),
+          py::arg("distortion"))
+      .def(
+          "create_frame_set",
+          [](const std::vector<std::shared_ptr<ob::Frame>>& frames) {
+            OB_TRY_CATCH({
+              ob_error* error = nullptr;
+              auto impl = ob_create_frameset(&error);
+              ob::Error::handle(&error);
+              auto frame_set =
+                  std::make_shared<ob::Frame>(impl)->as<ob::FrameSet>();
+              for (const auto& frame : frames) {
+                frame_set->pushFrame(frame);
+              }
+              return frame_set;
+            });
+          },
+          "Bundle frames into a FrameSet, e.g. to feed filters in tests",
+          py::arg("frames"));
+}
+
+void define_frame_metadata(py::module& m) {
+  m.def(
+       "get_metadata_dtype", []() { return metadata_dtype(); },
+       "NumPy dtype of the records filled by Frame.get_all_metadata and "
+       "fill_metadata: a 'present' bitmask and one int64 per "
+       "OBFrameMetadataType")
+      .def(
+          "fill_metadata",
+          [](const std::vector<std::shared_ptr<ob::Frame>>& frames,
+             py::array out, size_t start) {
+            auto* dst = metadata_row(out, start, frames.size());
+            py::gil_scoped_release release;
+            OB_TRY_CATCH({
+              for (const auto& frame : frames) {
+                write_metadata_record(frame, dst);
+                dst += kMetadataRecordSize;
+              }
+            });
+            return frames.size();
+          },
+          "Write the metadata records of frames into out[start:start + "
+          "len(frames)] with the GIL released, return the number of rows",
+          py::arg("frames"), py::arg("out"), py::arg("start") = 0);
+}
+
 }  // namespace pyorbbecsdk
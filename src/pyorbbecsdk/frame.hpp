@@ -39,5 +39,9 @@ void define_accel_frame(const py::object& m);
 
 void define_gyro_frame(const py::object& m);
 
+void define_frame_factory(py::module& m);
+
+void define_frame_metadata(py::module& m);
+
 
 }  // namespace pyorbbecsdk
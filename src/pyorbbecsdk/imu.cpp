@@ -0,0 +1,241 @@
+/*******************************************************************************
+ * Copyright (c) 2024 Orbbec 3D Technology, Inc
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ *******************************************************************************/
+
+#include "imu.hpp"
+
+#include <pybind11/numpy.h>
+
+#include <chrono>
+
+#include "error.hpp"
+#include "utils.hpp"
+
+namespace pyorbbecsdk {
+
+IMUBatcher::IMUBatcher(size_t chunk_size, size_t max_chunks)
+    : chunk_size_(chunk_size), max_chunks_(max_chunks) {
+  if (chunk_size_ == 0 || max_chunks_ == 0) {
+    throw std::invalid_argument("chunk_size and max_chunks must be positive");
+  }
+  current_.samples.reserve(chunk_size_ * 4);
+  current_.temperatures.reserve(chunk_size_);
+}
+
+IMUBatcher::~IMUBatcher() noexcept {
+  try {
+    if (sensor_ && PyGILState_Check()) {
+      // The SDK thread may be waiting for the GIL inside the callback.
+      py::gil_scoped_release release;
+      stop();
+    } else {
+      stop();
+    }
+  } catch (const std::exception &e) {
+    std::cerr << "Error stopping IMU sensor: " << e.what() << std::endl;
+  } catch (...) {
+    std::cerr << "Unknown error stopping IMU sensor" << std::endl;
+  }
+}
+
+void IMUBatcher::start(std::shared_ptr<ob::Sensor> sensor,
+                       std::shared_ptr<ob::StreamProfile> profile) {
+  CHECK_NULLPTR(sensor);
+  OB_TRY_CATCH({
+    sensor->start(std::move(profile), [this](std::shared_ptr<ob::Frame> frame) {
+      push_frame(frame);
+    });
+  });
+  sensor_ = std::move(sensor);
+}
+
+void IMUBatcher::stop() {
+  if (sensor_) {
+    OB_TRY_CATCH({ sensor_->stop(); });
+    sensor_.reset();
+  }
+}
+
+void IMUBatcher::set_callback(const py::object &callback) {
+  std::shared_ptr<py::function> holder;
+  if (!callback.is_none()) {
+    // Released from whichever thread drops the last reference, so take the
+    // GIL in the deleter.
+    holder.reset(new py::function(callback), [](py::function *fn) {
+      py::gil_scoped_acquire acquire;
+      delete fn;
+    });
+  }
+  std::shared_ptr<py::function> previous;
+  {
+    py::gil_scoped_release release;
+    std::lock_guard<std::mutex> lock(mutex_);
+    previous.swap(callback_);
+    callback_ = holder;
+  }
+}
+
+void IMUBatcher::append_sample(const std::shared_ptr<ob::Frame> &frame) {
+  OBAccelValue value{};
+  float temperature = 0.0f;
+  if (frame->is<ob::AccelFrame>()) {
+    auto accel = frame->as<ob::AccelFrame>();
+    value = accel->getValue();
+    temperature = accel->getTemperature();
+  } else if (frame->is<ob::GyroFrame>()) {
+    auto gyro = frame->as<ob::GyroFrame>();
+    value = gyro->getValue();
+    temperature = gyro->getTemperature();
+  } else {
+    return;
+  }
+  current_.samples.push_back(static_cast<double>(frame->timeStampUs()));
+  current_.samples.push_back(value.x);
+  current_.samples.push_back(value.y);
+  current_.samples.push_back(value.z);
+  current_.temperatures.push_back(temperature);
+}
+
+void IMUBatcher::push_frame(const std::shared_ptr<ob::Frame> &frame) {
+  if (!frame) {
+    return;
+  }
+  std::unique_lock<std::mutex> lock(mutex_);
+  if (frame->is<ob::FrameSet>()) {
+    auto frame_set = frame->as<ob::FrameSet>();
+    for (uint32_t i = 0; i < frame_set->getCount(); ++i) {
+      append_sample(frame_set->getFrameByIndex(i));
+      if (current_.temperatures.size() >= chunk_size_) {
+        complete_chunk(lock);
+      }
+    }
+    return;
+  }
+  append_sample(frame);
+  if (current_.temperatures.size() >= chunk_size_) {
+    complete_chunk(lock);
+  }
+}
+
+void IMUBatcher::complete_chunk(std::unique_lock<std::mutex> &lock) {
+  Chunk chunk;
+  chunk.samples.reserve(chunk_size_ * 4);
+  chunk.temperatures.reserve(chunk_size_);
+  std::swap(chunk, current_);
+  auto callback = callback_;
+  if (callback) {
+    lock.unlock();
+    py::gil_scoped_acquire acquire;
+    try {
+      (*callback)(to_python(chunk));
+    } catch (py::error_already_set &e) {
+      e.discard_as_unraisable("IMUBatcher callback");
+    }
+    lock.lock();
+    return;
+  }
+  if (ready_.size() >= max_chunks_) {
+    // The reader fell behind, keep the newest samples.
+    dropped_samples_ += ready_.front().temperatures.size();
+    ready_.pop_front();
+  }
+  ready_.push_back(std::move(chunk));
+  ready_cv_.notify_one();
+}
+
+py::object IMUBatcher::to_python(const Chunk &chunk) {
+  auto n = static_cast<py::ssize_t>(chunk.temperatures.size());
+  py::array_t<double> samples({n, static_cast<py::ssize_t>(4)});
+  py::array_t<float> temperatures(n);
+  if (n > 0) {
+    std::memcpy(samples.mutable_data(), chunk.samples.data(),
+                chunk.samples.size() * sizeof(double));
+    std::memcpy(temperatures.mutable_data(), chunk.temperatures.data(),
+                chunk.temperatures.size() * sizeof(float));
+  }
+  return py::make_tuple(samples, temperatures);
+}
+
+py::object IMUBatcher::read(int timeout_ms) {
+  Chunk chunk;
+  bool ready = false;
+  {
+    // No Python objects in here: the GIL is released.
+    py::gil_scoped_release release;
+    std::unique_lock<std::mutex> lock(mutex_);
+    ready = ready_cv_.wait_for(lock, std::chrono::milliseconds(timeout_ms),
+                               [this] { return !ready_.empty(); });
+    if (ready) {
+      chunk = std::move(ready_.front());
+      ready_.pop_front();
+    }
+  }
+  if (!ready) {
+    return py::none();
+  }
+  return to_python(chunk);
+}
+
+py::object IMUBatcher::flush() {
+  Chunk chunk;
+  {
+    py::gil_scoped_release release;
+    std::lock_guard<std::mutex> lock(mutex_);
+    std::swap(chunk, current_);
+    current_.samples.reserve(chunk_size_ * 4);
+    current_.temperatures.reserve(chunk_size_);
+  }
+  return to_python(chunk);
+}
+
+size_t IMUBatcher::pending_chunks() {
+  std::lock_guard<std::mutex> lock(mutex_);
+  return ready_.size();
+}
+
+size_t IMUBatcher::dropped_samples() {
+  std::lock_guard<std::mutex> lock(mutex_);
+  return dropped_samples_;
+}
+
+void define_imu_batcher(const py::object &m) {
+  py::class_<IMUBatcher>(m, "IMUBatcher")
+      .def(py::init<size_t, size_t>(), py::arg("chunk_size") = 100,
+           py::arg("max_chunks") = 16)
+      .def("start", &IMUBatcher::start,
+           "Start an accel or gyro sensor and collect its samples natively",
+           py::arg("sensor"), py::arg("profile"),
+           py::call_guard<py::gil_scoped_release>())
+      .def("stop", &IMUBatcher::stop,
+           py::call_guard<py::gil_scoped_release>())
+      .def("set_callback", &IMUBatcher::set_callback,
+           "Call callback((samples, temperatures)) for every full chunk "
+           "instead of queueing it for read(), None to go back to read()",
+           py::arg("callback"))
+      .def("push_frame", &IMUBatcher::push_frame,
+           "Append an AccelFrame/GyroFrame, or the IMU frames of a FrameSet",
+           py::arg("frame"), py::call_guard<py::gil_scoped_release>())
+      .def("read", &IMUBatcher::read,
+           "Return the oldest full chunk as (samples (N, 4) float64 "
+           "[timestamp_us, x, y, z], temperatures (N,) float32), or None "
+           "after timeout_ms",
+           py::arg("timeout_ms") = 1000)
+      .def("flush", &IMUBatcher::flush,
+           "Return the samples of the chunk being filled")
+      .def("get_pending_chunks", &IMUBatcher::pending_chunks)
+      .def("get_dropped_samples", &IMUBatcher::dropped_samples);
+}
+
+}  // namespace pyorbbecsdk
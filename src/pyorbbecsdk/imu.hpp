@@ -0,0 +1,82 @@
+/*******************************************************************************
+ * Copyright (c) 2024 Orbbec 3D Technology, Inc
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ *******************************************************************************/
+#pragma once
+
+#include <pybind11/pybind11.h>
+
+#include <condition_variable>
+#include <deque>
+#include <libobsensor/ObSensor.hpp>
+#include <mutex>
+#include <vector>
+namespace py = pybind11;
+namespace pyorbbecsdk {
+
+// Collects accel/gyro samples on the SDK thread and hands them to Python in
+// chunks of (N, 4) [timestamp_us, x, y, z] plus N temperatures, so the GIL is
+// taken once per chunk instead of once per sample.
+class IMUBatcher {
+ public:
+  IMUBatcher(size_t chunk_size, size_t max_chunks);
+
+  ~IMUBatcher() noexcept;
+
+  void start(std::shared_ptr<ob::Sensor> sensor,
+             std::shared_ptr<ob::StreamProfile> profile);
+
+  void stop();
+
+  void set_callback(const py::object &callback);
+
+  // Append one AccelFrame/GyroFrame (or every IMU frame of a FrameSet).
+  void push_frame(const std::shared_ptr<ob::Frame> &frame);
+
+  // Oldest full chunk as (samples, temperatures), or None after timeout_ms.
+  py::object read(int timeout_ms);
+
+  // The samples not yet completing a chunk, as (samples, temperatures).
+  py::object flush();
+
+  size_t pending_chunks();
+
+  size_t dropped_samples();
+
+ private:
+  struct Chunk {
+    std::vector<double> samples;
+    std::vector<float> temperatures;
+  };
+
+  void append_sample(const std::shared_ptr<ob::Frame> &frame);
+
+  void complete_chunk(std::unique_lock<std::mutex> &lock);
+
+  static py::object to_python(const Chunk &chunk);
+
+  size_t chunk_size_;
+  size_t max_chunks_;
+  std::mutex mutex_;
+  std::condition_variable ready_cv_;
+  Chunk current_;
+  std::deque<Chunk> ready_;
+  size_t dropped_samples_ = 0;
+  std::shared_ptr<py::function> callback_;
+  std::shared_ptr<ob::Sensor> sensor_;
+};
+
+void define_imu_batcher(const py::object &m);
+
+}  // namespace pyorbbecsdk
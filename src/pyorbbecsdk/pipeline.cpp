@@ -50,13 +50,25 @@ void Pipeline::start(std::shared_ptr<ob::Config> config,
                      const py::function &callback) {
   CHECK_NULLPTR(impl_);
   CHECK_NULLPTR(config);
-  OB_TRY_CATCH({
-    impl_->start(std::move(config),
-                 [callback](std::shared_ptr<ob::FrameSet> fs) {
-                   py::gil_scoped_acquire acquire;
-                   callback(fs);
-                 });
-  });
+  // The SDK copies and destroys the frame callback on its own threads, so the
+  // Python function is shared through a holder that takes the GIL to release
+  // it. That lets start() itself run without the GIL and several pipelines
+  // start in parallel from Python threads.
+  std::shared_ptr<py::function> holder(new py::function(callback),
+                                       [](py::function *fn) {
+                                         py::gil_scoped_acquire acquire;
+                                         delete fn;
+                                       });
+  {
+    py::gil_scoped_release release;
+    OB_TRY_CATCH({
+      impl_->start(std::move(config),
+                   [holder](std::shared_ptr<ob::FrameSet> fs) {
+                     py::gil_scoped_acquire acquire;
+                     (*holder)(fs);
+                   });
+    });
+  }
   is_started_ = true;
 }
 
@@ -122,18 +134,23 @@ std::shared_ptr<ob::StreamProfileList> Pipeline::get_d2c_depth_profile_list(
 
 void define_pipeline(py::object &m) {
   py::class_<Pipeline>(m, "Pipeline")
-      .def(py::init<>())
-      .def(py::init<std::shared_ptr<ob::Device>>())
-      .def("start",
-           [](Pipeline &self, std::shared_ptr<ob::Config> config) {
-             self.start(std::move(config));
-           })
+      .def(py::init<>(), py::call_guard<py::gil_scoped_release>())
+      .def(py::init<std::shared_ptr<ob::Device>>(),
+           py::call_guard<py::gil_scoped_release>())
+      .def(
+          "start",
+          [](Pipeline &self, std::shared_ptr<ob::Config> config) {
+            self.start(std::move(config));
+          },
+          py::call_guard<py::gil_scoped_release>())
       .def("start",
            [](Pipeline &self, std::shared_ptr<ob::Config> config,
               const py::function &callback) {
              self.start(std::move(config), callback);
            })
-      .def("start", [](Pipeline &self) { self.start(nullptr); })
+      .def(
+          "start", [](Pipeline &self) { self.start(nullptr); },
+          py::call_guard<py::gil_scoped_release>())
       .def(
           "stop", [](Pipeline &self) { self.stop(); },
           py::call_guard<py::gil_scoped_release>())
@@ -24,6 +24,7 @@
 #include "error.hpp"
 #include "filter.hpp"
 #include "frame.hpp"
+#include "imu.hpp"
 #include "pipeline.hpp"
 #include "properties.hpp"
 #include "record_playback.hpp"
@@ -209,6 +210,9 @@ PYBIND11_MODULE(pyorbbecsdk, m) {
   pyorbbecsdk::define_frame_set(m);
   pyorbbecsdk::define_accel_frame(m);
   pyorbbecsdk::define_gyro_frame(m);
+  pyorbbecsdk::define_frame_factory(m);
+  pyorbbecsdk::define_frame_metadata(m);
+  pyorbbecsdk::define_imu_batcher(m);
 
   // pipeline
   pyorbbecsdk::define_pipeline(m);
@@ -290,6 +294,9 @@ PYBIND11_MODULE(pyorbbecsdk2, m) {
   pyorbbecsdk::define_frame_set(m);
   pyorbbecsdk::define_accel_frame(m);
   pyorbbecsdk::define_gyro_frame(m);
+  pyorbbecsdk::define_frame_factory(m);
+  pyorbbecsdk::define_frame_metadata(m);
+  pyorbbecsdk::define_imu_batcher(m);
 
   // pipeline
   pyorbbecsdk::define_pipeline(m);
@@ -4,7 +4,7 @@ OrbbecSDK python binding
 from __future__ import annotations
 import numpy
 import typing
-__all__ = ['AccelFrame', 'AccelStreamProfile', 'AlignFilter', 'CameraParamList', 'ColorFrame', 'Config', 'Context', 'DecimationFilter', 'DepthFrame', 'Device', 'DeviceInfo', 'DeviceList', 'DevicePresetList', 'DisparityTransform', 'Filter', 'FormatConvertFilter', 'Frame', 'FrameSet', 'GyroFrame', 'GyroStreamProfile', 'HDRMergeFilter', 'HoleFillingFilter', 'IRFrame', 'NoiseRemovalFilter', 'OBAccelFullScaleRange', 'OBAccelIntrinsic', 'OBAccelValue', 'OBAlignMode', 'OBBaselineCalibrationParam', 'OBCalibrationParam', 'OBCameraDistortion', 'OBCameraDistortionModel', 'OBCameraIntrinsic', 'OBCameraParam', 'OBCmdVersion', 'OBColorPoint', 'OBCommunicationType', 'OBCompressionMode', 'OBCompressionParams', 'OBConvertFormat', 'OBCoordinateSystemType', 'OBDCPowerState', 'OBDDONoiseRemovalType', 'OBDataTranState', 'OBDepthCroppingMode', 'OBDepthPrecisionLevel', 'OBDepthWorkMode', 'OBDepthWorkModeList', 'OBDeviceDevelopmentMode', 'OBDeviceIpAddrConfig', 'OBDeviceSyncConfig', 'OBDeviceTemperature', 'OBDeviceTimestampResetConfig', 'OBDeviceType', 'OBEdgeNoiseRemovalFilterParams', 'OBEdgeNoiseRemovalType', 'OBError', 'OBException', 'OBExtrinsic', 'OBFileTranState', 'OBFilterList', 'OBFloatPropertyRange', 'OBFormat', 'OBFrameAggregateOutputMode', 'OBFrameMetadataType', 'OBFrameType', 'OBGyroFullScaleRange', 'OBGyroIntrinsic', 'OBGyroSampleRate', 'OBHdrConfig', 'OBHoleFillingMode', 'OBIntPropertyRange', 'OBLogLevel', 'OBMediaState', 'OBMediaType', 'OBMultiDeviceSyncConfig', 'OBMultiDeviceSyncMode', 'OBNoiseRemovalFilterParams', 'OBPermissionType', 'OBPoint2f', 'OBPoint3f', 'OBPowerLineFreqMode', 'OBPropertyID', 'OBPropertyItem', 'OBPropertyType', 'OBProtocolVersion', 'OBRect', 'OBRegionOfInterest', 'OBRotateDegreeType', 'OBSensorType', 'OBSequenceIdItem', 'OBSpatialAdvancedFilterParams', 'OBStatus', 'OBStreamType', 'OBSyncMode', 'OBTofExposureThresholdControl', 'OBTofFilterRange', 'OBUSBPowerState', 'OBUint16PropertyRange', 'OBUint8PropertyRange', 'OBUpgradeState', 'Pipeline', 'PointCloudFilter', 'PointsFrame', 'Sensor', 'SensorList', 'SequenceIdFilter', 'SpatialAdvancedFilter', 'StreamProfile', 'StreamProfileList', 'TemporalFilter', 'ThresholdFilter', 'VideoFrame', 'VideoStreamProfile', 'get_version', 'transformation2dto2d', 'transformation2dto3d', 'transformation3dto2d', 'transformation3dto3d']
+__all__ = ['AccelFrame', 'AccelStreamProfile', 'AlignFilter', 'CameraParamList', 'ColorFrame', 'Config', 'Context', 'DecimationFilter', 'DepthFrame', 'Device', 'DeviceInfo', 'DeviceList', 'DevicePresetList', 'DisparityTransform', 'Filter', 'FormatConvertFilter', 'Frame', 'FrameSet', 'GyroFrame', 'GyroStreamProfile', 'HDRMergeFilter', 'HoleFillingFilter', 'IMUBatcher', 'IRFrame', 'NoiseRemovalFilter', 'OBAccelFullScaleRange', 'OBAccelIntrinsic', 'OBAccelValue', 'OBAlignMode', 'OBBaselineCalibrationParam', 'OBCalibrationParam', 'OBCameraDistortion', 'OBCameraDistortionModel', 'OBCameraIntrinsic', 'OBCameraParam', 'OBCmdVersion', 'OBColorPoint', 'OBCommunicationType', 'OBCompressionMode', 'OBCompressionParams', 'OBConvertFormat', 'OBCoordinateSystemType', 'OBDCPowerState', 'OBDDONoiseRemovalType', 'OBDataTranState', 'OBDepthCroppingMode', 'OBDepthPrecisionLevel', 'OBDepthWorkMode', 'OBDepthWorkModeList', 'OBDeviceDevelopmentMode', 'OBDeviceIpAddrConfig', 'OBDeviceSyncConfig', 'OBDeviceTemperature', 'OBDeviceTimestampResetConfig', 'OBDeviceType', 'OBEdgeNoiseRemovalFilterParams', 'OBEdgeNoiseRemovalType', 'OBError', 'OBException', 'OBExtrinsic', 'OBFileTranState', 'OBFilterList', 'OBFloatPropertyRange', 'OBFormat', 'OBFrameAggregateOutputMode', 'OBFrameMetadataType', 'OBFrameType', 'OBGyroFullScaleRange', 'OBGyroIntrinsic', 'OBGyroSampleRate', 'OBHdrConfig', 'OBHoleFillingMode', 'OBIntPropertyRange', 'OBLogLevel', 'OBMediaState', 'OBMediaType', 'OBMultiDeviceSyncConfig', 'OBMultiDeviceSyncMode', 'OBNoiseRemovalFilterParams', 'OBPermissionType', 'OBPoint2f', 'OBPoint3f', 'OBPowerLineFreqMode', 'OBPropertyID', 'OBPropertyItem', 'OBPropertyType', 'OBProtocolVersion', 'OBRect', 'OBRegionOfInterest', 'OBRotateDegreeType', 'OBSensorType', 'OBSequenceIdItem', 'OBSpatialAdvancedFilterParams', 'OBStatus', 'OBStreamType', 'OBSyncMode', 'OBTofExposureThresholdControl', 'OBTofFilterRange', 'OBUSBPowerState', 'OBUint16PropertyRange', 'OBUint8PropertyRange', 'OBUpgradeState', 'Pipeline', 'PointCloudFilter', 'PointsFrame', 'Sensor', 'SensorList', 'SequenceIdFilter', 'SpatialAdvancedFilter', 'StreamProfile', 'StreamProfileList', 'TemporalFilter', 'ThresholdFilter', 'VideoFrame', 'VideoStreamProfile', 'create_frame_set', 'create_video_frame', 'create_video_stream_profile', 'fill_metadata', 'get_metadata_dtype', 'get_version', 'transformation2dto2d', 'transformation2dto3d', 'transformation3dto2d', 'transformation3dto3d']
 class AccelFrame(Frame):
     def __repr__(self) -> None:
         ...
@@ -87,6 +87,16 @@ class Config:
         ...
 class Context:
     @staticmethod
+    def get_dropped_log_count() -> int:
+        """
+        Number of queued log messages overwritten because the queue was full
+        """
+    @staticmethod
+    def pop_log_messages(max_count: int = 256, timeout_ms: int = 100) -> list[tuple[OBLogLevel, str]]:
+        """
+        Wait up to timeout_ms for queued SDK log messages and return up to max_count of them as [(OBLogLevel, message)]
+        """
+    @staticmethod
     def set_logger_level(arg0: OBLogLevel) -> None:
         ...
     @staticmethod
@@ -99,6 +109,11 @@ class Context:
         """
         Set logger to file
         """
+    @staticmethod
+    def set_logger_to_queue(level: OBLogLevel, capacity: int = 1024) -> None:
+        """
+        Send SDK log messages to a bounded native queue read with pop_log_messages, instead of calling into Python per message
+        """
     @typing.overload
     def __init__(self) -> None:
         ...
@@ -139,6 +154,10 @@ class Device:
     __hash__: typing.ClassVar[None] = None
     def __eq__(self, arg0: Device) -> bool:
         ...
+    def clear_property_cache(self) -> None:
+        """
+        Forget the cached property types and ranges of this device
+        """
     def export_settings_as_preset_json_file(self, arg0: str) -> None:
         ...
     def get_available_preset_list(self) -> DevicePresetList:
@@ -148,7 +167,9 @@ class Device:
     def get_bool_property(self, arg0: OBPropertyID) -> bool:
         ...
     def get_bool_property_range(self, arg0: OBPropertyID) -> OBBoolPropertyRange:
-        ...
+        """
+        Get the range of a bool property. min/max/step/default are cached per device after the first call, cur is read from the device
+        """
     def get_calibration_camera_param_list(self) -> ...:
         ...
     def get_current_preset_name(self) -> str:
@@ -164,13 +185,21 @@ class Device:
     def get_float_property(self, arg0: OBPropertyID) -> float:
         ...
     def get_float_property_range(self, arg0: OBPropertyID) -> OBFloatPropertyRange:
-        ...
+        """
+        Get the range of a float property. min/max/step/default are cached per device after the first call, cur is read from the device
+        """
     def get_int_property(self, arg0: OBPropertyID) -> int:
         ...
     def get_int_property_range(self, arg0: OBPropertyID) -> OBIntPropertyRange:
-        ...
+        """
+        Get the range of an int property. min/max/step/default are cached per device after the first call, cur is read from the device
+        """
     def get_multi_device_sync_config(self) -> OBMultiDeviceSyncConfig:
         ...
+    def get_properties(self, property_ids: list[OBPropertyID]) -> dict[OBPropertyID, int | float | bool]:
+        """
+        Read several int, float or bool properties in one call, return {property_id: value}
+        """
     def get_sensor(self, arg0: OBSensorType) -> ...:
         ...
     def get_sensor_list(self) -> ...:
@@ -213,6 +242,10 @@ class Device:
         ...
     def set_multi_device_sync_config(self, arg0: OBMultiDeviceSyncConfig) -> None:
         ...
+    def set_properties(self, values: dict[OBPropertyID, int | float | bool]) -> None:
+        """
+        Write several int, float or bool properties in one call, in the order of the dict
+        """
     def set_timestamp_reset_config(self, arg0: OBDeviceTimestampResetConfig) -> None:
         ...
     def timer_sync_with_host(self) -> None:
@@ -368,6 +401,10 @@ class Frame:
         ...
     def as_video_frame(self) -> ...:
         ...
+    def get_all_metadata(self, out: numpy.ndarray | None = None, index: int = 0) -> numpy.void:
+        """
+        Read every metadata type in one call into a structured record of dtype get_metadata_dtype(), written to out[index] if out is given
+        """
     def get_data(self) -> numpy.ndarray[numpy.uint8]:
         ...
     def get_data_pointer(self) -> capsule:
@@ -461,6 +498,35 @@ class HoleFillingFilter(Filter):
         """
         Set the filling mode
         """
+class IMUBatcher:
+    def __init__(self, chunk_size: int = 100, max_chunks: int = 16) -> None:
+        ...
+    def flush(self) -> tuple[numpy.ndarray[numpy.float64], numpy.ndarray[numpy.float32]]:
+        """
+        Return the samples of the chunk being filled
+        """
+    def get_dropped_samples(self) -> int:
+        ...
+    def get_pending_chunks(self) -> int:
+        ...
+    def push_frame(self, frame: Frame) -> None:
+        """
+        Append an AccelFrame/GyroFrame, or the IMU frames of a FrameSet
+        """
+    def read(self, timeout_ms: int = 1000) -> tuple[numpy.ndarray[numpy.float64], numpy.ndarray[numpy.float32]] | None:
+        """
+        Return the oldest full chunk as (samples (N, 4) float64 [timestamp_us, x, y, z], temperatures (N,) float32), or None after timeout_ms
+        """
+    def set_callback(self, callback: typing.Callable | None) -> None:
+        """
+        Call callback((samples, temperatures)) for every full chunk instead of queueing it for read(), None to go back to read()
+        """
+    def start(self, sensor: Sensor, profile: StreamProfile) -> None:
+        """
+        Start an accel or gyro sensor and collect its samples natively
+        """
+    def stop(self) -> None:
+        ...
 class IRFrame(VideoFrame):
     pass
 class NoiseRemovalFilter(Filter):
@@ -3548,6 +3614,26 @@ class VideoStreamProfile(StreamProfile):
         ...
     def get_width(self) -> int:
         ...
+def create_frame_set(frames: list[Frame]) -> FrameSet:
+    """
+    Bundle frames into a FrameSet, e.g. to feed filters in tests
+    """
+def create_video_frame(frame_type: OBFrameType, format: OBFormat, width: int, height: int, data: numpy.ndarray[numpy.uint8], timestamp_us: int = 0, system_timestamp_us: int = 0, stream_profile: StreamProfile = None, depth_scale: float = 1.0) -> VideoFrame:
+    """
+    Create a video frame filled with a copy of data, without a device
+    """
+def create_video_stream_profile(stream_type: OBStreamType, format: OBFormat, width: int, height: int, fps: int, intrinsic: OBCameraIntrinsic, distortion: OBCameraDistortion) -> VideoStreamProfile:
+    """
+    Create a video stream profile with the given intrinsics
+    """
+def fill_metadata(frames: list[Frame], out: numpy.ndarray, start: int = 0) -> int:
+    """
+    Write the metadata records of frames into out[start:start + len(frames)] with the GIL released, return the number of rows
+    """
+def get_metadata_dtype() -> numpy.dtype:
+    """
+    NumPy dtype of the records filled by Frame.get_all_metadata and fill_metadata: a 'present' bitmask and one int64 per OBFrameMetadataType
+    """
 def get_version() -> str:
     ...
 def transformation2dto2d(arg0: OBPoint2f, arg1: float, arg2: OBCameraIntrinsic, arg3: OBCameraDistortion, arg4: OBCameraIntrinsic, arg5: OBCameraDistortion, arg6: OBExtrinsic) -> OBPoint2f:
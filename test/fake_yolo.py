@@ -0,0 +1,37 @@
+# Stand-ins for the parts of an ultralytics YOLO model the yoloCode modules use,
+# shared by the tests that run detection without a real model.
+
+
+class FakeBox:
+    def __init__(self, cls_id, xyxy):
+        self.cls = [cls_id]
+        self.xyxy = [xyxy]
+
+
+class FakeResult:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+class FakeModel:
+    """Returns the boxes set on it for every image"""
+    names = {0: "grey", 1: "head"}
+
+    def __init__(self):
+        self.boxes = []
+
+    def __call__(self, img, verbose=False):
+        return [FakeResult(self.boxes)]
+
+
+class FakeBatchModel:
+    """Puts a box at (value, value) for an image filled with value, records batch sizes"""
+    names = {0: "grey", 1: "head"}
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, images, verbose=False):
+        self.calls.append(len(images))
+        return [FakeResult([FakeBox(0, (img[0, 0, 0], img[0, 0, 0], img[0, 0, 0] + 10, img[0, 0, 0] + 10))])
+                for img in images]
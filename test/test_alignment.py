@@ -0,0 +1,63 @@
+import os
+import socket
+import sys
+import time
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "yoloCode", "codever2"))
+from alignment import alignment_command, closest_boxes, head_alignment_command, sample_depth
+from robot_standin import RobotStandIn
+from fake_yolo import FakeBox, FakeResult
+
+
+class AlignmentTest(unittest.TestCase):
+
+    def test_alignment_command_order(self):
+        self.assertEqual(alignment_command(150, 150, 500), "lleft")
+        self.assertEqual(alignment_command(0, -50, 500), "mlow")
+        self.assertEqual(alignment_command(0, 0, 290), "mdown")
+        self.assertEqual(alignment_command(0, 0, 100), "up")
+        self.assertEqual(alignment_command(-1, 0, 250), "stopz")
+
+    def test_head_alignment_command(self):
+        self.assertEqual(head_alignment_command(10, 5), "rzP")
+        self.assertEqual(head_alignment_command(10, 15), "rzM")
+        self.assertEqual(head_alignment_command(10, 11), "stopc")
+
+    def test_closest_boxes(self):
+        results = [FakeResult([
+            FakeBox(0, (0, 0, 20, 20)),
+            FakeBox(0, (300, 220, 340, 260)),
+            FakeBox(1, (100, 100, 120, 120)),
+            FakeBox(2, (310, 230, 330, 250)),
+        ])]
+        best = closest_boxes(results, {0: "grey", 1: "head", 2: "other"}, ("grey", "head"), (480, 640, 3))
+        self.assertEqual(best["grey"], (320, 240, 300, 220, 340, 260))
+        self.assertEqual(best["head"][:2], (110, 110))
+        self.assertEqual(closest_boxes([], {}, ("grey",), (480, 640, 3)), {"grey": None})
+
+    def test_sample_depth_out_of_range(self):
+        depth = np.full((4, 4), 7.0, dtype=np.float32)
+        self.assertEqual(sample_depth(depth, 1, 2), 7.0)
+        self.assertEqual(sample_depth(depth, 4, 0), 0)
+
+
+class RobotStandInTest(unittest.TestCase):
+
+    def test_splits_concatenated_commands(self):
+        with RobotStandIn() as robot:
+            with socket.create_connection((robot.host, robot.port)) as sock:
+                sock.sendall(b"lleftmdo")
+                time.sleep(0.05)
+                sock.sendall(b"wnleftstopzrzP")
+            deadline = time.time() + 2
+            while len(robot.received) < 5 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual([c for c, _ in robot.received], ["lleft", "mdown", "left", "stopz", "rzP"])
+            self.assertEqual(robot.counts()["rzP"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from urllib.request import Request, urlopen
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "yoloCode", "codever2"))
+from alignment_engine import MOVE_ABSOLUTE, AlignmentEngine, default_config
+from calibration import fit_calibration
+from robot_standin import RobotStandIn
+from service import ControlServer
+from fake_yolo import FakeBox, FakeModel
+
+
+class AlignmentEngineTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.robot = RobotStandIn()
+        config = dict(default_config, IP_ROBOT=self.robot.host, PORT=self.robot.port,
+                      FLIP_IMAGE=False, MAIN_LABEL="grey", HEAD_LABEL="head")
+        self.engine = AlignmentEngine(config)
+        self.engine.model = FakeModel()
+        self.color = np.zeros((480, 640, 3), dtype=np.uint8)
+        self.depth = np.full((480, 640), 260.0, dtype=np.float32)
+
+    def tearDown(self) -> None:
+        if self.engine.sock:
+            self.engine.sock.close()
+        self.robot.close()
+
+    def received(self, count):
+        deadline = time.time() + 2
+        while len(self.robot.received) < count and time.time() < deadline:
+            time.sleep(0.01)
+        return [command for command, _ in self.robot.received]
+
+    def test_no_commands_without_robot(self):
+        self.engine.model.boxes = [FakeBox(0, (400, 200, 440, 240))]
+        result = self.engine.process_images(self.color, self.depth)
+        self.assertEqual((result.x, result.y, result.z), (100, 20, 260))
+        self.assertIs(self.engine.latest(), result)
+        self.assertFalse(self.engine.again())
+
+    def test_rz_then_position(self):
+        self.assertTrue(self.engine.connect())
+        self.assertTrue(self.engine.again())
+        # หัวอยู่สูงกว่าตัววัตถุ -> หมุน rz ก่อน
+        self.engine.model.boxes = [FakeBox(0, (400, 200, 440, 240)), FakeBox(1, (400, 100, 440, 140))]
+        self.engine.process_images(self.color, self.depth)
+        # หัวอยู่ระดับเดียวกัน -> stopc แล้วเริ่มเลื่อนตำแหน่งในเฟรมเดียวกันเลย
+        self.engine.model.boxes = [FakeBox(0, (400, 200, 440, 240)), FakeBox(1, (400, 200, 440, 240))]
+        self.engine.process_images(self.color, self.depth)
+        self.assertFalse(self.engine.adjust_position)
+        self.engine.process_images(self.color, self.depth)
+        self.assertEqual(self.received(4), ["rzM", "stopc", "lleft", "lleft"])
+
+    def test_absolute_move_then_one_verification_word(self):
+        camera = np.array([(80, 60), (560, 60), (80, 420), (560, 420), (320, 240)], dtype=np.float64)
+        self.engine.calibration = fit_calibration(camera, camera * 0.5 + (100.0, -50.0), kind="affine")
+        self.engine.set_modes(mode_rz=2, move_mode=MOVE_ABSOLUTE)
+        now = [0.0]
+        self.engine.clock = lambda: now[0]
+        self.assertTrue(self.engine.connect())
+        self.engine.again()
+        self.engine.model.boxes = [FakeBox(0, (400, 200, 440, 240))]
+        self.engine.process_images(self.color, self.depth)
+        self.assertEqual(self.received(1), ["move"])
+        np.testing.assert_allclose(self.robot.moves[0], [310.0, 60.0], atol=1e-6)
+        # ยังไม่ถึง VERIFY_DELAY_S ไม่ส่งอะไรเพิ่ม
+        self.engine.process_images(self.color, self.depth)
+        now[0] = self.engine.verify_delay
+        self.engine.model.boxes = [FakeBox(0, (300, 220, 340, 260))]
+        self.engine.process_images(self.color, self.depth)
+        self.assertEqual(self.received(3), ["move", "down", "stopz"])
+        self.assertTrue(self.engine.adjust_position)
+        self.assertEqual(self.engine.status()["commands_sent"], 3)
+
+    def test_absolute_without_calibration_uses_words(self):
+        self.engine.calibration = None
+        self.engine.set_modes(mode_rz=2, move_mode=MOVE_ABSOLUTE, verify_move=0)
+        self.assertFalse(self.engine.verify_move)
+        with self.assertRaises(ValueError):
+            self.engine.set_modes(move_mode="teleport")
+        self.assertTrue(self.engine.connect())
+        self.engine.again()
+        self.engine.model.boxes = [FakeBox(0, (400, 200, 440, 240))]
+        self.engine.process_images(self.color, self.depth)
+        self.assertEqual(self.received(1), ["lleft"])
+
+    def test_runs_on_recorded_frames(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for i in range(3):
+                cv2.imwrite(os.path.join(folder, f"color_{i}.png"), self.color)
+                cv2.imwrite(os.path.join(folder, f"depth_{i}.png"), self.depth.astype(np.uint16))
+            self.engine.config = dict(self.engine.config, VIRTUAL_SOURCE=folder, VIRTUAL_FPS=0)
+            self.engine.model.boxes = [FakeBox(0, (400, 200, 440, 240))]
+            self.engine.start()
+            try:
+                result = self.engine.wait_latest(timeout=2)
+            finally:
+                self.engine._running = False
+                self.engine.pipeline.stop()
+        self.assertIsNotNone(result)
+        self.assertEqual((result.x, result.y, result.z), (100, 20, 260))
+        self.assertEqual(self.engine.status()["camera_reconnects"], [])
+
+    def test_control_server(self):
+        server = ControlServer(("127.0.0.1", 0), self.engine)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with urlopen(Request(base + "/mode?rz=2&repeat=2&verify=0", method="POST")) as response:
+                status = json.load(response)
+            self.assertEqual((status["mode_rz"], status["mode_repeat"]), (2, 2))
+            self.assertEqual((status["move_mode"], status["verify_move"]), ("iterative", False))
+            with urlopen(Request(base + "/connect", method="POST")) as response:
+                self.assertTrue(json.load(response)["ok"])
+            with urlopen(base + "/status") as response:
+                self.assertTrue(json.load(response)["connected"])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "yoloCode", "codever2"))
+from calibration import (AFFINE, HOMOGRAPHY, RIGID, SIMILARITY, Calibration, DotAccumulator, apply_transform,
+                         apply_transform_3d, deproject, fit_calibration, fit_hand_eye, sample_depths, umeyama,
+                         unflip)
+
+# กล้องมองลงโต๊ะ: แกนสลับและกลับทิศ 0.5 mm/pixel
+AFFINE_MATRIX = np.array([[0.0, -0.5, 350.0],
+                          [0.5, 0.0, -120.0],
+                          [0.0, 0.0, 1.0]])
+
+
+def grid_points(rows=4, cols=5):
+    xs, ys = np.meshgrid(np.linspace(80, 560, cols), np.linspace(60, 420, rows))
+    return np.stack([xs.ravel(), ys.ravel()], axis=1)
+
+
+class DotAccumulatorTest(unittest.TestCase):
+
+    def test_matches_dots_across_frames_in_any_order(self):
+        rng = np.random.default_rng(1)
+        truth = grid_points()
+        accumulator = DotAccumulator(capacity=20)
+        for _ in range(20):
+            noisy = truth + rng.normal(0, 0.5, truth.shape)
+            accumulator.add(noisy[rng.permutation(len(noisy))])
+        means, jitter, counts = accumulator.dots()
+        self.assertEqual(len(means), len(truth))
+        order = np.lexsort((truth[:, 0], truth[:, 1]))
+        np.testing.assert_allclose(means, truth[order], atol=0.5)
+        self.assertTrue(np.all(counts == 20))
+        self.assertTrue(np.all(jitter < 2.0))
+
+    def test_missed_detections_and_min_count(self):
+        accumulator = DotAccumulator(capacity=10)
+        for i in range(10):
+            points = [(100, 100), (300, 200)] if i % 2 else [(100, 100)]
+            accumulator.add(points)
+        np.testing.assert_array_equal(accumulator.counts(), [10, 5])
+        self.assertEqual(len(accumulator.dots(min_count=6)[0]), 1)
+        self.assertEqual(len(accumulator.dots(min_count=5)[0]), 2)
+
+    def test_ring_buffer_forgets_old_frames(self):
+        accumulator = DotAccumulator(capacity=5, match_radius=5.0)
+        for _ in range(5):
+            accumulator.add([(100, 100)])
+        for _ in range(5):
+            accumulator.add([(103, 100)])
+        means = accumulator.dots()[0]
+        np.testing.assert_allclose(means, [[103, 100]])
+
+    def test_rows_split_on_y_gaps(self):
+        # y 14 และ 16 อยู่แถวเดียวกันแม้จะปัดเศษ y / match_radius ได้คนละค่า
+        accumulator = DotAccumulator(match_radius=10.0)
+        accumulator.add([(10, 60), (50, 16), (100, 14), (30, 58)])
+        np.testing.assert_allclose(accumulator.dots()[0], [[50, 16], [100, 14], [10, 60], [30, 58]])
+
+    def test_max_dots(self):
+        accumulator = DotAccumulator(max_dots=3)
+        accumulator.add(grid_points())
+        self.assertEqual(len(accumulator), 3)
+        accumulator.add(np.empty((0, 6)))
+        self.assertEqual(accumulator.frames, 2)
+
+
+class FitCalibrationTest(unittest.TestCase):
+
+    def test_affine_with_outlier(self):
+        camera = grid_points()
+        robot = apply_transform(AFFINE_MATRIX, camera)
+        robot[3] += (25.0, -40.0)  # จุดที่กรอกพิกัดหุ่นผิด
+        calibration = fit_calibration(camera, robot, threshold=1.0)
+        self.assertEqual(calibration.kind, AFFINE)
+        np.testing.assert_allclose(calibration.matrix, AFFINE_MATRIX, atol=1e-6)
+        self.assertFalse(calibration.inliers[3])
+        self.assertEqual(calibration.inliers.sum(), len(camera) - 1)
+        self.assertLess(calibration.rms, 1e-6)
+        self.assertGreater(calibration.errors[3], 40.0)
+
+    def test_homography_when_perspective(self):
+        homography = np.array([[0.5, 0.02, 10.0], [0.01, 0.55, -20.0], [4e-4, 3e-4, 1.0]])
+        camera = grid_points()
+        robot = apply_transform(homography, camera)
+        calibration = fit_calibration(camera, robot)
+        self.assertEqual(calibration.kind, HOMOGRAPHY)
+        self.assertLess(calibration.rms, 1e-3)
+        np.testing.assert_allclose(calibration.to_robot(camera[:2]), robot[:2], atol=1e-3)
+
+    def test_three_points_affine_only(self):
+        camera = grid_points()[:3] + [(0, 0), (0, 30), (0, 60)]
+        calibration = fit_calibration(camera, apply_transform(AFFINE_MATRIX, camera))
+        self.assertEqual(calibration.kind, AFFINE)
+        with self.assertRaises(ValueError):
+            fit_calibration(camera[:2], camera[:2])
+
+    def test_save_and_load(self):
+        camera = grid_points()
+        calibration = fit_calibration(camera, apply_transform(AFFINE_MATRIX, camera), image_size=(640, 480))
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "calibration.json")
+            self.assertIsNone(Calibration.load(path))
+            calibration.save(path)
+            loaded = Calibration.load(path)
+        self.assertEqual(loaded.summary(), calibration.summary())
+        self.assertEqual(loaded.image_size, (640, 480))
+        np.testing.assert_allclose(loaded.to_robot([[320, 240]]), calibration.to_robot([[320, 240]]))
+
+
+INTRINSIC = (600.0, 600.0, 319.5, 239.5)
+
+
+def rotation(yaw, pitch, roll):
+    cz, sz, cy, sy, cx, sx = np.cos(yaw), np.sin(yaw), np.cos(pitch), np.sin(pitch), np.cos(roll), np.sin(roll)
+    rz = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    ry = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    rx = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    return rz @ ry @ rx
+
+
+def hand_eye_matrix(scale=1.0):
+    matrix = np.eye(4)
+    matrix[:3, :3] = scale * rotation(np.pi / 2, 0.05, np.pi)  # กล้องคว่ำมองลง
+    matrix[:3, 3] = (420.0, -35.0, 610.0)
+    return matrix
+
+
+class HandEyeTest(unittest.TestCase):
+
+    def test_deproject_and_sample_depths(self):
+        depth = np.zeros((480, 640), dtype=np.float32)
+        depth[230:250, 310:330] = 500.0
+        depth[240, 320] = 0.0  # รูใน depth
+        depths = sample_depths(depth, [(320, 240), (10, 10)])
+        self.assertEqual(depths[0], 500.0)
+        self.assertTrue(np.isnan(depths[1]))
+        xyz = deproject([(319.5, 239.5), (919.5, 239.5)], [500.0, 300.0], INTRINSIC)
+        np.testing.assert_allclose(xyz, [[0, 0, 500], [300, 0, 300]])
+        np.testing.assert_allclose(unflip([(0, 0)], (640, 480)), [[639, 479]])
+
+    def test_umeyama_recovers_rigid_and_similarity(self):
+        rng = np.random.default_rng(2)
+        src = rng.uniform(-100, 100, (12, 3)) + (0, 0, 500)
+        for scale in (1.0, 1.03):
+            truth = hand_eye_matrix(scale)
+            matrix = umeyama(src, apply_transform_3d(truth, src), with_scale=scale != 1.0)
+            np.testing.assert_allclose(matrix, truth, atol=1e-9)
+            self.assertAlmostEqual(np.linalg.det(matrix[:3, :3]), scale ** 3)
+
+    def test_fit_hand_eye_rejects_outlier_and_missing_depth(self):
+        rng = np.random.default_rng(3)
+        camera = rng.uniform(-150, 150, (10, 3)) + (0, 0, 550)
+        robot = apply_transform_3d(hand_eye_matrix(), camera) + rng.normal(0, 0.2, (10, 3))
+        robot[4] += (30, 0, 0)
+        camera[7, 2] = np.nan
+        calibration = fit_hand_eye(camera, robot, threshold=2.0, intrinsic=INTRINSIC)
+        self.assertEqual(calibration.kind, RIGID)
+        self.assertFalse(calibration.inliers[4])
+        self.assertFalse(calibration.inliers[7])
+        self.assertEqual(calibration.inliers.sum(), 8)
+        self.assertLess(calibration.rms, 1.0)
+        np.testing.assert_allclose(calibration.matrix, hand_eye_matrix(), atol=1.0)
+        self.assertEqual(fit_hand_eye(camera, robot, with_scale=True, threshold=2.0).kind, SIMILARITY)
+
+    def test_target_from_flipped_pixels_and_depth(self):
+        truth = hand_eye_matrix()
+        pixels = np.array([(100.0, 80.0), (500.0, 400.0), (320.0, 240.0)])
+        depths = np.array([520.0, 610.0, 560.0])
+        camera = deproject(unflip(pixels, (640, 480)), depths, INTRINSIC)
+        calibration = fit_hand_eye(np.vstack([camera, camera[:2] + (0, 50, 0)]),
+                                   apply_transform_3d(truth, np.vstack([camera, camera[:2] + (0, 50, 0)])),
+                                   intrinsic=INTRINSIC, image_size=(640, 480), flip=True)
+        depth = np.zeros((480, 640), dtype=np.float32)
+        for (u, v), z in zip(unflip(pixels, (640, 480)).astype(int), depths):
+            depth[v - 3:v + 4, u - 3:u + 4] = z
+        np.testing.assert_allclose(calibration.target(pixels, depth), apply_transform_3d(truth, camera), atol=1e-6)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "calibration.json")
+            calibration.save(path)
+            loaded = Calibration.load(path)
+        self.assertTrue(loaded.is_3d)
+        np.testing.assert_allclose(loaded.target(pixels, depths), calibration.target(pixels, depth), atol=1e-6)
+        with self.assertRaises(ValueError):
+            fit_calibration(pixels, pixels).target(pixels, depth)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -48,6 +48,25 @@ class ContextTest(unittest.TestCase):
     def test_set_logger_to_file(self):
         self.context.set_logger_to_file(OBLogLevel.DEBUG, "test.log")
 
+    def test_set_logger_to_queue(self):
+        Context.set_logger_to_queue(OBLogLevel.DEBUG, capacity=2)
+        try:
+            while Context.pop_log_messages(timeout_ms=0):
+                pass
+            dropped = Context.get_dropped_log_count()
+            # creating a context and enumerating devices logs well over two DEBUG lines
+            context = Context()
+            context.query_devices()
+            self.assertGreater(Context.get_dropped_log_count(), dropped)
+            messages = Context.pop_log_messages(max_count=1, timeout_ms=1000)
+            self.assertEqual(len(messages), 1)
+            level, message = messages[0]
+            self.assertIsInstance(level, OBLogLevel)
+            self.assertIsInstance(message, str)
+            self.assertLessEqual(len(Context.pop_log_messages(timeout_ms=0)), 1)
+        finally:
+            Context.set_logger_to_queue(OBLogLevel.NONE)
+
 
 if __name__ == '__main__':
     print("Start test Context interface, Please make sure you have connected a device to your computer.")
@@ -0,0 +1,90 @@
+import csv
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "yoloCode", "codever2"))
+from dataset_recorder import DatasetRecorder, MANIFEST_FIELDS
+
+
+class FakeWriter:
+    """Records submitted paths, drops every path whose sub folder is in ``drop``"""
+
+    def __init__(self, drop=()):
+        self.drop = set(drop)
+        self.submitted = []
+
+    def submit(self, path, image):
+        if os.path.basename(os.path.dirname(path)) in self.drop:
+            return False
+        self.submitted.append(path)
+        return True
+
+
+class DatasetRecorderTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.root = tempfile.TemporaryDirectory()
+        self.color = np.zeros((4, 4, 3), dtype=np.uint8)
+        self.depth = np.zeros((4, 4), dtype=np.uint16)
+
+    def tearDown(self) -> None:
+        self.root.cleanup()
+
+    def read_manifest(self, recorder):
+        with open(os.path.join(recorder.folder, "manifest.csv"), newline="") as f:
+            return list(csv.reader(f))
+
+    def test_index_and_manifest(self):
+        writer = FakeWriter()
+        recorder = DatasetRecorder(self.root.name, writer)
+        self.assertEqual(recorder.add(self.color, self.depth, 10, 11, 12, 1.0), 0)
+        self.assertEqual(recorder.add(self.color), 1)
+        recorder.close()
+        rows = self.read_manifest(recorder)
+        self.assertEqual(rows[0], MANIFEST_FIELDS)
+        self.assertEqual(rows[1], ["0", os.path.join("color", "000000.jpg"), os.path.join("depth", "000000.png"),
+                                   "10", "11", "12", "1.0", "0"])
+        self.assertEqual(rows[2], ["1", os.path.join("color", "000001.jpg"), "", "", "", "", "", "0"])
+        self.assertEqual(writer.submitted, [
+            os.path.join(recorder.folder, "color", "000000.jpg"),
+            os.path.join(recorder.folder, "depth", "000000.png"),
+            os.path.join(recorder.folder, "color", "000001.jpg"),
+        ])
+        self.assertEqual((recorder.saved, recorder.dropped, recorder.depth_dropped), (2, 0, 0))
+
+    def test_dropped_color_skips_pair(self):
+        writer = FakeWriter(drop={"color"})
+        recorder = DatasetRecorder(self.root.name, writer)
+        self.assertIsNone(recorder.add(self.color, self.depth))
+        recorder.close()
+        self.assertEqual(writer.submitted, [])
+        self.assertEqual(len(self.read_manifest(recorder)), 1)
+        self.assertEqual((recorder.saved, recorder.dropped, recorder.next_index), (0, 1, 0))
+
+    def test_dropped_depth_is_recorded(self):
+        writer = FakeWriter(drop={"depth"})
+        recorder = DatasetRecorder(self.root.name, writer)
+        self.assertEqual(recorder.add(self.color, self.depth), 0)
+        recorder.close()
+        row = self.read_manifest(recorder)[1]
+        self.assertEqual(row[MANIFEST_FIELDS.index("depth_file")], "")
+        self.assertEqual(row[MANIFEST_FIELDS.index("depth_dropped")], "1")
+        self.assertEqual((recorder.saved, recorder.dropped, recorder.depth_dropped), (1, 0, 1))
+
+    def test_close(self):
+        recorder = DatasetRecorder(self.root.name, FakeWriter())
+        recorder.add(self.color)
+        recorder.close()
+        recorder.close()
+        self.assertTrue(recorder._manifest_file.closed)
+        self.assertEqual(len(self.read_manifest(recorder)), 2)
+        with self.assertRaises(ValueError):
+            recorder.add(self.color)
+
+
+if __name__ == '__main__':
+    unittest.main()
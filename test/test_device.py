@@ -78,6 +78,48 @@ class DeviceTest(unittest.TestCase):
         self.assertIsNotNone(temperature)
         print("Device temperature: ", temperature)
 
+    def test_get_set_properties(self):
+        property_ids = []
+        for i in range(self.device.get_support_property_count()):
+            item = self.device.get_supported_property(i)
+            if item.type != OBPropertyType.OB_STRUCT_PROPERTY and \
+                    item.permission in (OBPermissionType.PERMISSION_READ, OBPermissionType.PERMISSION_READ_WRITE):
+                property_ids.append(item.id)
+        values = self.device.get_properties(property_ids)
+        self.assertEqual(set(values), set(property_ids))
+        print("Properties: ", values)
+        gain = OBPropertyID.OB_PROP_COLOR_GAIN_INT
+        if gain not in values:
+            return
+        gain_range = self.device.get_int_property_range(gain)
+        self.assertIs(type(values[gain]), int)
+        new_gain = values[gain] + gain_range.step if values[gain] < gain_range.max else values[gain] - gain_range.step
+        self.device.set_properties({gain: new_gain})
+        self.assertEqual(self.device.get_properties([gain])[gain], new_gain)
+        self.assertEqual(self.device.get_int_property_range(gain).current, new_gain)
+        self.device.set_properties({gain: values[gain]})
+
+    def test_property_range_cache(self):
+        gain = OBPropertyID.OB_PROP_COLOR_GAIN_INT
+        if not self.device.is_property_supported(gain, OBPermissionType.PERMISSION_READ):
+            return
+        first = self.device.get_int_property_range(gain)
+        second = self.device.get_int_property_range(gain)
+        self.assertEqual((first.min, first.max, first.step), (second.min, second.max, second.step))
+        self.device.clear_property_cache()
+        third = self.device.get_int_property_range(gain)
+        self.assertEqual((first.min, first.max), (third.min, third.max))
+
+    def test_property_range_current_is_live(self):
+        gain = OBPropertyID.OB_PROP_COLOR_GAIN_INT
+        if not self.device.is_property_supported(gain, OBPermissionType.PERMISSION_READ_WRITE):
+            return
+        self.device.get_int_property_range(gain)
+        presets = self.device.get_available_preset_list()
+        if presets.get_count() > 0:
+            self.device.load_preset(self.device.get_current_preset_name())
+        self.assertEqual(self.device.get_int_property_range(gain).current, self.device.get_int_property(gain))
+
 
 if __name__ == '__main__':
     print("Start test Device interface, Please make sure you have connected a device to your computer.")
@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples"))
+from device_group import FrameFanIn, load_sync_config, DEFAULT_SYNC_CONFIG_FILE
+
+
+class FrameFanInTest(unittest.TestCase):
+
+    def test_items_come_out_in_arrival_order(self):
+        fan_in = FrameFanIn(3)
+        for index, item in ((2, "a"), (0, "b"), (2, "c"), (1, "d")):
+            fan_in.put(index, item)
+        self.assertEqual([fan_in.get(timeout=0) for _ in range(4)], [(2, "a"), (0, "b"), (2, "c"), (1, "d")])
+        self.assertIsNone(fan_in.get(timeout=0.01))
+
+    def test_overflow_drops_oldest_of_that_source_only(self):
+        fan_in = FrameFanIn(2, max_buffer_size=2)
+        for item in range(5):
+            fan_in.put(0, item)
+        fan_in.put(1, "x")
+        self.assertEqual(fan_in.pending(), [2, 1])
+        self.assertEqual(fan_in.dropped, [3, 0])
+        self.assertEqual([fan_in.get(timeout=0) for _ in range(3)], [(0, 3), (0, 4), (1, "x")])
+        self.assertIsNone(fan_in.get(timeout=0.01))
+
+    def test_wake_unblocks_consumer(self):
+        fan_in = FrameFanIn(1)
+        results = []
+        consumer = threading.Thread(target=lambda: results.append(fan_in.get()))
+        consumer.start()
+        fan_in.wake()
+        consumer.join(timeout=1)
+        self.assertEqual(results, [None])
+
+    def test_concurrent_producers(self):
+        fan_in = FrameFanIn(8, max_buffer_size=1000)
+
+        def produce(index):
+            for item in range(200):
+                fan_in.put(index, item)
+
+        threads = [threading.Thread(target=produce, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seen = [[] for _ in range(8)]
+        for _ in range(8 * 200):
+            index, item = fan_in.get(timeout=1)
+            seen[index].append(item)
+        self.assertTrue(all(items == list(range(200)) for items in seen))
+
+
+class SyncConfigTest(unittest.TestCase):
+
+    def test_load_repo_config(self):
+        config = load_sync_config(DEFAULT_SYNC_CONFIG_FILE)
+        self.assertEqual(sorted(entry["mode"] for entry in config.values()), ["PRIMARY", "SECONDARY"])
+
+    def test_load_keyed_by_serial(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"devices": [{"serial_number": "X1", "config": {"mode": "FREE_RUN"}}]}, f)
+        try:
+            self.assertEqual(load_sync_config(f.name), {"X1": {"mode": "FREE_RUN"}})
+        finally:
+            os.remove(f.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "yoloCode", "codever2"))
+from frame_dedup import FrameDeduplicator
+
+
+class FrameDeduplicatorTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.rng = np.random.default_rng(0)
+        self.dedup = FrameDeduplicator(threshold=0.02, history=4)
+
+    def random_frame(self):
+        # blocky content survives the thumbnail downscale, unlike per-pixel noise
+        blocks = self.rng.integers(0, 256, (24, 32, 3), dtype=np.uint8)
+        return np.repeat(np.repeat(blocks, 20, axis=0), 20, axis=1)
+
+    def test_skips_near_duplicates(self):
+        frame = self.random_frame()
+        self.assertFalse(self.dedup.is_duplicate(frame))
+        noisy = np.clip(frame.astype(np.int16) + self.rng.integers(-2, 3, frame.shape), 0, 255).astype(np.uint8)
+        self.assertTrue(self.dedup.is_duplicate(noisy))
+        self.assertFalse(self.dedup.is_duplicate(self.random_frame()))
+        self.assertEqual(self.dedup.seen, 3)
+        self.assertEqual(self.dedup.kept, 2)
+        self.assertAlmostEqual(self.dedup.keep_ratio, 2 / 3)
+
+    def test_history_is_bounded(self):
+        first = self.random_frame()
+        self.dedup.is_duplicate(first)
+        for _ in range(4):
+            self.assertFalse(self.dedup.is_duplicate(self.random_frame()))
+        # the first frame has been pushed out of the 4-entry history
+        self.assertFalse(self.dedup.is_duplicate(first))
+
+    def test_reset(self):
+        self.dedup.is_duplicate(self.random_frame())
+        self.dedup.reset()
+        self.assertEqual(self.dedup.seen, 0)
+        self.assertEqual(self.dedup.keep_ratio, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
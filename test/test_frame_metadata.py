@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+from pyorbbecsdk import *
+
+WIDTH, HEIGHT = 4, 2
+
+
+def make_frame():
+    return create_video_frame(OBFrameType.COLOR_FRAME, OBFormat.RGB, WIDTH, HEIGHT,
+                              np.zeros(WIDTH * HEIGHT * 3, dtype=np.uint8))
+
+
+class FrameMetadataTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.dtype = get_metadata_dtype()
+
+    def test_dtype_matches_metadata_types(self):
+        types = sorted((member for name, member in OBFrameMetadataType.__members__.items() if name != "COUNT"),
+                       key=int)
+        self.assertEqual(len(types), int(OBFrameMetadataType.COUNT))
+        self.assertEqual(self.dtype.names, ("present",) + tuple(t.name.lower() for t in types))
+        self.assertEqual(self.dtype["present"], np.dtype("<u8"))
+        self.assertTrue(all(self.dtype[name] == np.dtype("<i8") for name in self.dtype.names[1:]))
+        self.assertEqual(self.dtype.itemsize, 8 * (len(types) + 1))
+
+    def test_frame_without_metadata(self):
+        record = make_frame().get_all_metadata()
+        self.assertEqual(record.dtype, self.dtype)
+        self.assertEqual(int(record["present"]), 0)
+        self.assertTrue(all(int(record[name]) == 0 for name in self.dtype.names[1:]))
+
+    def test_out_and_index(self):
+        out = np.zeros(3, dtype=self.dtype)
+        out["present"] = 7
+        out["exposure"] = 5
+        record = make_frame().get_all_metadata(out, 1)
+        self.assertEqual(int(record["present"]), 0)
+        self.assertEqual(out["present"].tolist(), [7, 0, 7])
+        self.assertEqual(out["exposure"].tolist(), [5, 0, 5])
+        # the returned record is a view of the written row
+        out[1]["gain"] = 3
+        self.assertEqual(int(record["gain"]), 3)
+
+    def test_invalid_out(self):
+        frame = make_frame()
+        with self.assertRaises(ValueError):
+            frame.get_all_metadata(np.zeros(2, dtype=np.int64))
+        with self.assertRaises(ValueError):
+            frame.get_all_metadata(np.zeros(4, dtype=self.dtype)[::2])
+        with self.assertRaises(ValueError):
+            frame.get_all_metadata([0, 0])
+        with self.assertRaises(IndexError):
+            frame.get_all_metadata(np.zeros(2, dtype=self.dtype), 2)
+
+    def test_fill_metadata(self):
+        frames = [make_frame() for _ in range(3)]
+        out = np.full(5, 1, dtype=self.dtype)
+        self.assertEqual(fill_metadata(frames, out, 1), 3)
+        self.assertEqual(out["present"].tolist(), [1, 0, 0, 0, 1])
+        self.assertEqual(fill_metadata([], out), 0)
+        with self.assertRaises(IndexError):
+            fill_metadata(frames, out, 3)
+        with self.assertRaises(ValueError):
+            fill_metadata(frames, np.zeros(5, dtype=np.uint64))
+        with self.assertRaises(ValueError):
+            fill_metadata(frames, np.zeros(10, dtype=self.dtype)[::2])
+
+
+if __name__ == '__main__':
+    unittest.main()
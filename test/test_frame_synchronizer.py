@@ -0,0 +1,81 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples"))
+from frame_synchronizer import MultiDeviceFrameSynchronizer, frame_timestamp_us
+
+
+class SyntheticFrame:
+    def __init__(self, device, timestamp_us, global_timestamp_us=None):
+        self.device = device
+        self.timestamp_us = timestamp_us
+        self.global_timestamp_us = timestamp_us if global_timestamp_us is None else global_timestamp_us
+
+    def get_timestamp_us(self):
+        return self.timestamp_us
+
+    def get_global_timestamp_us(self):
+        return self.global_timestamp_us
+
+
+class FrameSynchronizerTest(unittest.TestCase):
+
+    def test_frame_timestamp_falls_back_to_device_time(self):
+        self.assertEqual(frame_timestamp_us(SyntheticFrame(0, 100, 500)), 500)
+        self.assertEqual(frame_timestamp_us(SyntheticFrame(0, 100, 0)), 100)
+        self.assertEqual(frame_timestamp_us(SyntheticFrame(0, 100, 500), use_global=False), 100)
+
+    def test_matches_frames_within_tolerance(self):
+        sync = MultiDeviceFrameSynchronizer(3, tolerance_us=1000)
+        for t in range(5):
+            for device, offset in enumerate((0, 300, -400)):
+                sync.push(device, SyntheticFrame(device, t * 33333 + offset))
+        groups = [sync.get(timeout=0) for _ in range(4)]
+        self.assertNotIn(None, groups)
+        self.assertIsNone(sync.get(timeout=0))
+        self.assertEqual([f.device for f in groups[0].frames], [0, 1, 2])
+        self.assertEqual(groups[-1].skew_us, 700)
+        stats = sync.get_stats()
+        self.assertEqual(stats["matched"], 5)
+        self.assertEqual(stats["groups_dropped"], 1)
+        self.assertEqual(stats["skew_max_us"], 700)
+
+    def test_drops_frames_that_cannot_match(self):
+        sync = MultiDeviceFrameSynchronizer(2, tolerance_us=1000)
+        sync.push(0, SyntheticFrame(0, 0))
+        sync.push(0, SyntheticFrame(0, 33000))
+        sync.push(1, SyntheticFrame(1, 33200))
+        group = sync.get(timeout=0)
+        self.assertEqual([f.timestamp_us for f in group.frames], [33000, 33200])
+        self.assertEqual(sync.get_stats()["unmatched"], [1, 0])
+        self.assertEqual(sync.pending(), [0, 0])
+
+    def test_stalled_device_bounds_queues(self):
+        sync = MultiDeviceFrameSynchronizer(2, tolerance_us=1000, max_queue_size=4)
+        for t in range(10):
+            sync.push(0, SyntheticFrame(0, t * 1000))
+        self.assertEqual(sync.pending(), [4, 0])
+        self.assertEqual(sync.get_stats()["overflowed"], [6, 0])
+        self.assertIsNone(sync.get(timeout=0.01))
+
+    def test_callback_and_threads(self):
+        groups = []
+        sync = MultiDeviceFrameSynchronizer(2, tolerance_us=2000, max_queue_size=128, on_group=groups.append)
+
+        def produce(device):
+            for t in range(100):
+                sync.push(device, SyntheticFrame(device, t * 10000 + device * 500))
+
+        threads = [threading.Thread(target=produce, args=(d,)) for d in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(groups), 100)
+        self.assertTrue(all(group.skew_us == 500 for group in groups))
+
+
+if __name__ == '__main__':
+    unittest.main()
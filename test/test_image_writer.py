@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples"))
+from image_writer import ImageWriter
+
+
+class BlockingImageWriter(ImageWriter):
+    """ImageWriter whose workers wait on an event before writing"""
+
+    def __init__(self, *args, **kwargs):
+        self.release = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _write(self, path, image):
+        self.release.wait()
+        return super()._write(path, image)
+
+
+class ImageWriterTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.image = np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_write_formats(self):
+        depth = np.arange(48 * 64, dtype=np.uint16).reshape((48, 64))
+        with ImageWriter(num_workers=2) as writer:
+            self.assertTrue(writer.submit(os.path.join(self.tmp_dir.name, "a.jpg"), self.image))
+            self.assertTrue(writer.submit(os.path.join(self.tmp_dir.name, "b.png"), self.image))
+            self.assertTrue(writer.submit(os.path.join(self.tmp_dir.name, "c.raw"), depth))
+        stats = writer.get_stats()
+        self.assertEqual(stats["written"], 3)
+        self.assertEqual(stats["queue_depth"], 0)
+        raw = np.fromfile(os.path.join(self.tmp_dir.name, "c.raw"), dtype=np.uint16)
+        self.assertTrue(np.array_equal(raw.reshape((48, 64)), depth))
+
+    def test_drop_policy(self):
+        writer = BlockingImageWriter(num_workers=1, max_queue_size=1)
+        results = [writer.submit(os.path.join(self.tmp_dir.name, f"{i}.png"), self.image) for i in range(5)]
+        writer.release.set()
+        writer.close()
+        self.assertFalse(all(results))
+        stats = writer.get_stats()
+        self.assertEqual(stats["dropped"], results.count(False))
+        self.assertEqual(stats["written"], results.count(True))
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            ImageWriter(policy="unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
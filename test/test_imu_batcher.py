@@ -0,0 +1,119 @@
+import threading
+import unittest
+
+import numpy as np
+from pyorbbecsdk import *
+
+FRAME_COUNT = 10
+
+
+def color_frame():
+    return create_video_frame(OBFrameType.COLOR_FRAME, OBFormat.RGB, 4, 2, np.zeros(4 * 2 * 3, dtype=np.uint8))
+
+
+class IMUBatcherTest(unittest.TestCase):
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            IMUBatcher(chunk_size=0)
+        with self.assertRaises(ValueError):
+            IMUBatcher(max_chunks=0)
+
+    def test_non_imu_frames_are_ignored(self):
+        batcher = IMUBatcher(chunk_size=1)
+        batcher.push_frame(color_frame())
+        self.assertIsNone(batcher.read(timeout_ms=10))
+        samples, temperatures = batcher.flush()
+        self.assertEqual(samples.shape, (0, 4))
+        self.assertEqual(temperatures.shape, (0,))
+        self.assertEqual(batcher.get_pending_chunks(), 0)
+        self.assertEqual(batcher.get_dropped_samples(), 0)
+
+
+class IMUBatcherDeviceTest(unittest.TestCase):
+    """Feeds accel frames captured from a device through push_frame, so chunk boundaries are exact"""
+
+    def setUp(self) -> None:
+        self.context = Context()
+        device_list = self.context.query_devices()
+        if device_list.get_count() == 0:
+            self.skipTest("No device connected")
+        self.device = device_list.get_device_by_index(0)
+        try:
+            sensor = self.device.get_sensor(OBSensorType.ACCEL_SENSOR)
+        except OBError:
+            self.skipTest("Device has no accel sensor")
+        self.frames = []
+        done = threading.Event()
+
+        def on_frame(frame):
+            if len(self.frames) < FRAME_COUNT:
+                self.frames.append(frame.as_accel_frame())
+            if len(self.frames) == FRAME_COUNT:
+                done.set()
+
+        profile = sensor.get_stream_profile_list().get_stream_profile_by_index(0)
+        sensor.start(profile, on_frame)
+        try:
+            self.assertTrue(done.wait(5), "no accel frames received")
+        finally:
+            sensor.stop()
+
+    def tearDown(self) -> None:
+        self.frames = None
+        self.device = None
+        self.context = None
+
+    def timestamps(self, frames):
+        return [float(frame.get_timestamp_us()) for frame in frames]
+
+    def test_chunk_boundaries(self):
+        batcher = IMUBatcher(chunk_size=4, max_chunks=16)
+        for frame in self.frames:
+            batcher.push_frame(frame)
+        self.assertEqual(batcher.get_pending_chunks(), 2)
+        for start in (0, 4):
+            samples, temperatures = batcher.read(timeout_ms=100)
+            self.assertEqual(samples.shape, (4, 4))
+            self.assertEqual(temperatures.shape, (4,))
+            self.assertEqual(samples[:, 0].tolist(), self.timestamps(self.frames[start:start + 4]))
+            self.assertAlmostEqual(samples[0, 1], self.frames[start].get_x(), places=5)
+        self.assertIsNone(batcher.read(timeout_ms=10))
+        samples, temperatures = batcher.flush()
+        self.assertEqual(samples[:, 0].tolist(), self.timestamps(self.frames[8:]))
+        self.assertEqual(batcher.flush()[0].shape, (0, 4))
+        self.assertEqual(batcher.get_dropped_samples(), 0)
+
+    def test_overflow_drops_oldest_chunks(self):
+        batcher = IMUBatcher(chunk_size=2, max_chunks=2)
+        for frame in self.frames:
+            batcher.push_frame(frame)
+        # 5 chunks complete, only the newest 2 fit
+        self.assertEqual(batcher.get_pending_chunks(), 2)
+        self.assertEqual(batcher.get_dropped_samples(), 6)
+        self.assertEqual(batcher.read(timeout_ms=100)[0][:, 0].tolist(), self.timestamps(self.frames[6:8]))
+        self.assertEqual(batcher.read(timeout_ms=100)[0][:, 0].tolist(), self.timestamps(self.frames[8:]))
+        self.assertEqual(batcher.get_pending_chunks(), 0)
+
+    def test_frame_set(self):
+        batcher = IMUBatcher(chunk_size=4)
+        batcher.push_frame(create_frame_set([self.frames[0], color_frame()]))
+        samples, _ = batcher.flush()
+        self.assertEqual(samples[:, 0].tolist(), self.timestamps(self.frames[:1]))
+
+    def test_callback_replaces_queue(self):
+        chunks = []
+        batcher = IMUBatcher(chunk_size=2, max_chunks=1)
+        batcher.set_callback(chunks.append)
+        for frame in self.frames[:4]:
+            batcher.push_frame(frame)
+        batcher.set_callback(None)
+        self.assertEqual([c[0][:, 0].tolist() for c in chunks],
+                         [self.timestamps(self.frames[:2]), self.timestamps(self.frames[2:4])])
+        self.assertEqual(batcher.get_pending_chunks(), 0)
+        self.assertEqual(batcher.get_dropped_samples(), 0)
+
+
+if __name__ == '__main__':
+    print("Start test IMUBatcher, the device tests need a connected device with an IMU.")
+    unittest.main()
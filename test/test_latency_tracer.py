@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "yoloCode", "codever2"))
+from latency_tracer import LatencyTracer, MAX_CALLBACK_DELAY_US, TOTAL, Trace
+
+
+def make_trace(system_timestamp_us, callback_us, *stages):
+    """Trace whose callback ran at ``callback_us`` followed by (stage, time_us) marks"""
+    trace = Trace(0, 0, system_timestamp_us)
+    trace.marks.append(("callback", callback_us * 1000))
+    trace.marks.extend((stage, t_us * 1000) for stage, t_us in stages)
+    return trace
+
+
+class LatencyTracerTest(unittest.TestCase):
+
+    def test_stage_math(self):
+        tracer = LatencyTracer()
+        tracer.finish(make_trace(1_000_000, 1_002_000, ("dequeue", 1_003_000), ("decode", 1_003_500),
+                                 ("inference", 1_013_500), ("send", 1_014_000)))
+        summary = tracer.summary()
+        self.assertEqual(summary["callback"]["mean"], 2.0)
+        self.assertEqual(summary["dequeue"]["mean"], 1.0)
+        self.assertEqual(summary["decode"]["mean"], 0.5)
+        self.assertEqual(summary["inference"]["mean"], 10.0)
+        self.assertEqual(summary["send"]["mean"], 0.5)
+        # total นับจากตอน callback บนนาฬิกาเครื่อง ไม่รวมช่วง SDK -> callback
+        self.assertEqual(summary[TOTAL]["mean"], 12.0)
+        self.assertNotIn("depth", summary)
+
+    def test_callback_skipped_on_other_clock(self):
+        tracer = LatencyTracer()
+        # SDK timestamp จากนาฬิกาอื่น (เช่นนับตั้งแต่บูต) ห่างจากเวลาเครื่องมาก
+        tracer.finish(make_trace(5_000, 1_700_000_000_000_000, ("dequeue", 1_700_000_000_001_000)))
+        tracer.finish(make_trace(1_000_000 + MAX_CALLBACK_DELAY_US + 1, 1_000_000, ("dequeue", 1_001_000)))
+        summary = tracer.summary()
+        self.assertNotIn("callback", summary)
+        self.assertEqual(summary["dequeue"]["count"], 2)
+        self.assertEqual(summary[TOTAL]["max"], 1.0)
+
+    def test_window_wraparound(self):
+        tracer = LatencyTracer(window=4)
+        for latency_ms in range(1, 7):
+            tracer._record("decode", float(latency_ms))
+        np.testing.assert_array_equal(tracer._samples["decode"], [5, 6, 3, 4])
+        summary = tracer.summary()["decode"]
+        self.assertEqual(summary["count"], 6)
+        self.assertEqual(summary["mean"], 4.5)
+        self.assertEqual(summary["max"], 6.0)
+        self.assertEqual(summary["p50"], 4.5)
+
+    def test_unknown_stage_and_partial_window(self):
+        tracer = LatencyTracer(window=8)
+        tracer._record("custom", 2.0)
+        tracer._record("custom", 4.0)
+        summary = tracer.summary()["custom"]
+        self.assertEqual((summary["count"], summary["mean"], summary["max"]), (2, 3.0, 4.0))
+
+    def test_disabled(self):
+        tracer = LatencyTracer(enabled=False)
+        self.assertIsNone(tracer.begin_at(0, 0))
+        tracer.mark(None, "decode")
+        tracer.finish(None)
+        self.assertEqual(tracer.summary(), {})
+
+    def test_chrome_trace_starts_at_sdk_timestamp(self):
+        tracer = LatencyTracer()
+        tracer.finish(make_trace(1_000_000, 1_002_000, ("dequeue", 1_003_000)))
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "trace.json")
+            tracer.export_chrome_trace(path)
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+        self.assertEqual([(e["name"], e["ts"], e["dur"]) for e in events],
+                         [("callback", 1_000_000, 2_000), ("dequeue", 1_002_000, 1_000)])
+
+
+if __name__ == '__main__':
+    unittest.main()
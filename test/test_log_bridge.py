@@ -0,0 +1,83 @@
+import logging
+import logging.handlers
+import os
+import sys
+import time
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples"))
+from log_bridge import RateLimitFilter, setup_logging
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def make_record(msg, *args, name="test", level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 0, msg, args, None)
+
+
+class RateLimitFilterTest(unittest.TestCase):
+
+    def test_burst_then_suppress(self):
+        limiter = RateLimitFilter(rate=0.001, burst=3)
+        passed = [limiter.filter(make_record("frame %d dropped", i)) for i in range(10)]
+        self.assertEqual(passed, [True] * 3 + [False] * 7)
+        self.assertEqual(limiter.suppressed, 7)
+
+    def test_messages_differing_in_numbers_share_a_bucket(self):
+        limiter = RateLimitFilter(rate=0.001, burst=1)
+        self.assertTrue(limiter.filter(make_record("frame 1021 dropped")))
+        self.assertFalse(limiter.filter(make_record("frame 1022 dropped")))
+        self.assertTrue(limiter.filter(make_record("device lost")))
+        self.assertTrue(limiter.filter(make_record("frame 1 dropped", level=logging.WARNING)))
+
+    def test_reports_suppressed_count_after_refill(self):
+        limiter = RateLimitFilter(rate=50.0, burst=1)
+        self.assertTrue(limiter.filter(make_record("tick %s", "a")))
+        self.assertFalse(limiter.filter(make_record("tick %s", "b")))
+        time.sleep(0.05)
+        record = make_record("tick %s", "x")
+        self.assertTrue(limiter.filter(record))
+        self.assertEqual(record.getMessage(), "tick x (suppressed 1 similar)")
+
+    def test_forgets_oldest_keys(self):
+        limiter = RateLimitFilter(rate=0.001, burst=1, max_keys=2)
+        for msg in ("a", "b", "c"):
+            limiter.filter(make_record(msg))
+        self.assertTrue(limiter.filter(make_record("a")))
+
+
+class SetupLoggingTest(unittest.TestCase):
+
+    def test_records_reach_handler_through_queue(self):
+        logger = logging.getLogger("test_log_bridge.queue")
+        logger.propagate = False
+        handler = ListHandler()
+        listener = setup_logging(logging.INFO, rate=0.001, burst=2, handlers=[handler], logger=logger)
+        try:
+            self.assertTrue(any(isinstance(h, logging.handlers.QueueHandler) for h in logger.handlers))
+            for i in range(5):
+                logger.info("sent %d", i)
+            logger.debug("hidden")
+        finally:
+            listener.stop()
+        self.assertEqual(handler.messages, ["sent 0", "sent 1"])
+
+    def test_replaces_previous_queue_handler(self):
+        logger = logging.getLogger("test_log_bridge.replace")
+        logger.propagate = False
+        first = setup_logging(handlers=[ListHandler()], logger=logger)
+        second = setup_logging(handlers=[ListHandler()], logger=logger)
+        first.stop()
+        second.stop()
+        self.assertEqual(sum(isinstance(h, logging.handlers.QueueHandler) for h in logger.handlers), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
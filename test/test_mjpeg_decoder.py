@@ -0,0 +1,96 @@
+import concurrent.futures
+import os
+import sys
+import threading
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples"))
+from image_writer import BLOCK_POLICY
+from mjpeg_decoder import MJPEGDecoder
+
+
+def make_jpeg(width, height, value):
+    image = np.full((height, width, 3), value, dtype=np.uint8)
+    ok, data = cv2.imencode(".jpg", image)
+    return data.reshape(-1)
+
+
+class MJPEGDecoderTest(unittest.TestCase):
+
+    def test_order_preserved(self):
+        # ขนาดสลับกันทำให้ถอดเสร็จไม่ตามลำดับ แต่ get ต้องคืนตามลำดับที่ส่ง
+        sizes = [(1280, 720), (64, 48)] * 10
+        with MJPEGDecoder(num_workers=4, max_pending=len(sizes), use_turbojpeg=False) as decoder:
+            for i, (width, height) in enumerate(sizes):
+                self.assertTrue(decoder.submit(make_jpeg(width, height, i * 10), context=i))
+            for i, (width, height) in enumerate(sizes):
+                context, image = decoder.get(timeout=5)
+                self.assertEqual(context, i)
+                self.assertEqual(image.shape, (height, width, 3))
+                self.assertAlmostEqual(int(image[0, 0, 0]), i * 10, delta=2)
+            self.assertIsNone(decoder.get())
+
+    def test_scaled_decode(self):
+        data = make_jpeg(1920, 1080, 128)
+        with MJPEGDecoder(target_width=640, use_turbojpeg=False) as decoder:
+            self.assertEqual(decoder.decode(data, 1920).shape, (540, 960, 3))
+            self.assertEqual(decoder.decode(data).shape, (1080, 1920, 3))
+        with MJPEGDecoder(target_width=200, use_turbojpeg=False) as decoder:
+            self.assertEqual(decoder.decode(data, 1920).shape, (135, 240, 3))
+
+    def test_drop_when_full(self):
+        with MJPEGDecoder(num_workers=1, max_pending=2, use_turbojpeg=False) as decoder:
+            data = make_jpeg(64, 48, 0)
+            results = [decoder.submit(data) for _ in range(4)]
+            self.assertEqual(results, [True, True, False, False])
+            self.assertEqual(decoder.dropped, 2)
+            decoder.get(timeout=5)
+            self.assertTrue(decoder.submit(data))
+
+    def test_block_policy(self):
+        with MJPEGDecoder(num_workers=2, max_pending=1, policy=BLOCK_POLICY, use_turbojpeg=False) as decoder:
+            data = make_jpeg(64, 48, 0)
+            self.assertTrue(decoder.submit(data, context=0))
+            decoder.get(timeout=5)
+            self.assertTrue(decoder.submit(data, context=1))
+            self.assertEqual(decoder.get(timeout=5)[0], 1)
+
+    def test_decode_error_releases_slot(self):
+        class FailingDecoder(MJPEGDecoder):
+            def decode(self, data, width=0):
+                raise ValueError("corrupt")
+
+        with FailingDecoder(num_workers=1, max_pending=1, use_turbojpeg=False) as decoder:
+            data = make_jpeg(64, 48, 0)
+            self.assertTrue(decoder.submit(data))
+            with self.assertRaises(ValueError):
+                decoder.get(timeout=5)
+            self.assertEqual(decoder.pending(), 0)
+            self.assertTrue(decoder.submit(data))
+
+    def test_timeout_keeps_frame_queued(self):
+        release = threading.Event()
+
+        class SlowDecoder(MJPEGDecoder):
+            def decode(self, data, width=0):
+                release.wait(5)
+                return super().decode(data, width)
+
+        with SlowDecoder(num_workers=1, max_pending=1, use_turbojpeg=False) as decoder:
+            data = make_jpeg(64, 48, 0)
+            self.assertTrue(decoder.submit(data, context=0))
+            with self.assertRaises(concurrent.futures.TimeoutError):
+                decoder.get(timeout=0.05)
+            self.assertEqual(decoder.pending(), 1)
+            self.assertFalse(decoder.submit(data))
+            release.set()
+            self.assertEqual(decoder.get(timeout=5)[0], 0)
+            self.assertTrue(decoder.submit(data))
+            self.assertEqual(decoder.get(timeout=5)[0], None)
+
+
+if __name__ == '__main__':
+    unittest.main()
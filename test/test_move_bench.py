@@ -0,0 +1,58 @@
+import os
+import socket
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "yoloCode", "codever2"))
+from move_bench import run_bench
+from robot_standin import SimulatedRobot
+
+
+class SimulatedRobotTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.now = [0.0]
+        self.robot = SimulatedRobot((0.0, 0.0, 400.0), speed=100.0, overhead_s=0.1, clock=lambda: self.now[0])
+        self.sock = socket.create_connection((self.robot.host, self.robot.port))
+
+    def tearDown(self) -> None:
+        self.sock.close()
+        self.robot.close()
+
+    def send(self, data, count):
+        self.sock.sendall(data.encode())
+        self.assertTrue(self.robot.wait_for(count))
+
+    def test_absolute_move_split_across_packets(self):
+        self.send("move(100.00,", 0)
+        self.send("-50.00,300.00)stopz", 2)
+        self.assertEqual([command for command, _ in self.robot.received], ["move", "stopz"])
+        self.assertEqual(self.robot.moves, [[100.0, -50.0, 300.0]])
+        self.assertAlmostEqual(self.robot.busy_until, 0.1 + 150.0 / 100.0)
+        np.testing.assert_allclose(self.robot.pose_at(0.8), [50.0, -25.0, 350.0])
+        np.testing.assert_allclose(self.robot.pose_at(10.0), [100.0, -50.0, 300.0])
+
+    def test_words_dropped_while_moving(self):
+        self.send("lleft", 1)
+        self.send("mtop", 2)  # หุ่นยังเลื่อน lleft อยู่
+        self.assertEqual(self.robot.dropped, 1)
+        self.now[0] = 1.0
+        self.send("down", 3)
+        np.testing.assert_allclose(self.robot.pose_at(2.0), [20.0, 0.0, 399.5])
+
+
+class MoveBenchTest(unittest.TestCase):
+
+    def test_absolute_moves_shorten_the_cycle(self):
+        report = run_bench(parts=2, seed=1)
+        iterative, absolute = report["modes"]["iterative"], report["modes"]["absolute"]
+        self.assertEqual((iterative["failed"], absolute["failed"]), (0, 0))
+        self.assertLess(absolute["cycle_mean_s"], iterative["cycle_mean_s"])
+        self.assertLessEqual(absolute["commands_mean"], 3)
+        self.assertLess(absolute["error_max_mm"], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "yoloCode", "codever2"))
+from multi_camera import BatchDetector
+from fake_yolo import FakeBatchModel
+
+
+def image(value):
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+class BatchDetectorTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.model = FakeBatchModel()
+        self.detector = BatchDetector(self.model, tolerance_us=10000, max_wait_ms=20)
+        for serial in ("A", "B", "C"):
+            self.detector.register(serial)
+
+    def test_single_batch_scattered_by_serial(self):
+        self.detector.submit("A", 1000, image(10))
+        self.detector.submit("B", 2000, image(20))
+        self.detector.submit("C", 3000, image(30))
+        detections = self.detector.detect(timeout=1)
+        self.assertEqual(self.model.calls, [3])
+        self.assertEqual(sorted(detections), ["A", "B", "C"])
+        self.assertEqual(detections["B"].main_obj[:2], (25, 25))
+        self.assertEqual(detections["C"].timestamp_us, 3000)
+        self.assertEqual(self.detector.stats()["mean_batch_size"], 3)
+
+    def test_out_of_tolerance_waits_for_next_batch(self):
+        self.detector.submit("A", 0, image(10))
+        self.detector.submit("B", 50000, image(20))
+        self.detector.submit("C", 52000, image(30))
+        self.assertEqual(sorted(self.detector.detect(timeout=1)), ["B", "C"])
+        self.assertEqual(sorted(self.detector.detect(timeout=1)), ["A"])
+
+    def test_partial_batch_after_max_wait(self):
+        self.detector.submit("A", 0, image(10))
+        start = time.perf_counter()
+        detections = self.detector.detect(timeout=1)
+        self.assertEqual(list(detections), ["A"])
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(self.detector.detect(timeout=0.05), {})
+
+    def test_submit_from_threads(self):
+        threads = [threading.Thread(target=self.detector.submit, args=(s, 0, image(i)))
+                   for i, s in enumerate("ABC")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(self.detector.detect(timeout=1)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
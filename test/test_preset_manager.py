@@ -0,0 +1,143 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples"))
+from preset_manager import SETTINGS_FIELDS, PresetManager
+
+METADATA_DTYPE = np.dtype([("present", "<u8")] + [(name, "<i8") for name in SETTINGS_FIELDS])
+
+
+class FakeFrame:
+    def __init__(self, **values):
+        self.record = np.zeros((), dtype=METADATA_DTYPE)
+        for name, value in values.items():
+            self.record[name] = value
+
+    def get_all_metadata(self):
+        return self.record
+
+
+class FakeFrameSet:
+    def __init__(self, **values):
+        self.depth = FakeFrame(**values)
+
+    def get_depth_frame(self):
+        return self.depth
+
+    def get_color_frame(self):
+        return None
+
+
+class FakePresetList:
+    def __init__(self, names):
+        self.names = names
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        return self.names[index]
+
+
+class FakeDevice:
+    def __init__(self, names=("Default", "High Accuracy")):
+        self.names = list(names)
+        self.current = self.names[0]
+        self.list_calls = 0
+        self.loaded = []
+        self.on_load = None
+
+    def get_current_preset_name(self):
+        return self.current
+
+    def get_available_preset_list(self):
+        self.list_calls += 1
+        return FakePresetList(self.names)
+
+    def load_preset(self, name):
+        if self.on_load:
+            self.on_load()
+        self.loaded.append(("name", name))
+        self.current = name
+
+    def load_preset_from_json_data(self, name, data):
+        self.loaded.append(("json", name, data))
+        self.current = name
+
+
+class PresetManagerTest(unittest.TestCase):
+
+    def test_available_is_cached(self):
+        device = FakeDevice()
+        manager = PresetManager(device)
+        self.assertEqual(manager.available(), ["Default", "High Accuracy"])
+        manager.available()
+        self.assertEqual(device.list_calls, 1)
+        manager.refresh()
+        manager.available()
+        self.assertEqual(device.list_calls, 2)
+
+    def test_preload_folder_and_apply_from_memory(self):
+        device = FakeDevice()
+        manager = PresetManager(device)
+        with tempfile.TemporaryDirectory() as folder:
+            for name in ("part_a", "part_b"):
+                with open(os.path.join(folder, name + ".json"), "w") as f:
+                    json.dump({"name": name}, f)
+            self.assertEqual(manager.preload(folder), ["part_a", "part_b"])
+        self.assertIn("part_b", manager.available())
+        manager.apply("part_b")
+        self.assertEqual(device.loaded[-1][:2], ("json", "part_b"))
+        self.assertEqual(json.loads(device.loaded[-1][2]), {"name": "part_b"})
+
+    def test_unknown_preset(self):
+        with self.assertRaises(ValueError):
+            PresetManager(FakeDevice()).apply("missing")
+
+    def test_tags_first_frameset_with_new_metadata(self):
+        device = FakeDevice()
+        manager = PresetManager(device)
+        self.assertEqual(manager.on_frames(FakeFrameSet(exposure=100, gain=16)), "Default")
+        device.on_load = lambda: manager.on_frames(FakeFrameSet(exposure=100, gain=16))
+        record = manager.apply("High Accuracy")
+        self.assertEqual(record["stale_frames"], 1)
+        # frames still exposed with the old settings after the SDK call returned
+        self.assertEqual(manager.on_frames(FakeFrameSet(exposure=100, gain=16)), "Default")
+        self.assertIsNone(record["first_frame_ms"])
+        self.assertEqual(manager.on_frames(FakeFrameSet(exposure=200, gain=16)), "High Accuracy")
+        self.assertTrue(record["metadata_changed"])
+        self.assertGreaterEqual(record["first_frame_ms"], record["apply_ms"])
+        self.assertEqual(record["previous"], "Default")
+        self.assertTrue(manager.wait(0))
+        stats = manager.get_stats()
+        self.assertEqual((stats["switches"], stats["completed"], stats["metadata_changed"]), (1, 1, 1))
+
+    def test_falls_back_to_first_frame_after_apply(self):
+        device = FakeDevice()
+        manager = PresetManager(device, settle_frames=3)
+        manager.on_frames(FakeFrameSet(exposure=100))
+        record = manager.apply("High Accuracy")
+        for _ in range(3):
+            self.assertEqual(manager.on_frames(FakeFrameSet(exposure=100)), "Default")
+        self.assertEqual(manager.on_frames(FakeFrameSet(exposure=100)), "High Accuracy")
+        self.assertFalse(record["metadata_changed"])
+        self.assertIsNotNone(record["first_frame_ms"])
+
+    def test_wait_returns_when_tagged(self):
+        manager = PresetManager(FakeDevice())
+        manager.on_frames(FakeFrameSet(gain=1))
+        manager.apply("High Accuracy")
+        self.assertFalse(manager.wait(0.01))
+        threading.Timer(0.05, manager.on_frames, (FakeFrameSet(gain=2),)).start()
+        self.assertTrue(manager.wait(2.0))
+        self.assertEqual(manager.current, "High Accuracy")
+
+
+if __name__ == "__main__":
+    unittest.main()
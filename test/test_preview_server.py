@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import unittest
+from urllib.request import urlopen
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "yoloCode", "codever2"))
+from alignment_engine import FrameResult
+from preview_server import BOUNDARY, PreviewServer
+
+
+class PreviewServerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.preview = PreviewServer("127.0.0.1", 0, width=160, fps=0)
+        color = np.zeros((480, 640, 3), dtype=np.uint8)
+        depth = np.tile(np.arange(640, dtype=np.float32), (480, 1))
+        self.result = FrameResult(1, color, depth, (320, 240, 300, 220, 340, 260), None)
+
+    def tearDown(self) -> None:
+        self.preview.close()
+
+    def test_idle_without_clients(self):
+        for _ in range(10):
+            self.preview.publish(self.result)
+        time.sleep(0.05)
+        self.assertEqual(self.preview.encoded, 0)
+
+    def test_stream_color(self):
+        with urlopen(f"http://127.0.0.1:{self.preview.port}/color.mjpg", timeout=5) as response:
+            self.assertIn(BOUNDARY, response.headers["Content-Type"])
+            deadline = time.time() + 2
+            while self.preview.clients == 0 and time.time() < deadline:
+                time.sleep(0.01)
+            self.preview.publish(self.result)
+            self.assertEqual(response.readline().strip(), f"--{BOUNDARY}".encode())
+            headers = {}
+            while True:
+                line = response.readline().strip()
+                if not line:
+                    break
+                key, value = line.decode().split(":", 1)
+                headers[key] = value.strip()
+            jpeg = response.read(int(headers["Content-Length"]))
+        self.assertEqual(jpeg[:2], b"\xff\xd8")
+        self.assertEqual(self.preview.encoded, 1)
+
+    def test_unknown_stream(self):
+        with self.assertRaises(Exception):
+            urlopen(f"http://127.0.0.1:{self.preview.port}/ir.mjpg", timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples"))
+from profile_cache import ProfileCache, StreamRequest
+
+
+class FakeProfile:
+    def get_type(self):
+        return SimpleNamespace(name="COLOR_STREAM")
+
+    def get_width(self):
+        return 640
+
+    def get_height(self):
+        return 480
+
+    def get_format(self):
+        return SimpleNamespace(name="RGB")
+
+    def get_fps(self):
+        return 30
+
+
+class ProfileCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "cache", "profiles.json")
+        self.color = StreamRequest("COLOR_SENSOR", 640, 0, "RGB", 30)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_request_key_distinguishes_wildcards(self):
+        self.assertNotEqual(StreamRequest("DEPTH_SENSOR").key(), StreamRequest("DEPTH_SENSOR", fps=30).key())
+
+    def test_miss_then_hit_after_reload(self):
+        cache = ProfileCache(self.path)
+        self.assertEqual(cache.lookup("SN1", self.color), (False, None))
+        cache.put("SN1", self.color, FakeProfile())
+        cache.put("SN1", StreamRequest("IR_SENSOR", optional=True), None)
+        cache.save()
+
+        reloaded = ProfileCache(self.path)
+        self.assertEqual(reloaded.lookup("SN1", self.color), (True, ["COLOR_STREAM", 640, 480, "RGB", 30]))
+        self.assertEqual(reloaded.lookup("SN1", StreamRequest("IR_SENSOR", optional=True)), (True, None))
+        self.assertEqual(reloaded.lookup("SN2", self.color), (False, None))
+        self.assertEqual((reloaded.hits, reloaded.misses), (2, 1))
+
+    def test_invalidate(self):
+        cache = ProfileCache(self.path)
+        cache.put("SN1", self.color, FakeProfile())
+        cache.invalidate("SN1")
+        self.assertFalse(cache.lookup("SN1", self.color)[0])
+
+    def test_corrupt_file_is_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        cache = ProfileCache(self.path)
+        self.assertFalse(cache.lookup("SN1", self.color)[0])
+        cache.save()
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
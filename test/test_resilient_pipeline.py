@@ -0,0 +1,275 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples"))
+from resilient_pipeline import CONNECTED, DISCONNECTED, ResilientPipeline
+
+
+class FakeDeviceInfo:
+    def __init__(self, serial_number):
+        self.serial_number = serial_number
+
+    def get_serial_number(self):
+        return self.serial_number
+
+
+class FakeDevice:
+    def __init__(self, serial_number):
+        self.serial_number = serial_number
+        self.properties = {}
+
+    def get_device_info(self):
+        return FakeDeviceInfo(self.serial_number)
+
+    def set_int_property(self, property_id, value):
+        self.properties[property_id] = value
+
+    set_bool_property = set_float_property = set_int_property
+
+
+class FakeDeviceList:
+    def __init__(self, *devices):
+        self.devices = list(devices)
+
+    def get_count(self):
+        return len(self.devices)
+
+    def get_device_by_index(self, index):
+        return self.devices[index]
+
+    def get_device_serial_number_by_index(self, index):
+        return self.devices[index].serial_number
+
+    def get_device_by_serial_number(self, serial_number):
+        return next(device for device in self.devices if device.serial_number == serial_number)
+
+
+class FakeContext:
+    def __init__(self, *devices):
+        self.devices = FakeDeviceList(*devices)
+        self.callback = None
+
+    def query_devices(self):
+        return self.devices
+
+    def set_device_changed_callback(self, callback):
+        self.callback = callback
+
+
+class FakePipeline:
+    def __init__(self, device, fail=False):
+        self.device = device
+        self.fail = fail
+        self.callback = None
+        self.stopped = False
+
+    def start(self, config, callback):
+        if self.fail:
+            raise RuntimeError("device busy")
+        self.config = config
+        self.callback = callback
+
+    def stop(self):
+        self.stopped = True
+
+
+class FakeFrame:
+    """Plain frame as Filter.process returns it, as_frame_set() gives back the set it wraps"""
+
+    def __init__(self, frame_type, value=None, frame_set=None):
+        self.frame_type = frame_type
+        self.value = value
+        self.frame_set = frame_set
+
+    def get_type(self):
+        return self.frame_type
+
+    def as_frame_set(self):
+        return self.frame_set
+
+
+class FakeFrameSet:
+    def __init__(self, *frames):
+        self.frames = list(frames)
+
+    def get_count(self):
+        return len(self.frames)
+
+    def get_frame_by_index(self, index):
+        return self.frames[index]
+
+    def get_depth_frame(self):
+        return next((frame for frame in self.frames if frame.get_type() == "DEPTH"), None)
+
+    def values(self):
+        return {frame.get_type(): frame.value for frame in self.frames}
+
+
+class FakeAlignFilter:
+    """Set-level filter: returns a plain frame wrapping a new set, like the SDK's Filter.process"""
+
+    def process(self, frames):
+        aligned = FakeFrameSet(*(FakeFrame(f.get_type(), f"aligned-{f.value}") for f in frames.frames))
+        return FakeFrame("FRAME_SET", frame_set=aligned)
+
+
+class FakeDepthFilter:
+    def process(self, frame):
+        assert frame.get_type() == "DEPTH", "depth filters only get the depth frame"
+        return FakeFrame("DEPTH", f"smoothed-{frame.value}")
+
+
+class FakeResilientPipeline(ResilientPipeline):
+    """ResilientPipeline on fake devices, counts how often a config is built"""
+    builds = 0
+    failing_opens = 0
+
+    def _create_pipeline(self, device):
+        fail = self.failing_opens > 0
+        self.failing_opens -= fail
+        return FakePipeline(device, fail)
+
+    def _make_frame_set(self, frames):
+        return FakeFrameSet(*frames)
+
+    def _build_config(self, pipeline):
+        self.builds += 1
+        return "config"
+
+
+class ResilientPipelineTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.device = FakeDevice("SN1")
+        self.context = FakeContext(FakeDevice("SN0"), self.device)
+        self.frames = []
+        self.pipeline = FakeResilientPipeline(self.frames.append, serial_number="SN1", context=self.context,
+                                              retry_delay_s=0.01, max_retry_delay_s=0.04)
+
+    def wait_for(self, condition):
+        deadline = time.perf_counter() + 2
+        while not condition() and time.perf_counter() < deadline:
+            time.sleep(0.005)
+        self.assertTrue(condition())
+
+    def test_start_by_serial_and_restore_after_replug(self):
+        self.pipeline.start()
+        self.pipeline.set_property("EXPOSURE", 100)
+        self.pipeline.set_property("AUTO_EXPOSURE", False)
+        first = self.pipeline.pipeline
+        self.assertIs(first.device, self.device)
+        first.callback("frames-1")
+
+        self.context.callback(FakeDeviceList(self.device), FakeDeviceList())
+        self.assertEqual(self.pipeline.state, DISCONNECTED)
+        self.wait_for(lambda: first.stopped)
+
+        replugged = FakeDevice("SN1")
+        self.context.callback(FakeDeviceList(), FakeDeviceList(FakeDevice("OTHER"), replugged))
+        self.wait_for(lambda: self.pipeline.state == CONNECTED)
+        self.assertEqual(replugged.properties, {"EXPOSURE": 100, "AUTO_EXPOSURE": False})
+        self.pipeline.pipeline.callback("frames-2")
+
+        self.assertEqual(self.frames, ["frames-1", "frames-2"])
+        self.assertEqual(len(self.pipeline.reconnects), 1)
+        record = self.pipeline.reconnects[0]
+        self.assertIn("start_ms", record)
+        self.assertGreaterEqual(record["first_frame_ms"], record["start_ms"] - 1)
+        self.assertGreaterEqual(record["downtime_ms"], record["first_frame_ms"])
+
+    def test_other_devices_are_ignored(self):
+        self.pipeline.start()
+        self.context.callback(FakeDeviceList(FakeDevice("SN0")), FakeDeviceList(FakeDevice("SN0")))
+        self.assertEqual(self.pipeline.state, CONNECTED)
+        self.assertEqual(self.pipeline.builds, 1)
+
+    def test_filters_run_before_callback(self):
+        self.pipeline.filters.append(FakeAlignFilter())
+        self.pipeline.depth_filters.append(FakeDepthFilter())
+        self.pipeline.start()
+        self.pipeline.pipeline.callback(FakeFrameSet(FakeFrame("COLOR", "c"), FakeFrame("DEPTH", "d")))
+        self.assertEqual(len(self.frames), 1)
+        self.assertIsInstance(self.frames[0], FakeFrameSet)
+        self.assertEqual(self.frames[0].values(), {"COLOR": "aligned-c", "DEPTH": "smoothed-aligned-d"})
+
+    def test_filter_dropping_frames(self):
+        self.pipeline.filters.append(type("Drop", (), {"process": staticmethod(lambda frames: None)})())
+        self.pipeline.start()
+        self.pipeline.pipeline.callback(FakeFrameSet(FakeFrame("COLOR", "c")))
+        self.assertEqual(self.frames, [])
+
+    def test_depth_filters_skip_sets_without_depth(self):
+        self.pipeline.depth_filters.append(FakeDepthFilter())
+        self.pipeline.start()
+        frames = FakeFrameSet(FakeFrame("COLOR", "c"))
+        self.pipeline.pipeline.callback(frames)
+        self.assertEqual(self.frames, [frames])
+
+    def test_stop_prevents_reconnect(self):
+        self.pipeline.start()
+        self.pipeline.stop()
+        self.context.callback(FakeDeviceList(), FakeDeviceList(FakeDevice("SN1")))
+        time.sleep(0.05)
+        self.assertEqual(self.pipeline.reconnects, [])
+
+    def unplug(self):
+        self.context.devices = FakeDeviceList(FakeDevice("SN0"))
+        self.context.callback(FakeDeviceList(self.device), FakeDeviceList())
+
+    def test_failed_reconnect_retries_until_open(self):
+        self.pipeline.start()
+        self.unplug()
+        self.pipeline.failing_opens = 2
+        replugged = FakeDevice("SN1")
+        self.context.devices = FakeDeviceList(FakeDevice("SN0"), replugged)
+        self.context.callback(FakeDeviceList(), FakeDeviceList(replugged))
+        self.wait_for(lambda: self.pipeline.state == CONNECTED)
+        self.assertIs(self.pipeline.device, replugged)
+        self.assertEqual(["error" in record for record in self.pipeline.reconnects], [True, True, False])
+
+    def test_stop_ends_retries(self):
+        self.pipeline.start()
+        self.unplug()
+        # the first open fails and the device is gone again when the retries query it
+        self.pipeline.failing_opens = 1
+        self.context.callback(FakeDeviceList(), FakeDeviceList(FakeDevice("SN1")))
+        self.wait_for(lambda: len(self.pipeline.reconnects) >= 2)
+        self.pipeline.stop()
+        time.sleep(0.1)
+        attempts = len(self.pipeline.reconnects)
+        time.sleep(0.1)
+        self.assertEqual(len(self.pipeline.reconnects), attempts)
+        self.assertEqual(self.pipeline.state, DISCONNECTED)
+
+    def test_start_without_device_opens_first_plugged(self):
+        context = FakeContext()
+        pipeline = FakeResilientPipeline(self.frames.append, context=context, retry_delay_s=0.01)
+        pipeline.start()
+        self.assertEqual(pipeline.state, DISCONNECTED)
+        self.assertIsNone(pipeline.serial_number)
+        device = FakeDevice("SN7")
+        context.devices = FakeDeviceList(device)
+        context.callback(FakeDeviceList(), FakeDeviceList(device))
+        self.wait_for(lambda: pipeline.state == CONNECTED)
+        self.assertEqual(pipeline.serial_number, "SN7")
+        self.assertIs(pipeline.device, device)
+        pipeline.pipeline.callback(FakeFrameSet())
+        self.assertEqual(len(self.frames), 1)
+        self.assertIn("downtime_ms", pipeline.reconnects[0])
+
+    def test_start_waits_for_serial(self):
+        self.context.devices = FakeDeviceList(FakeDevice("SN0"))
+        self.pipeline.start()
+        self.assertEqual(self.pipeline.state, DISCONNECTED)
+        self.context.callback(FakeDeviceList(), FakeDeviceList(FakeDevice("SN0")))
+        time.sleep(0.05)
+        self.assertEqual(self.pipeline.state, DISCONNECTED)
+        self.context.callback(FakeDeviceList(), FakeDeviceList(self.device))
+        self.wait_for(lambda: self.pipeline.state == CONNECTED)
+        self.assertIs(self.pipeline.device, self.device)
+
+
+if __name__ == '__main__':
+    unittest.main()
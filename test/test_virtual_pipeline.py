@@ -0,0 +1,184 @@
+import csv
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples"))
+from virtual_pipeline import (CAMERA_PARAM_FILE, FINISHED, VIRTUAL_SOURCE_ENV, VirtualPipeline, create_pipeline,
+                              scan_source)
+
+
+def write_session(folder, count=3, width=64, height=48):
+    """A session folder laid out like DatasetRecorder writes it"""
+    os.makedirs(os.path.join(folder, "color"))
+    os.makedirs(os.path.join(folder, "depth"))
+    with open(os.path.join(folder, "manifest.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["index", "color_file", "depth_file", "color_timestamp_us", "depth_timestamp_us",
+                         "system_timestamp_us", "depth_scale"])
+        for i in range(count):
+            color = np.full((height, width, 3), (10 * i, 0, 200), dtype=np.uint8)  # BGR
+            depth = np.full((height, width), 1000 + i, dtype=np.uint16)
+            cv2.imwrite(os.path.join(folder, "color", f"{i:06d}.png"), color)
+            cv2.imwrite(os.path.join(folder, "depth", f"{i:06d}.png"), depth)
+            writer.writerow([i, os.path.join("color", f"{i:06d}.png"), os.path.join("depth", f"{i:06d}.png"),
+                             "", "", "", 0.5])
+
+
+class VirtualPipelineTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = self.tmp.name
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_session_frames_as_fast_as_possible(self):
+        write_session(self.folder)
+        pipeline = VirtualPipeline(self.folder, fps=0, loop=False, frames="python")
+        pipeline.start()
+        values = []
+        while True:
+            frames = pipeline.wait_for_frames(100)
+            if frames is None:
+                break
+            color, depth = frames.get_color_frame(), frames.get_depth_frame()
+            rgb = np.frombuffer(color.get_data(), dtype=np.uint8).reshape((color.get_height(), color.get_width(), 3))
+            data = np.frombuffer(depth.get_data(), dtype=np.uint16).reshape((depth.get_height(), depth.get_width()))
+            values.append((tuple(rgb[0, 0]), int(data[0, 0]), depth.get_depth_scale(), color.get_format()))
+        self.assertEqual(values, [((200, 0, 10 * i), 1000 + i, 0.5, "RGB") for i in range(3)])
+        self.assertEqual(pipeline.state, FINISHED)
+        self.assertEqual(pipeline.get_stats()["delivered"], 3)
+
+    def test_save_image_to_disk_layout(self):
+        os.makedirs(os.path.join(self.folder, "color_images"))
+        os.makedirs(os.path.join(self.folder, "depth_images"))
+        for i in range(2):
+            cv2.imwrite(os.path.join(self.folder, "color_images", f"color_32x24_{i}_{100 + i}.png"),
+                        np.zeros((24, 32, 3), dtype=np.uint8))
+            np.full((24, 32), 700 + i, dtype=np.uint16).tofile(
+                os.path.join(self.folder, "depth_images", f"depth_32x24_{i}_{100 + i}.raw"))
+        samples = scan_source(self.folder)
+        self.assertEqual(len(samples), 2)
+        self.assertTrue(samples[1].depth.endswith("depth_32x24_1_101.raw"))
+        pipeline = VirtualPipeline(self.folder, fps=0, frames="python", preload=False)
+        pipeline.start()
+        pipeline.wait_for_frames()
+        depth = pipeline.wait_for_frames().get_depth_frame()
+        self.assertEqual(np.frombuffer(depth.get_data(), dtype=np.uint16)[0], 701)
+        # loop กลับไปเฟรมแรก
+        self.assertEqual(np.frombuffer(pipeline.wait_for_frames().get_depth_frame().get_data(), np.uint16)[0], 700)
+
+    def test_color_folder_with_flat_depth_and_profiles(self):
+        for i in range(2):
+            cv2.imwrite(os.path.join(self.folder, f"{i}.jpg"), np.zeros((48, 64, 3), dtype=np.uint8))
+        with self.assertRaises(ValueError):
+            VirtualPipeline(self.folder, frames="python").get_stream_profile_list("DEPTH_SENSOR")
+        pipeline = VirtualPipeline(self.folder, fps=0, depth_mm=260, frames="python")
+        profile = pipeline.get_stream_profile_list("COLOR_SENSOR").get_video_stream_profile(64, 0, "RGB", 30)
+        self.assertEqual((profile.get_width(), profile.get_height()), (64, 48))
+        with self.assertRaises(ValueError):
+            pipeline.get_stream_profile_list("COLOR_SENSOR").get_video_stream_profile(1280, 0, "RGB", 30)
+        self.assertEqual(pipeline.get_camera_param().rgb_intrinsic.fx, 64.0)
+        pipeline.start()
+        depth = pipeline.wait_for_frames().get_depth_frame()
+        self.assertTrue(np.all(np.frombuffer(depth.get_data(), dtype=np.uint16) == 260))
+
+    def test_camera_param_file(self):
+        write_session(self.folder, count=1)
+        intrinsic = {"fx": 600.0, "fy": 601.0, "cx": 31.5, "cy": 23.5, "width": 64, "height": 48}
+        with open(os.path.join(self.folder, CAMERA_PARAM_FILE), "w") as f:
+            json.dump({"rgb_intrinsic": intrinsic, "depth_intrinsic": intrinsic}, f)
+        param = VirtualPipeline(self.folder, frames="python").get_camera_param()
+        self.assertEqual((param.rgb_intrinsic.fx, param.depth_intrinsic.cy), (600.0, 23.5))
+
+    def test_fixed_rate_drops_frames_nobody_takes(self):
+        write_session(self.folder)
+        pipeline = VirtualPipeline(self.folder, fps=10, frames="python")
+        pipeline.start()
+        self.assertIsNotNone(pipeline.wait_for_frames(100))
+        time.sleep(0.33)
+        frames = pipeline.wait_for_frames(100)
+        self.assertGreaterEqual(pipeline.dropped, 2)
+        self.assertEqual(frames.get_color_frame().get_index(), pipeline.dropped + 1)
+        self.assertIsNone(pipeline.wait_for_frames(0))  # ยังไม่ถึงเวลาเฟรมถัดไป
+
+    def test_paced_wait_does_not_block_stop(self):
+        write_session(self.folder)
+        pipeline = VirtualPipeline(self.folder, fps=1, frames="python")
+        pipeline.start()
+        self.assertIsNotNone(pipeline.wait_for_frames(100))
+        waiter = threading.Thread(target=pipeline.wait_for_frames, args=(1500,))
+        waiter.start()  # รอเฟรมถัดไปเกือบ 1 วินาที
+        time.sleep(0.05)
+        start = time.perf_counter()
+        pipeline.stop()
+        self.assertLess(time.perf_counter() - start, 0.2)
+        waiter.join()
+        self.assertEqual(pipeline.delivered, 1)
+
+    def test_callback_at_rate(self):
+        write_session(self.folder)
+        received = []
+        done = threading.Event()
+
+        def on_frames(frames):
+            received.append(frames.get_color_frame().get_timestamp_us())
+            if len(received) == 10:
+                done.set()
+
+        with VirtualPipeline(self.folder, fps=200, frames="python") as pipeline:
+            start = time.perf_counter()
+            pipeline.start(None, on_frames)
+            self.assertTrue(done.wait(2.0))
+            elapsed = time.perf_counter() - start
+        self.assertGreaterEqual(elapsed, 9 / 200)
+        self.assertEqual(received, sorted(received))
+
+    def test_frame_type_lookup(self):
+        write_session(self.folder, count=1)
+        pipeline = VirtualPipeline(self.folder, fps=0, frames="python")
+        pipeline.start()
+        frames = pipeline.wait_for_frames()
+        self.assertIs(frames.get_frame("DEPTH_FRAME"), frames.get_depth_frame())
+        self.assertEqual(frames.get_color_frame().get_type(), "COLOR_FRAME")
+
+    @unittest.skipIf(importlib.util.find_spec("pyorbbecsdk") is None, "pyorbbecsdk is not built")
+    def test_sdk_frames(self):
+        from pyorbbecsdk import FrameSet, OBFormat, OBFrameType
+
+        write_session(self.folder, count=2)
+        pipeline = VirtualPipeline(self.folder, fps=0, frames="sdk")
+        pipeline.start()
+        frames = pipeline.wait_for_frames()
+        self.assertIsInstance(frames, FrameSet)
+        color, depth = frames.get_color_frame(), frames.get_depth_frame()
+        self.assertEqual((color.get_type(), color.get_format()), (OBFrameType.COLOR_FRAME, OBFormat.RGB))
+        self.assertEqual((depth.get_type(), depth.get_format()), (OBFrameType.DEPTH_FRAME, OBFormat.Y16))
+        self.assertEqual(depth.get_depth_scale(), 0.5)
+        data = np.frombuffer(depth.get_data(), dtype=np.uint16)
+        self.assertEqual(int(data[0]), 1000)
+        self.assertEqual(pipeline.get_camera_param().rgb_intrinsic.width, 64)
+
+    def test_create_pipeline_from_environment(self):
+        write_session(self.folder, count=1)
+        os.environ[VIRTUAL_SOURCE_ENV] = self.folder
+        try:
+            pipeline = create_pipeline(frames="python")
+        finally:
+            del os.environ[VIRTUAL_SOURCE_ENV]
+        self.assertIsInstance(pipeline, VirtualPipeline)
+        self.assertEqual(pipeline.fps, 30.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
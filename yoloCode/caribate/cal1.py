@@ -1,28 +1,43 @@
 # ✅ Enhanced: Show saved camera points and compute affine transform after all points saved
 
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 from queue import Queue
 import cv2
 import numpy as np
-from pyorbbecsdk import Config, OBSensorType, OBFormat, Pipeline, FrameSet
+from pyorbbecsdk import AlignFilter, Config, OBSensorType, OBStreamType, OBFormat, FrameSet
 from ultralytics import YOLO
 from PIL import Image, ImageTk
 import json
 import os
-import csv
+import sys
+
+CODEVER2_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "codever2")
+sys.path.append(CODEVER2_DIR)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "examples"))
+from calibration import (CALIBRATION_FILE, DotAccumulator, deproject, fit_calibration, fit_hand_eye,
+                         sample_depths, unflip)
+from virtual_pipeline import VirtualPipeline, create_pipeline
 
 # --------------------- FIXED SETTINGS ---------------------
 model_path = "yoloCode/mark.pt"
 FLIP_IMAGE = True
 MAIN_LABEL = "dot"
+NUM_POINTS = 5          # จำนวนจุดที่ต้องบันทึกก่อนกรอกพิกัดหุ่น (อย่างน้อย 3, 4+ ถึงจะลอง homography)
+MIN_FRAMES = 10         # จุดต้องถูกเห็นอย่างน้อยกี่เฟรมจึงบันทึกได้
+RANSAC_THRESHOLD = 3.0  # ระยะ (หน่วยพิกัดหุ่น) ที่ยังถือว่าเป็น inlier
+CALIBRATION_3D = True   # ใช้ depth: pixel + depth -> XYZ กล้อง -> XYZ หุ่น (False = affine 2D แบบเดิม)
+WITH_SCALE = False      # 3D: True = similarity (ยอมให้สเกลต่าง เช่น depth scale คลาด), False = rigid
 model = YOLO(model_path)
 
 # --------------------- CAMERA INIT ---------------------
 queue = Queue()
 MAX_QUEUE_SIZE = 5
 
-frame_buffer = []
+# ตำแหน่ง dot ทุกจุดของ 30 เฟรมล่าสุด จับคู่จุดข้ามเฟรมด้วย nearest neighbour
+# โหมด 3D เก็บ depth (mm) ของแต่ละจุดเป็นค่าที่ 3 ด้วย
+accumulator = DotAccumulator(capacity=30, dims=3 if CALIBRATION_3D else 2)
+image_size = None
 camera_points = []
 robot_points = []
 current_index = 0
@@ -36,11 +51,17 @@ def on_new_frame_callback(frame: FrameSet):
     queue.put(frame)
 
 config_cam = Config()
-pipeline = Pipeline()
+pipeline = create_pipeline()  # ORBBEC_VIRTUAL_SOURCE=<session> เล่นภาพที่บันทึกไว้แทนกล้อง
 
 color_profiles = pipeline.get_stream_profile_list(OBSensorType.COLOR_SENSOR)
 color_profile = color_profiles.get_video_stream_profile(640, 0, OBFormat.RGB, 30)
 config_cam.enable_stream(color_profile)
+align_filter = None
+if CALIBRATION_3D:
+    depth_profiles = pipeline.get_stream_profile_list(OBSensorType.DEPTH_SENSOR)
+    config_cam.enable_stream(depth_profiles.get_default_video_stream_profile())
+    if not isinstance(pipeline, VirtualPipeline):  # ภาพที่บันทึกไว้ align มาแล้ว
+        align_filter = AlignFilter(align_to_stream=OBStreamType.COLOR_STREAM)
 
 pipeline.start(config_cam, lambda frames: on_new_frame_callback(frames))
 
@@ -50,6 +71,11 @@ def frame_to_bgr_image(color_frame):
     img = img.reshape((color_frame.get_height(), color_frame.get_width(), 3))
     return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
 
+def depth_to_mm(depth_frame):
+    depth = np.frombuffer(depth_frame.get_data(), dtype=np.uint16)
+    depth = depth.reshape((depth_frame.get_height(), depth_frame.get_width()))
+    return depth.astype(np.float32) * depth_frame.get_depth_scale()
+
 def detect_reference_points(img):
     points = []
     results = model(img, verbose=False)
@@ -67,17 +93,31 @@ def detect_reference_points(img):
     points.sort(key=lambda p: p[1])
     return points
 
-def draw_result(img, point):
+def nearest_box(points, dot):
+    """Box of the detection closest to an averaged dot, None if none is within the match radius"""
+    if not points:
+        return None
+    centers = np.asarray(points, dtype=np.float64)[:, :2]
+    distances = np.linalg.norm(centers - np.asarray(dot[:2], dtype=np.float64), axis=1)
+    i = int(np.argmin(distances))
+    if distances[i] > accumulator.match_radius:
+        return None
+    return points[i][2:4], points[i][4:6]
+
+def draw_result(img, point, dots=(), box=None):
     img_height, img_width = img.shape[:2]
     cv2.line(img, (img_width // 2, 0), (img_width // 2, img_height), (255, 255, 255), 1)
     cv2.line(img, (0, img_height // 2), (img_width, img_height // 2), (255, 255, 255), 1)
+    for i, dot in enumerate(dots):  # โหมด 3D มี depth เป็นค่าที่ 3
+        cv2.putText(img, str(i + 1), (int(dot[0]) + 6, int(dot[1]) - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
 
-    if point:
-        cx, cy, x1, y1, x2, y2 = point
-        cv2.rectangle(img, (x1, y1), (x2, y2), (0, 255, 0), 2)
+    if point is not None:
+        cx, cy = int(round(point[0])), int(round(point[1]))
+        if box is not None:
+            cv2.rectangle(img, box[0], box[1], (0, 255, 0), 2)
         cv2.circle(img, (cx, cy), 5, (0, 0, 255), -1)
         cx_centered = cx - img_width // 2
-        cy_centered = cy - img_height // 2  # 🔁 เปลี่ยนเป็นค่าตรงเพื่อให้ตรงกับทิศหุ่น
+        cy_centered = cy - img_height // 2
         coord_label.config(text=f"{current_index+1}. ({cx_centered}, {cy_centered})")
     else:
         coord_label.config(text=f"{current_index+1}. (-, -)")
@@ -88,17 +128,15 @@ def draw_result(img, point):
     video_label.configure(image=imgtk)
 
 def average_current_point():
-    if len(frame_buffer) < 10:
-        status_label.config(text="⏳ Need at least 10 frames")
+    means, jitter, counts = accumulator.dots(min_count=MIN_FRAMES)
+    if current_index >= len(means):
+        status_label.config(text=f"⏳ Need at least {MIN_FRAMES} frames")
         return None
-
-    xs = [frame[current_index][0] for frame in frame_buffer if len(frame) > current_index]
-    ys = [frame[current_index][1] for frame in frame_buffer if len(frame) > current_index]
-    if not xs or not ys:
+    if CALIBRATION_3D and np.isnan(means[current_index][2]):
+        status_label.config(text="⚠️ No depth at this point")
         return None
-    cx_avg = int(np.mean(xs))
-    cy_avg = int(np.mean(ys))
-    return cx_avg, cy_avg
+    return means[current_index], jitter[current_index]
+
 
 # --------------------- SAVE CAMERA ONLY ---------------------
 def save_camera_point():
@@ -106,55 +144,85 @@ def save_camera_point():
     if not result:
         status_label.config(text="⚠️ Unable to average this point")
         return
-    cx, cy = result
-    cx_centered = cx - 640 // 2
-    cy_centered = cy - 480 // 2  # ✅ ปรับให้ตรงกับค่าที่แสดงใน draw_result
+    point, jitter = result
+    cx, cy = point[:2]
+    width, height = image_size
+    cx_centered = cx - width // 2
+    cy_centered = cy - height // 2  # ✅ ปรับให้ตรงกับค่าที่แสดงใน draw_result
+    # เก็บพิกัด pixel จริง (หลัง flip) การสลับแกน/ทิศ affine จะเรียนรู้เอง
+    text = f"Point {current_index+1}: ({cx_centered:.1f}, {cy_centered:.1f}) ±{jitter:.1f}px"
+    if CALIBRATION_3D:
+        text += f" z {point[2]:.1f}mm"
 
     if len(camera_points) > current_index:
-        camera_points[current_index] = [cy_centered, cx_centered]  # 🔁 สลับแกน x,y เพื่อให้ตรงกับพิกัดหุ่น
+        camera_points[current_index] = [float(v) for v in point]
         saved_points_list.delete(current_index)
-        saved_points_list.insert(current_index, f"Point {current_index+1}: ({cx_centered}, {cy_centered})")
+        saved_points_list.insert(current_index, text)
     else:
-        camera_points.append([cy_centered, cx_centered])  # 🔁 สลับแกน x,y เพื่อให้ตรงกับพิกัดหุ่น
-        saved_points_list.insert(tk.END, f"Point {current_index+1}: ({cx_centered}, {cy_centered})")
+        camera_points.append([float(v) for v in point])
+        saved_points_list.insert(tk.END, text)
 
-    status_label.config(text=f"📷 Saved camera point {current_index+1}: ({cx_centered}, {cy_centered})")
+    status_label.config(text=f"📷 Saved camera point {current_index+1}: ({cx_centered:.1f}, {cy_centered:.1f})")
 
-    if len(camera_points) == 5:
+    if len(camera_points) == NUM_POINTS:
         open_robot_input_window()
 
 # --------------------- Confirm Robot Input for All ---------------------
 def open_robot_input_window():
     def on_confirm_all():
         try:
-            for i in range(5):
-                xr = float(robot_entries[i][0].get())
-                yr = float(robot_entries[i][1].get())
+            for i in range(len(camera_points)):
+                robot_point = [float(entry.get()) for entry in robot_entries[i]]
                 if len(robot_points) > i:
-                    robot_points[i] = [xr, yr]
+                    robot_points[i] = robot_point
                 else:
-                    robot_points.append([xr, yr])
-            robot_win.destroy()
-
-            # ✅ Compute affine transform
-            A = np.hstack([np.array(camera_points), np.ones((len(camera_points), 1))])
-            Bx = np.array([p[0] for p in robot_points])
-            By = np.array([p[1] for p in robot_points])
-            params_x, _, _, _ = np.linalg.lstsq(A, Bx, rcond=None)
-            params_y, _, _, _ = np.linalg.lstsq(A, By, rcond=None)
-            result = (
-                f"x_robot = {params_x[0]:.4f} * x + {params_x[1]:.4f} * y + {params_x[2]:.4f}\n"
-                f"y_robot = {params_y[0]:.4f} * x + {params_y[1]:.4f} * y + {params_y[2]:.4f}"
-            )
-            tk.messagebox.showinfo("Affine Transform Result", result)
-        except:
-            tk.messagebox.showerror("Input Error", "Please enter valid numbers.")
+                    robot_points.append(robot_point)
+        except ValueError:
+            messagebox.showerror("Input Error", "Please enter valid numbers.")
+            return
+        robot_win.destroy()
+
+        # ✅ RANSAC จากทุกจุดพร้อมกัน แล้วบันทึกให้ Main.py โหลดตอนเริ่ม
+        points = np.asarray(camera_points)
+        try:
+            if CALIBRATION_3D:
+                # pixel ของภาพที่ flip แล้ว -> pixel จริงของเซนเซอร์ -> XYZ ในพิกัดกล้อง
+                pixels = unflip(points[:, :2], image_size) if FLIP_IMAGE else points[:, :2]
+                intrinsic = pipeline.get_camera_param().rgb_intrinsic
+                camera_xyz = deproject(pixels, points[:, 2], intrinsic)
+                calibration = fit_hand_eye(camera_xyz, robot_points[:len(points)], WITH_SCALE, RANSAC_THRESHOLD,
+                                           intrinsic, image_size, FLIP_IMAGE)
+            else:
+                calibration = fit_calibration(points, robot_points[:len(points)], RANSAC_THRESHOLD,
+                                              image_size=image_size, flip=FLIP_IMAGE)
+        except ValueError as e:
+            messagebox.showerror("Calibration Error", str(e))
+            return
+        path = os.path.join(CODEVER2_DIR, CALIBRATION_FILE)
+        calibration.save(path)
+        m = calibration.matrix
+        lines = [
+            f"{calibration.kind}: inliers {calibration.inliers.sum()}/{len(camera_points)}, "
+            f"RMS {calibration.rms:.3f}, max {calibration.max_error:.3f}",
+        ]
+        if calibration.is_3d:
+            lines += [f"{axis}_robot = {row[0]:.4f} * X + {row[1]:.4f} * Y + {row[2]:.4f} * Z + {row[3]:.2f}"
+                      for axis, row in zip("xyz", m[:3])]
+        else:
+            lines += [
+                f"x_robot = {m[0, 0]:.4f} * x + {m[0, 1]:.4f} * y + {m[0, 2]:.4f}",
+                f"y_robot = {m[1, 0]:.4f} * x + {m[1, 1]:.4f} * y + {m[1, 2]:.4f}",
+            ]
+        lines += [f"Point {i+1}: error {error:.3f}{'' if inlier else ' (outlier)'}"
+                  for i, (error, inlier) in enumerate(zip(calibration.errors, calibration.inliers))]
+        lines.append(f"Saved {os.path.abspath(path)}")
+        messagebox.showinfo("Calibration Result", "\n".join(lines))
 
     robot_win = tk.Toplevel(window)
     robot_win.title("Enter All Robot Coordinates")
     robot_entries.clear()
 
-    for i in range(5):
+    for i in range(len(camera_points)):
         frame = ttk.Frame(robot_win)
         frame.pack(pady=3)
         ttk.Label(frame, text=f"Point {i+1}:").pack(side="left")
@@ -164,14 +232,27 @@ def open_robot_input_window():
         ttk.Label(frame, text="Y:").pack(side="left")
         y_entry = ttk.Entry(frame, width=10)
         y_entry.pack(side="left")
-        robot_entries.append((x_entry, y_entry))
+        entries = [x_entry, y_entry]
+        if CALIBRATION_3D:
+            ttk.Label(frame, text="Z:").pack(side="left")
+            z_entry = ttk.Entry(frame, width=10)
+            z_entry.pack(side="left")
+            entries.append(z_entry)
+        robot_entries.append(entries)
 
     ttk.Button(robot_win, text="Confirm All", command=on_confirm_all).pack(pady=10)
 
 # --------------------- MAIN LOOP ---------------------
 def rendering_loop():
+    global image_size
     if not queue.empty():
         frames = queue.get()
+        if align_filter is not None:
+            frames = align_filter.process(frames)
+            if not frames:
+                window.after(10, rendering_loop)
+                return
+            frames = frames.as_frame_set()
         color_frame = frames.get_color_frame()
         if color_frame is None:
             window.after(10, rendering_loop)
@@ -181,31 +262,31 @@ def rendering_loop():
         if FLIP_IMAGE:
             color_img = cv2.flip(color_img, -1)
 
+        image_size = (color_img.shape[1], color_img.shape[0])
         points = detect_reference_points(color_img)
-        if len(points) > current_index:
-            if len(frame_buffer) >= 10:
-                frame_buffer.pop(0)
-            frame_buffer.append(points)
-            draw_result(color_img, points[current_index])
+        depth_frame = frames.get_depth_frame() if CALIBRATION_3D else None
+        if depth_frame is not None and points:
+            # depth ไม่ได้ flip ตามภาพสี ต้องกลับพิกัดก่อนอ่าน
+            pixels = np.asarray(points, dtype=np.float64)[:, :2]
+            depths = sample_depths(depth_to_mm(depth_frame), unflip(pixels, image_size) if FLIP_IMAGE else pixels)
+            accumulator.add(np.column_stack([pixels, depths]))
+        elif not CALIBRATION_3D:
+            accumulator.add(points)
+        # ไฮไลต์จุดเฉลี่ยลำดับเดียวกับที่ average_current_point จะบันทึก ไม่ใช่ลำดับ detection ดิบ
+        dots = accumulator.dots(min_count=MIN_FRAMES)[0]
+        if len(dots) > current_index:
+            draw_result(color_img, dots[current_index], dots, nearest_box(points, dots[current_index]))
         else:
-            draw_result(color_img, None)
+            draw_result(color_img, None, dots)
 
     window.after(10, rendering_loop)
 
 def next_point():
-    global current_index, frame_buffer
+    global current_index
     current_index += 1
-    frame_buffer.clear()
-    if not queue.empty():
-        frames = queue.queue[-1]
-        color_frame = frames.get_color_frame()
-        if color_frame:
-            color_img = frame_to_bgr_image(color_frame)
-            if FLIP_IMAGE:
-                color_img = cv2.flip(color_img, -1)
-            points = detect_reference_points(color_img)
-            if current_index >= len(points):
-                current_index = 0
+    # จุดทุกจุดสะสมอยู่แล้ว ไม่ต้องเริ่มนับเฟรมใหม่
+    if current_index >= len(accumulator.dots(min_count=MIN_FRAMES)[0]):
+        current_index = 0
     coord_label.config(text=f"{current_index+1}. (-, -)")
     status_label.config(text="➡️ Switched to next point")
 
@@ -224,7 +305,7 @@ save_button = ttk.Button(window, text="💾 Save Camera Point", command=save_cam
 save_button.pack(pady=10)
 
 next_button = ttk.Button(window, text="➡️ Next Point", command=next_point)
-save_button.pack(pady=5)
+next_button.pack(pady=5)
 
 saved_points_list = tk.Listbox(window, height=8, font=("Courier", 10))
 saved_points_list.pack(pady=10, fill=tk.X, padx=20)
@@ -0,0 +1,103 @@
+# --- ตรรกะจัดตำแหน่ง (ตรวจจับวัตถุ, อ่านระยะ depth, เลือกคำสั่ง) แยกจาก Tk เพื่อให้ใช้ซ้ำได้ ---
+import numpy as np
+
+x_rules = [
+    ((-float('inf'), -100), "lright"),  # ซ้ายสุด
+    ((-100, -20), "mright"),
+    ((-20, -1), "right"),
+    ((1, 20), "left"),
+    ((20, 100), "mleft"),
+    ((100, float('inf')), "lleft")     # ขวาสุด
+]
+
+y_rules = [
+    ((-float('inf'), -100), "llow"),    # บนสุด
+    ((-100, -20), "mlow"),
+    ((-20, -1), "low"),
+    ((1, 20), "top"),
+    ((20, 100), "mtop"),
+    ((100, float('inf')), "ltop")       # ล่างสุด
+]
+
+z_rules = [
+    ((300, float('inf')), "ldown"),
+    ((280, 300), "mdown"),
+    ((251, 280), "down"),
+    ((0, 249), "up")]
+
+
+def calculate_distance(x, y):
+    return np.sqrt(x**2 + y**2)
+
+
+def get_direction_command(value, rules): #  เงื่อนไขข้อความx, y, z
+    for (low, high), command in rules:
+        if low <= value < high:
+            return command
+    return None
+
+
+def alignment_command(x, y, z):
+    """Return the next move for the centered offsets x, y and depth z, or "stopz" once aligned"""
+    message = get_direction_command(x, x_rules)
+    if message:
+        return message
+    message = get_direction_command(y, y_rules)
+    if message:
+        return message
+    return get_direction_command(z, z_rules) or "stopz"
+
+
+def move_command(target):
+    """Absolute move to robot coordinates: "move(x,y,z)", or "move(x,y)" for a 2D calibration"""
+    return "move(" + ",".join(f"{float(value):.2f}" for value in target) + ")"
+
+
+def head_alignment_command(main_cy, head_cy): # เงื่อนไขข้อความ หมุน rz
+    """Return "rzP"/"rzM" while the head is off the main object's row, "stopc" once level"""
+    if head_cy < main_cy - 1:
+        return "rzP"
+    if head_cy > main_cy + 1:
+        return "rzM"
+    return "stopc"
+
+
+def closest_boxes(results, names, labels, image_shape):
+    """Pick the box closest to the image center for every label in one pass over the results"""
+    half_w = image_shape[1] // 2
+    half_h = image_shape[0] // 2
+    best = dict.fromkeys(labels)
+    best_distance = dict.fromkeys(labels, float('inf'))
+    for result in results or []:
+        if not result.boxes:
+            continue
+        for box in result.boxes:
+            label = names.get(int(box.cls[0]), None)
+            if label not in best:
+                continue
+            x1, y1, x2, y2 = box.xyxy[0]
+            cx = int((x1 + x2) / 2)
+            cy = int((y1 + y2) / 2)
+            distance = calculate_distance(cx - half_w, cy - half_h)
+            if distance < best_distance[label]:
+                best_distance[label] = distance
+                best[label] = (cx, cy, int(x1), int(y1), int(x2), int(y2))
+    return best
+
+
+def detect_objects(model, img, main_label, head_label):
+    """Run the model once and return the (main, head) objects closest to the image center"""
+    results = model(img, verbose=False)
+    best = closest_boxes(results, model.names, (main_label, head_label), img.shape)
+    return best[main_label], best[head_label]
+
+
+def centered(img_shape, cx, cy):
+    """Pixel position relative to the image center, y pointing up"""
+    return cx - img_shape[1] // 2, -(cy - img_shape[0] // 2)
+
+
+def sample_depth(depth_data, cx, cy):
+    if 0 <= cy < depth_data.shape[0] and 0 <= cx < depth_data.shape[1]:
+        return depth_data[cy, cx]
+    return 0
@@ -0,0 +1,506 @@
+# --- เครื่องยนต์จัดตำแหน่งหุ่น: กล้อง -> YOLO -> depth -> ส่งคำสั่ง ทำงานได้โดยไม่ต้องมี Tk ---
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from queue import Queue, Empty
+
+import cv2
+import numpy as np
+
+import alignment
+from alignment import alignment_command, head_alignment_command, move_command
+from calibration import CALIBRATION_FILE, Calibration
+from latency_tracer import LatencyTracer
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "examples"))
+from profile_cache import ProfileCache, StreamRequest
+from resilient_pipeline import ResilientPipeline
+from virtual_pipeline import VirtualPipeline
+
+logger = logging.getLogger("alignment_engine")
+
+CONFIG_FILE = "config.json"
+default_config = {
+    "IP_ROBOT": "192.168.201.1",
+    "PORT": 6601,
+    "YOLO_MODEL": "Ai_pt_place/grey.pt",
+    "FLIP_IMAGE": True,
+    "SHOW_DEPTH": True,
+    "LATENCY_TRACE": True,
+    "CONTROL_HOST": "127.0.0.1",
+    "CONTROL_PORT": 8765,
+    "PREVIEW_ENABLED": False,
+    "PREVIEW_HOST": "0.0.0.0",
+    "PREVIEW_PORT": 8766,
+    "PREVIEW_WIDTH": 480,
+    "PREVIEW_FPS": 10,
+    "PREVIEW_QUALITY": 70,
+    "PROFILE_CACHE_FILE": "profile_cache.json",
+    "CALIBRATION_FILE": CALIBRATION_FILE,
+    "MOVE_MODE": "iterative",
+    "VERIFY_MOVE": True,
+    "VERIFY_DELAY_S": 1.0,
+    "VIRTUAL_SOURCE": "",
+    "VIRTUAL_FPS": 30
+}
+
+MAX_QUEUE_SIZE = 5
+MODE_RZ = 1        # mode_rz: 1 = จัด rz, 2 = ไม่จัด rz
+MODE_ONE_BY_ONE = 1  # mode_repeat: 1 = ทีละชิ้น, 2 = ทุกชิ้น
+MOVE_ITERATIVE = "iterative"  # move_mode: ส่งคำทิศทางทีละเฟรมจนวัตถุอยู่กลางภาพ
+MOVE_ABSOLUTE = "absolute"    # move_mode: ส่งพิกัดจากการคาลิเบรตครั้งเดียว
+MOVE_MODES = (MOVE_ITERATIVE, MOVE_ABSOLUTE)
+CAMERA_STREAMS = (StreamRequest("COLOR_SENSOR", 640, 0, "RGB", 30), StreamRequest("DEPTH_SENSOR"))
+
+
+def load_config(path=CONFIG_FILE):
+    """Read the config file, fill in missing keys from default_config and write it back"""
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            config = json.load(f)
+    else:
+        config = default_config.copy()
+
+    for key in default_config:
+        if key not in config:
+            config[key] = default_config[key]
+
+    with open(path, "w") as f:
+        json.dump(config, f, indent=4)
+    return config
+
+
+def frame_to_bgr_image(color_frame):
+    img = np.frombuffer(color_frame.get_data(), dtype=np.uint8)
+    img = img.reshape((color_frame.get_height(), color_frame.get_width(), 3))
+    return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+
+
+def extract_images(frames):
+    depth_frame = frames.get_depth_frame()
+    color_frame = frames.get_color_frame()
+    if depth_frame is None or color_frame is None:
+        return None, None
+
+    height = depth_frame.get_height()
+    width = depth_frame.get_width()
+    depth_data = np.frombuffer(depth_frame.get_data(), dtype=np.uint16).reshape((height, width))
+    depth_data = depth_data.astype(np.float32) * depth_frame.get_depth_scale()
+    color_img = frame_to_bgr_image(color_frame)
+    return color_img, depth_data
+
+
+class FrameResult:
+    """What the engine saw and decided for one frame, for viewers and the status endpoint"""
+    __slots__ = ("index", "color", "depth", "main_obj", "head_obj", "x", "y", "z", "rx", "ry", "target")
+
+    def __init__(self, index, color, depth, main_obj, head_obj):
+        self.index = index
+        self.color = color
+        self.depth = depth
+        self.main_obj = main_obj
+        self.head_obj = head_obj
+        self.x = self.y = self.z = self.rx = self.ry = None
+        self.target = None  # พิกัดหุ่น XYZ ของ main_obj จากการคาลิเบรต 3D
+
+    def coordinates_text(self, mode_rz):
+        if self.main_obj is None:
+            return "X: -   Y: -   Z: -   rx: -   ry: -"
+        rx = self.rx if mode_rz == MODE_RZ else '-'
+        ry = self.ry if mode_rz == MODE_RZ else '-'
+        return f"X: {self.x}   Y: {self.y}   Z: {self.z}   rx: {rx}   ry: {ry}"
+
+
+class AlignmentEngine:
+    """Camera, detection and robot commands without any GUI.
+
+    Frames from the SDK callback go through a small drop-oldest queue to a
+    processing thread; the newest ``FrameResult`` is kept for whoever wants to
+    show it (Tk viewer, preview server). All state that used to live in Tk
+    variables (operation modes, alignment flags) is plain attributes here.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.ip_robot = config["IP_ROBOT"]
+        self.port = config["PORT"]
+        self.flip_image = config.get("FLIP_IMAGE", True)
+        self.main_label = config.get("MAIN_LABEL", "grey")
+        self.head_label = config.get("HEAD_LABEL", "head")
+        self.tracer = LatencyTracer(enabled=config.get("LATENCY_TRACE", True))
+        self.model = None
+        self.calibration = self.load_calibration()
+        self.align_filter = None
+
+        self.mode_rz = MODE_RZ
+        self.mode_z = 1
+        self.mode_repeat = MODE_ONE_BY_ONE
+        self.is_adjusting_ry = False
+        self.adjust_position = True
+        self.has_aligned_once = False
+        self.move_mode = MOVE_ITERATIVE
+        self.verify_move = bool(config.get("VERIFY_MOVE", True))
+        self.verify_delay = float(config.get("VERIFY_DELAY_S", 1.0))
+        self.move_sent_at = None  # เวลาที่ส่ง move รอตรวจซ้ำหนึ่งครั้ง
+        self.clock = time.perf_counter
+        self.set_modes(move_mode=config.get("MOVE_MODE", MOVE_ITERATIVE))
+
+        self.sock = None
+        self.is_connected = False
+        self.commands_sent = 0
+        self.send_lock = threading.Lock()
+
+        self.pipeline = None
+        self.queue = Queue()
+        self.active_trace = None
+        self.frame_count = 0
+        self._latest = None
+        self._latest_lock = threading.Lock()
+        self._latest_event = threading.Event()
+        self.listeners = []  # เรียกทุกเฟรมจาก thread ประมวลผล ต้องทำงานเร็ว
+        self._running = False
+        self._thread = None
+
+    def load_calibration(self, path=None):
+        """Read the pixel -> robot calibration saved by cal1.py, None if there is none"""
+        path = path or self.config.get("CALIBRATION_FILE", CALIBRATION_FILE)
+        try:
+            calibration = Calibration.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("⚠️ Cannot read calibration %s: %s", path, e)
+            return None
+        if calibration is None:
+            logger.info("No calibration file %s", path)
+        else:
+            if calibration.flip != self.flip_image:
+                logger.warning("⚠️ Calibration was made with FLIP_IMAGE=%s", calibration.flip)
+            logger.info("Calibration loaded: %s", calibration.summary())
+        return calibration
+
+    # --------------------- camera / loop ---------------------
+    def load_model(self, model_path=None):
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path or self.config["YOLO_MODEL"])
+
+    def start_camera(self):
+        source = self.config.get("VIRTUAL_SOURCE")
+        if source:
+            # เล่นภาพที่บันทึกไว้แทนกล้อง (ภาพจาก capture.py align แล้ว ไม่ต้องใช้ align_filter)
+            self.pipeline = VirtualPipeline(source, fps=float(self.config.get("VIRTUAL_FPS", 30)))
+            self.pipeline.start(None, self.on_new_frame_callback)
+            logger.info("Playing %d recorded frames from %s", len(self.pipeline.samples), source)
+            return
+        # สาย USB หลุดแล้วเสียบกลับ กล้องจะเปิดใหม่เองจากโปรไฟล์ที่แคชไว้ ไม่ต้องปิดโปรแกรม
+        if self.calibration is not None and self.calibration.is_3d:
+            from pyorbbecsdk import AlignFilter, OBStreamType
+
+            # คาลิเบรต 3D อ่าน depth ที่พิกัด pixel ของภาพสี ต้อง align depth เข้ากับภาพสีก่อน
+            self.align_filter = AlignFilter(align_to_stream=OBStreamType.COLOR_STREAM)
+        cache = ProfileCache(self.config.get("PROFILE_CACHE_FILE", default_config["PROFILE_CACHE_FILE"]))
+        self.pipeline = ResilientPipeline(self.on_new_frame_callback, streams=CAMERA_STREAMS, profile_cache=cache)
+        self.pipeline.start()
+
+    def on_new_frame_callback(self, frames):
+        if frames is None:
+            return
+        trace = self.tracer.begin(frames)
+        if self.queue.qsize() >= MAX_QUEUE_SIZE:
+            try:
+                self.queue.get_nowait()
+            except Empty:
+                pass
+        self.queue.put((frames, trace))
+
+    def start(self):
+        """Load the model, open the camera and start the processing thread"""
+        if self.model is None:
+            self.load_model()
+        self.start_camera()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="AlignmentEngine", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            try:
+                frames, trace = self.queue.get(timeout=0.1)
+            except Empty:
+                continue
+            self.process(frames, trace)
+
+    def process(self, frames, trace=None):
+        """Run one frameset through detection and alignment, return its FrameResult or None"""
+        self.active_trace = trace
+        self.tracer.mark(trace, "dequeue")
+        if self.align_filter is not None:
+            frames = self.align_filter.process(frames)
+            frames = frames.as_frame_set() if frames else None
+            if frames is None:
+                self.active_trace = None
+                return None
+        color_img, depth_data = extract_images(frames)
+        if color_img is None or depth_data is None:
+            self.active_trace = None
+            return None
+        if self.flip_image:
+            color_img = cv2.flip(color_img, -1)
+        self.tracer.mark(trace, "decode")
+        result = self.process_images(color_img, depth_data)
+        self.tracer.finish(trace)
+        self.active_trace = None
+        return result
+
+    def process_images(self, color_img, depth_data):
+        main_obj, head_obj = alignment.detect_objects(self.model, color_img, self.main_label, self.head_label)
+        self.tracer.mark(self.active_trace, "inference")
+        self.frame_count += 1
+        result = FrameResult(self.frame_count, color_img, depth_data, main_obj, head_obj)
+        if main_obj:
+            self._align(result)
+        with self._latest_lock:
+            self._latest = result
+        self._latest_event.set()
+        for listener in self.listeners:
+            listener(result)
+        return result
+
+    def latest(self):
+        with self._latest_lock:
+            return self._latest
+
+    def wait_latest(self, timeout=None):
+        """Block until a frame newer than the last call is processed, return it or None"""
+        if not self._latest_event.wait(timeout):
+            return None
+        self._latest_event.clear()
+        return self.latest()
+
+    # --------------------- FUNCTIONคำนวณ  ตำแหน่ง ------------------------------
+    def _align(self, result):
+        cx, cy, *_ = result.main_obj
+        shape = result.color.shape
+        centered_cx, centered_cy = alignment.centered(shape, cx, cy)
+        center_distance = alignment.sample_depth(result.depth, cx, cy)
+        self.tracer.mark(self.active_trace, "depth")
+
+        centered_hcx = 0
+        centered_hcy = 0
+        if self.is_adjusting_ry and self.mode_rz == MODE_RZ and result.head_obj:
+            hcx, hcy, *_ = result.head_obj
+            centered_hcx, centered_hcy = alignment.centered(shape, hcx, hcy)
+            self.handle_head_alignment(centered_cy, centered_hcy)
+
+        result.x, result.y, result.z = centered_cx, centered_cy, int(center_distance)
+        result.rx, result.ry = centered_hcx, centered_hcy
+        if self.calibration is not None and self.calibration.is_3d:
+            result.target = self.calibration.target([(cx, cy)], result.depth)[0]
+
+        if self.is_adjusting_ry and self.mode_rz != MODE_RZ:
+            self.is_adjusting_ry = False
+            self.adjust_position = False
+
+        if not self.adjust_position and not self.has_aligned_once and self.sock:
+            if self.move_mode == MOVE_ABSOLUTE and self.calibration is not None:
+                self.send_absolute_move(result)
+            else:
+                self.send_alignment_commands(centered_cx, centered_cy, int(center_distance))
+
+    def robot_target(self, result):
+        """Robot coordinates of the main object from the calibration, None without a valid depth"""
+        if self.calibration.is_3d:
+            target = result.target
+        else:
+            cx, cy, *_ = result.main_obj
+            target = self.calibration.to_robot([(cx, cy)])[0]  # XY อย่างเดียว หุ่นคง Z เดิม
+        if target is None or not np.all(np.isfinite(target)):
+            return None
+        return target
+
+    def send_absolute_move(self, result):
+        """One move to the calibrated target, then at most one direction word after VERIFY_DELAY_S"""
+        if self.move_sent_at is None:
+            target = self.robot_target(result)
+            if target is None:
+                return  # ไม่มี depth ตรงจุดนี้ รอเฟรมถัดไป
+            self.send_command(move_command(target))
+            if self.verify_move:
+                self.move_sent_at = self.clock()
+            else:
+                self.command_repeat()
+        elif self.clock() - self.move_sent_at >= self.verify_delay:
+            # ตรวจซ้ำครั้งเดียวจากเฟรมหลังหุ่นหยุด ถ้ายังไม่ตรงกลางก็ขยับอีกหนึ่งคำ
+            self.move_sent_at = None
+            message = alignment_command(result.x, result.y, result.z)
+            if message != "stopz":
+                self.send_command(message)
+            self.command_repeat()
+
+    def send_alignment_commands(self, x, y, z): #  ลำดับการส่ง x, y, z
+        message = alignment_command(x, y, z)
+        if message != "stopz":
+            self.send_command(message)
+        else:
+            self.command_repeat()
+
+    def handle_head_alignment(self, main_cy, head_cy): # เงื่อนไขข้อความ หมุน rz
+        if self.sock:
+            message = head_alignment_command(main_cy, head_cy)
+            self.send_command(message)
+            if message == "stopc":
+                self.is_adjusting_ry = False
+                self.adjust_position = False
+
+    def command_repeat(self):
+        if self.mode_repeat == MODE_ONE_BY_ONE:
+            logger.info("wait")
+            self.is_adjusting_ry = False
+            self.adjust_position = True
+            self.send_command("stopz")
+        else:
+            self.is_adjusting_ry = True
+            self.adjust_position = True
+            time.sleep(1)
+            self.send_command("stopz")
+            time.sleep(3)
+
+    # --------------------- การเชื่อมต่อหุ่น ------------------------------
+    def connect(self):
+        if self.sock:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+        try:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.connect((self.ip_robot, self.port))
+            self.is_connected = True
+            logger.info("✅ Reconnected to robot.")
+            return True
+        except socket.error as e:
+            self.is_connected = False
+            logger.error("❌ Reconnection failed: %s", e)
+            return False
+
+    def send_command(self, message):
+        with self.send_lock:
+            if not self.is_connected:
+                logger.warning("❌ Not connected. Skipping command.")
+                return
+            try:
+                self.sock.sendall(message.encode())
+                self.commands_sent += 1
+                self.tracer.mark(self.active_trace, "send")
+                logger.info("✅ Sent: %s", message)
+            except socket.error as e:
+                logger.warning("⚠️ Socket error: %s. Attempting to reconnect...", e)
+                if self.connect():
+                    try:
+                        self.sock.sendall(message.encode())
+                        self.commands_sent += 1
+                        logger.info("✅ Resent after reconnect: %s", message)
+                    except socket.error as e2:
+                        logger.error("❌ Failed to resend after reconnect: %s", e2)
+                        self.sock = None
+                        self.is_connected = False
+                else:
+                    logger.error("❌ Reconnection failed.")
+                    self.sock = None
+                    self.is_connected = False
+
+    def disconnect(self):
+        """Tell the robot we are leaving and close the socket, return False if not connected"""
+        if not self.sock:
+            return False
+        self.send_command("disconnected")
+        self.is_connected = False
+        self.adjust_position = False
+        self.is_adjusting_ry = False
+        self.has_aligned_once = False
+        self.move_sent_at = None
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        self.sock = None
+        return True
+
+    def again(self):
+        """Start aligning the next object, return False if the robot is not connected"""
+        if not self.is_connected:
+            return False
+        self.adjust_position = True
+        self.is_adjusting_ry = True
+        self.has_aligned_once = False
+        self.move_sent_at = None
+        logger.info("Starting over from centered_cx...")
+        return True
+
+    def set_modes(self, mode_rz=None, mode_z=None, mode_repeat=None, move_mode=None, verify_move=None):
+        if mode_rz is not None:
+            self.mode_rz = int(mode_rz)
+        if mode_z is not None:
+            self.mode_z = int(mode_z)
+        if mode_repeat is not None:
+            self.mode_repeat = int(mode_repeat)
+        if move_mode is not None:
+            if move_mode not in MOVE_MODES:
+                raise ValueError(f"move_mode must be one of {', '.join(MOVE_MODES)}")
+            if move_mode == MOVE_ABSOLUTE and self.calibration is None:
+                logger.warning("⚠️ No calibration, absolute moves fall back to direction words")
+            self.move_mode = move_mode
+            self.move_sent_at = None
+        if verify_move is not None:
+            self.verify_move = str(verify_move).lower() in ("1", "true", "yes", "on")
+
+    def status(self):
+        result = self.latest()
+        return {
+            "connected": self.is_connected,
+            "robot": f"{self.ip_robot}:{self.port}",
+            "frames": self.frame_count,
+            "queue_depth": self.queue.qsize(),
+            "mode_rz": self.mode_rz,
+            "mode_z": self.mode_z,
+            "mode_repeat": self.mode_repeat,
+            "move_mode": self.move_mode,
+            "verify_move": self.verify_move,
+            "commands_sent": self.commands_sent,
+            "adjust_position": self.adjust_position,
+            "is_adjusting_ry": self.is_adjusting_ry,
+            "detected": bool(result and result.main_obj),
+            "coordinates": result.coordinates_text(self.mode_rz) if result else None,
+            "camera": self.pipeline.state if self.pipeline else None,
+            "camera_reconnects": list(getattr(self.pipeline, "reconnects", [])),
+            "calibration": self.calibration.summary() if self.calibration else None,
+        }
+
+    def export_latency(self):
+        """Write the latency summary and Chrome trace to the working folder, return both paths"""
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        summary_path = f"latency_{stamp}.json"
+        trace_path = f"latency_trace_{stamp}.json"
+        self.tracer.export_json(summary_path)
+        self.tracer.export_chrome_trace(trace_path)
+        return summary_path, trace_path
+
+    def close(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        try:
+            self.send_command("disconnected")  # แจ้ง DoBot ว่าจะปิดโปรแกรม
+            time.sleep(3)                     # รอให้ DoBot ดำเนินการปิด socket
+        except Exception as e:
+            logger.warning("⚠️ Failed to notify robot: %s", e)
+        try:
+            if self.pipeline is not None:
+                self.pipeline.stop()          # หยุดกล้อง Orbbec
+        except Exception:
+            pass
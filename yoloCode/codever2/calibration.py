@@ -0,0 +1,391 @@
+# --- คาลิเบรตพิกัดกล้อง -> หุ่น: สะสมจุดหลายเฟรม, จับคู่จุดข้ามเฟรม, fit affine/homography แบบ RANSAC
+#     หรือแบบ 3 มิติจาก depth (rigid/similarity ด้วย Umeyama) ---
+import json
+import os
+import warnings
+
+import cv2
+import numpy as np
+
+CALIBRATION_FILE = "calibration.json"
+AFFINE = "affine"
+HOMOGRAPHY = "homography"
+RIGID = "rigid"            # 3D: หมุน + เลื่อน
+SIMILARITY = "similarity"  # 3D: หมุน + เลื่อน + สเกล
+KINDS_3D = (RIGID, SIMILARITY)
+# homography มีตัวแปรมากกว่า จะ fit ได้ดีกว่าเสมอ ใช้เมื่อ error ลดลงชัดเจนเท่านั้น
+HOMOGRAPHY_GAIN = 0.8
+
+
+def _as_points(points, dims=2):
+    points = np.asarray(points, dtype=np.float32)
+    if points.size == 0:
+        return np.empty((0, dims), dtype=np.float32)
+    return points.reshape(len(points), -1)[:, :dims]
+
+
+class DotAccumulator:
+    """Average the image positions of calibration dots over the last ``capacity`` frames.
+
+    Every frame's detections are matched to the dots seen so far by mutual
+    nearest neighbour within ``match_radius`` pixels; detections farther than
+    that from every known dot become new dots while there is room. Positions
+    are kept in a (capacity, max_dots, 2) ring buffer with NaN where a dot was
+    not detected, so the mean and jitter of all dots is one reduction. With
+    ``dims=3`` every point carries its depth as a third value (NaN if the
+    depth was invalid); matching only uses x and y.
+    """
+
+    def __init__(self, capacity=30, max_dots=32, match_radius=10.0, dims=2):
+        self.capacity = capacity
+        self.max_dots = max_dots
+        self.match_radius = match_radius
+        self.dims = dims
+        self.frames = 0
+        self._buffer = np.full((capacity, max_dots, dims), np.nan, dtype=np.float32)
+        self._reference = np.empty((0, 2), dtype=np.float32)
+
+    def __len__(self):
+        return len(self._reference)
+
+    def reset(self):
+        self.frames = 0
+        self._buffer.fill(np.nan)
+        self._reference = np.empty((0, 2), dtype=np.float32)
+
+    def _match(self, points):
+        labels = np.full(len(points), -1, dtype=np.intp)
+        nearest = np.full(len(points), np.inf, dtype=np.float32)
+        if not len(points) or not len(self._reference):
+            return labels, nearest
+        dist = np.linalg.norm(points[:, None, :2] - self._reference[None, :, :], axis=2)
+        nearest_dot = dist.argmin(axis=1)
+        nearest_point = dist.argmin(axis=0)
+        rows = np.arange(len(points))
+        nearest = dist[rows, nearest_dot]
+        mutual = (nearest_point[nearest_dot] == rows) & (nearest <= self.match_radius)
+        labels[mutual] = nearest_dot[mutual]
+        return labels, nearest
+
+    def match(self, points):
+        """Index of the known dot every point belongs to, -1 for points that match none"""
+        return self._match(_as_points(points))[0]
+
+    def add(self, points):
+        """Add one frame of detections, (N, dims) or wider with x, y (and depth) first"""
+        points = _as_points(points, self.dims)
+        labels, nearest = self._match(points)
+        far = (labels < 0) & (nearest > self.match_radius)
+        room = self.max_dots - len(self._reference)
+        new = np.flatnonzero(far)[:room]
+        if len(new):
+            labels[new] = np.arange(len(self._reference), len(self._reference) + len(new))
+            self._reference = np.vstack([self._reference, points[new, :2]])
+
+        row = self._buffer[self.frames % self.capacity]
+        row.fill(np.nan)
+        keep = labels >= 0
+        row[labels[keep]] = points[keep]
+        self.frames += 1
+
+        means = self._means()
+        seen = ~np.isnan(means[:, 0])
+        self._reference[seen] = means[seen, :2]  # ตามจุดที่ขยับช้าๆ (เช่นกล้องสั่น)
+
+    def _means(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nanmean(self._buffer[:, :len(self._reference)], axis=0)
+
+    def counts(self):
+        """Number of buffered frames every dot was detected in"""
+        return np.count_nonzero(~np.isnan(self._buffer[:, :len(self._reference), 0]), axis=0)
+
+    def dots(self, min_count=1):
+        """(means, jitter, counts) of the dots seen in at least ``min_count`` frames, in reading order"""
+        means = self._means()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            jitter = np.linalg.norm(np.nanstd(self._buffer[:, :len(self._reference), :2], axis=0), axis=1)
+        counts = self.counts()
+        keep = counts >= max(min_count, 1)
+        means, jitter, counts = means[keep], jitter[keep], counts[keep]
+        # เรียงทีละแถวบนลงล่าง ซ้ายไปขวา: ไล่ y จากน้อยไปมาก ขึ้นแถวใหม่เมื่อ y ห่างจากจุดก่อนหน้าเกิน match_radius
+        by_y = np.argsort(means[:, 1], kind="stable")
+        rows = np.empty(len(means), dtype=np.intp)
+        rows[by_y] = np.cumsum(np.diff(means[by_y, 1], prepend=means[by_y[:1], 1]) > self.match_radius)
+        order = np.lexsort((means[:, 0], rows))
+        return means[order], jitter[order], counts[order]
+
+
+def apply_transform(matrix, points):
+    """Map (N, 2) points with a 3x3 affine or homography matrix"""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    mapped = points @ matrix[:, :2].T + matrix[:, 2]
+    return mapped[:, :2] / mapped[:, 2:3]
+
+
+def reprojection_errors(matrix, src, dst):
+    """Distance between the mapped ``src`` points and ``dst``, in the units of ``dst``"""
+    return np.linalg.norm(apply_transform(matrix, src) - np.asarray(dst, dtype=np.float64), axis=1)
+
+
+def fit_affine(src, dst, threshold=3.0):
+    """RANSAC affine fit of (N >= 3) point pairs, return (3x3 matrix, inlier mask)"""
+    src = np.asarray(src, dtype=np.float64).reshape(-1, 2)
+    dst = np.asarray(dst, dtype=np.float64).reshape(-1, 2)
+    if len(src) < 3:
+        raise ValueError("An affine fit needs at least 3 points")
+    matrix, inliers = cv2.estimateAffine2D(src, dst, method=cv2.RANSAC, ransacReprojThreshold=threshold,
+                                           maxIters=2000, confidence=0.999)
+    if matrix is None:
+        raise ValueError("Affine fit failed, are the points collinear?")
+    return np.vstack([matrix, [0.0, 0.0, 1.0]]), inliers.ravel().astype(bool)
+
+
+def fit_homography(src, dst, threshold=3.0):
+    """RANSAC homography fit of (N >= 4) point pairs, return (3x3 matrix, inlier mask)"""
+    src = np.asarray(src, dtype=np.float64).reshape(-1, 2)
+    dst = np.asarray(dst, dtype=np.float64).reshape(-1, 2)
+    if len(src) < 4:
+        raise ValueError("A homography fit needs at least 4 points")
+    matrix, inliers = cv2.findHomography(src, dst, cv2.RANSAC, threshold, maxIters=2000, confidence=0.999)
+    if matrix is None:
+        raise ValueError("Homography fit failed, are the points collinear?")
+    return matrix / matrix[2, 2], inliers.ravel().astype(bool)
+
+
+def unflip(pixels, image_size):
+    """Pixels of an image flipped by cv2.flip(img, -1) back to sensor pixels"""
+    pixels = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
+    return np.asarray(image_size, dtype=np.float64) - 1.0 - pixels
+
+
+def sample_depths(depth, pixels, radius=2):
+    """Median of the valid (> 0) depth in a (2r+1)^2 window around every pixel, NaN where none"""
+    pixels = np.rint(np.asarray(pixels, dtype=np.float64).reshape(-1, 2)).astype(np.intp)
+    offsets = np.arange(-radius, radius + 1)
+    xs = np.clip(pixels[:, 0, None, None] + offsets[None, None, :], 0, depth.shape[1] - 1)
+    ys = np.clip(pixels[:, 1, None, None] + offsets[None, :, None], 0, depth.shape[0] - 1)
+    windows = depth[ys, xs].reshape(len(pixels), -1).astype(np.float64)
+    windows[windows <= 0] = np.nan
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(windows, axis=1)
+
+
+def intrinsic_tuple(intrinsic):
+    """(fx, fy, cx, cy) of an OBCameraIntrinsic or a 4-sequence"""
+    if hasattr(intrinsic, "fx"):
+        return intrinsic.fx, intrinsic.fy, intrinsic.cx, intrinsic.cy
+    fx, fy, cx, cy = intrinsic[:4]
+    return fx, fy, cx, cy
+
+
+def deproject(pixels, depths, intrinsic):
+    """Camera-frame XYZ (units of ``depths``) of (N, 2) sensor pixels with pinhole intrinsics"""
+    fx, fy, cx, cy = intrinsic_tuple(intrinsic)
+    pixels = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
+    z = np.asarray(depths, dtype=np.float64).reshape(-1)
+    return np.stack([(pixels[:, 0] - cx) * z / fx, (pixels[:, 1] - cy) * z / fy, z], axis=1)
+
+
+def umeyama(src, dst, with_scale=False):
+    """Least-squares R, t, s with dst ~= s * R @ src + t (Umeyama 1991), return a 4x4 matrix"""
+    src = np.asarray(src, dtype=np.float64).reshape(-1, 3)
+    dst = np.asarray(dst, dtype=np.float64).reshape(-1, 3)
+    src_mean = src.mean(axis=0)
+    dst_mean = dst.mean(axis=0)
+    src_c = src - src_mean
+    dst_c = dst - dst_mean
+    u, sigma, vt = np.linalg.svd(dst_c.T @ src_c / len(src))
+    d = np.ones(3)
+    if np.linalg.det(u) * np.linalg.det(vt) < 0:
+        d[2] = -1.0  # ไม่ให้กลายเป็นการสะท้อน
+    rotation = (u * d) @ vt
+    scale = 1.0
+    if with_scale:
+        scale = float((sigma * d).sum() / (src_c ** 2).sum(axis=1).mean())
+    matrix = np.eye(4)
+    matrix[:3, :3] = scale * rotation
+    matrix[:3, 3] = dst_mean - scale * rotation @ src_mean
+    return matrix
+
+
+def apply_transform_3d(matrix, points):
+    """Map (N, 3) points with a 4x4 rigid or similarity matrix"""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def fit_rigid(src, dst, with_scale=False, threshold=5.0, iterations=500, seed=0):
+    """RANSAC over 3-point Umeyama fits of (N >= 3) 3D pairs, return (4x4 matrix, inlier mask).
+
+    Every sample's model is scored on all points at once; the final matrix is
+    refit on the inliers of the best sample. ``threshold`` is in robot units.
+    """
+    src = np.asarray(src, dtype=np.float64).reshape(-1, 3)
+    dst = np.asarray(dst, dtype=np.float64).reshape(-1, 3)
+    valid = np.isfinite(src).all(axis=1) & np.isfinite(dst).all(axis=1)
+    if valid.sum() < 3:
+        raise ValueError("A 3D fit needs at least 3 points with valid depth")
+    rng = np.random.default_rng(seed)
+    index = np.flatnonzero(valid)
+    best = valid.copy()
+    best_count = 0
+    if threshold and len(index) > 3:
+        for _ in range(iterations):
+            sample = rng.choice(index, 3, replace=False)
+            if np.linalg.matrix_rank(src[sample] - src[sample].mean(axis=0), tol=1e-6) < 2:
+                continue
+            matrix = umeyama(src[sample], dst[sample], with_scale)
+            inliers = valid & (np.linalg.norm(apply_transform_3d(matrix, np.nan_to_num(src)) - dst, axis=1)
+                               <= threshold)
+            if inliers.sum() > best_count:
+                best, best_count = inliers, inliers.sum()
+                if best_count == len(index):
+                    break
+        if best_count < 3:
+            best = valid
+    matrix = umeyama(src[best], dst[best], with_scale)
+    return matrix, best
+
+
+class Calibration:
+    """Mapping from what the detector sees to robot coordinates.
+
+    2D kinds (affine, homography) map pixels of the image the detector sees
+    (after FLIP_IMAGE) to robot XY. 3D kinds (rigid, similarity) map
+    camera-frame XYZ to robot XYZ with a 4x4 matrix and keep the color
+    intrinsics so ``target`` can go from pixels and depth to robot XYZ.
+    """
+
+    def __init__(self, kind, matrix, errors, inliers, image_size=None, flip=True, intrinsic=None):
+        self.kind = kind
+        self.matrix = np.asarray(matrix, dtype=np.float64)
+        self.errors = np.asarray([np.nan if e is None else e for e in errors], dtype=np.float64)
+        self.inliers = np.asarray(inliers, dtype=bool)
+        self.image_size = tuple(image_size) if image_size else None
+        self.flip = flip
+        self.intrinsic = tuple(float(v) for v in intrinsic_tuple(intrinsic)) if intrinsic is not None else None
+
+    @property
+    def is_3d(self):
+        return self.kind in KINDS_3D
+
+    @property
+    def rms(self):
+        errors = self.errors[self.inliers]
+        return float(np.sqrt(np.mean(errors ** 2))) if len(errors) else float("nan")
+
+    @property
+    def max_error(self):
+        errors = self.errors[self.inliers]
+        return float(errors.max()) if len(errors) else float("nan")
+
+    def to_robot(self, points):
+        """Robot XY of (N, 2) pixels, or robot XYZ of (N, 3) camera points for 3D kinds"""
+        if self.is_3d:
+            return apply_transform_3d(self.matrix, points)
+        return apply_transform(self.matrix, points)
+
+    def camera_points(self, pixels, depth, radius=2):
+        """Camera-frame XYZ of detector pixels, ``depth`` is a depth image aligned to color or (N,) depths"""
+        pixels = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
+        if self.flip and self.image_size:
+            pixels = unflip(pixels, self.image_size)
+        depth = np.asarray(depth)
+        depths = sample_depths(depth, pixels, radius) if depth.ndim == 2 else depth.reshape(-1)
+        return deproject(pixels, depths, self.intrinsic)
+
+    def target(self, pixels, depth, radius=2):
+        """Robot XYZ of detector pixels in one step (NaN rows where depth is missing), 3D kinds only"""
+        if not self.is_3d:
+            raise ValueError(f"A {self.kind} calibration has no depth, use to_robot")
+        return apply_transform_3d(self.matrix, self.camera_points(pixels, depth, radius))
+
+    def summary(self):
+        return {
+            "kind": self.kind,
+            "points": len(self.errors),
+            "inliers": int(self.inliers.sum()),
+            "rms": round(self.rms, 3),
+            "max_error": round(self.max_error, 3),
+        }
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "matrix": self.matrix.tolist(),
+            "errors": [None if np.isnan(e) else e for e in self.errors.tolist()],
+            "inliers": self.inliers.tolist(),
+            "image_size": list(self.image_size) if self.image_size else None,
+            "flip": self.flip,
+            "intrinsic": list(self.intrinsic) if self.intrinsic else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["kind"], data["matrix"], data.get("errors", []), data.get("inliers", []),
+                   data.get("image_size"), data.get("flip", True), data.get("intrinsic"))
+
+    def save(self, path=CALIBRATION_FILE):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=CALIBRATION_FILE):
+        """Read a saved calibration, None if the file does not exist"""
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+
+def fit_calibration(camera_points, robot_points, threshold=3.0, kind=None, image_size=None, flip=True):
+    """Fit pixel -> robot XY on all point pairs at once and pick the model.
+
+    ``threshold`` is the RANSAC inlier distance in robot units. With ``kind``
+    None an affine fit is used unless a homography (4+ points) lowers the
+    inlier RMS error to HOMOGRAPHY_GAIN of it or less.
+    """
+    camera_points = np.asarray(camera_points, dtype=np.float64).reshape(-1, 2)
+    robot_points = np.asarray(robot_points, dtype=np.float64).reshape(-1, 2)
+    if len(camera_points) != len(robot_points):
+        raise ValueError("camera_points and robot_points must have the same length")
+
+    candidates = []
+    if kind in (None, AFFINE):
+        matrix, inliers = fit_affine(camera_points, robot_points, threshold)
+        candidates.append(Calibration(AFFINE, matrix, reprojection_errors(matrix, camera_points, robot_points),
+                                      inliers, image_size, flip))
+    if kind == HOMOGRAPHY or (kind is None and len(camera_points) >= 4):
+        matrix, inliers = fit_homography(camera_points, robot_points, threshold)
+        candidates.append(Calibration(HOMOGRAPHY, matrix, reprojection_errors(matrix, camera_points, robot_points),
+                                      inliers, image_size, flip))
+    if not candidates:
+        raise ValueError(f"Unknown calibration kind: {kind}")
+    best = candidates[0]
+    if len(candidates) == 2 and candidates[1].rms <= best.rms * HOMOGRAPHY_GAIN:
+        best = candidates[1]
+    return best
+
+
+def fit_hand_eye(camera_xyz, robot_xyz, with_scale=False, threshold=5.0, intrinsic=None, image_size=None,
+                 flip=True):
+    """Fit camera-frame XYZ -> robot XYZ (rigid, or similarity with ``with_scale``) with RANSAC.
+
+    Points without valid depth (NaN) are skipped and reported as outliers.
+    ``intrinsic``, ``image_size`` and ``flip`` are stored so the calibration
+    can turn detector pixels and depth into robot targets.
+    """
+    camera_xyz = np.asarray(camera_xyz, dtype=np.float64).reshape(-1, 3)
+    robot_xyz = np.asarray(robot_xyz, dtype=np.float64).reshape(-1, 3)
+    if len(camera_xyz) != len(robot_xyz):
+        raise ValueError("camera_xyz and robot_xyz must have the same length")
+    matrix, inliers = fit_rigid(camera_xyz, robot_xyz, with_scale, threshold)
+    errors = np.linalg.norm(apply_transform_3d(matrix, camera_xyz) - robot_xyz, axis=1)
+    return Calibration(SIMILARITY if with_scale else RIGID, matrix, errors, inliers, image_size, flip, intrinsic)
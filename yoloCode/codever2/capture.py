@@ -1,11 +1,19 @@
 # --- GUI กล้องเลือก Orbbec หรือ Webcam พร้อม Config บันทึกลง webcam_config.json ---
 import cv2
 import os
+import sys
 import json
+import time
 import numpy as np
 from datetime import datetime
 from tkinter import Tk, Button, Label, Frame, Toplevel, filedialog, IntVar, BooleanVar, StringVar, Radiobutton, Checkbutton, OptionMenu, messagebox
 from PIL import Image, ImageTk
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "examples"))
+from image_writer import ImageWriter
+from dataset_recorder import DatasetRecorder
+from frame_dedup import FrameDeduplicator
+from virtual_pipeline import VirtualPipeline, create_pipeline, save_camera_param
 # เพิ่มตัวแปร global สำหรับแสดง preview และข้อความ overlay
 preview_label = None
 overlay_label = None
@@ -18,7 +26,13 @@ default_config = {
     "WEBCAM_INDEX": 0,
     "RESOLUTION": "640x480",
     "FLIP_IMAGE": "none",
-    "CAMERA_MODE": "webcam"
+    "CAMERA_MODE": "webcam",
+    "JPEG_QUALITY": 95,
+    "WRITER_QUEUE_SIZE": 32,
+    "WRITER_WORKERS": 4,
+    "BURST_COUNT": 30,
+    "BURST_FPS": 10,
+    "DEDUP_THRESHOLD": 0.02
 }
 
 if os.path.exists(CONFIG_FILE):
@@ -33,15 +47,30 @@ resolution = (640, 480)  # ✅ บังคับใช้ตรงนี้
 
 flip_mode = config.get("FLIP_IMAGE", default_config["FLIP_IMAGE"])  # 'none', 'horizontal', 'vertical'
 camera_mode = config.get("CAMERA_MODE", default_config["CAMERA_MODE"])
+jpeg_quality = config.get("JPEG_QUALITY", default_config["JPEG_QUALITY"])
+writer_queue_size = config.get("WRITER_QUEUE_SIZE", default_config["WRITER_QUEUE_SIZE"])
+writer_workers = config.get("WRITER_WORKERS", default_config["WRITER_WORKERS"])
+burst_count = config.get("BURST_COUNT", default_config["BURST_COUNT"])
+burst_fps = config.get("BURST_FPS", default_config["BURST_FPS"])  # <= 0 คือเก็บทุกเฟรม
+dedup_threshold = config.get("DEDUP_THRESHOLD", default_config["DEDUP_THRESHOLD"])  # 0 คือปิดการกรอง
 
 capture_flag = False
 webcam = None
 pipeline = None
 camera_label = None
 root = None
+image_writer = None
+align_filter = None
+
+# ---- BURST / CONTINUOUS DATASET ----
+dataset_recorder = None
+burst_remaining = 0
+continuous_capture = False
+next_burst_time = 0.0
+deduplicator = FrameDeduplicator(threshold=dedup_threshold)
 
 try:
-    from pyorbbecsdk import Config as OBConfig, OBError, OBSensorType, OBFormat, Pipeline, FrameSet
+    from pyorbbecsdk import Config as OBConfig, OBError, OBSensorType, OBFormat, OBStreamType, FrameSet, AlignFilter
     orbbec_available = True
 except ImportError:
     orbbec_available = False
@@ -51,6 +80,77 @@ def capture_image():
     global capture_flag
     capture_flag = True
 
+
+def start_burst():
+    global burst_remaining, next_burst_time
+    ensure_dataset_session()
+    burst_remaining = burst_count
+    next_burst_time = time.perf_counter()
+    show_overlay(f"🎞 Burst {burst_count} frames @ {burst_fps} fps")
+
+
+def toggle_continuous():
+    global continuous_capture, next_burst_time
+    continuous_capture = not continuous_capture
+    if continuous_capture:
+        ensure_dataset_session()
+        next_burst_time = time.perf_counter()
+        continuous_label.config(text="⏺ Recording")
+    else:
+        continuous_label.config(text="")
+        if burst_remaining == 0:
+            finish_dataset_session()
+
+
+def ensure_dataset_session():
+    global dataset_recorder
+    if dataset_recorder is None:
+        dataset_recorder = DatasetRecorder(SAVE_FOLDER, image_writer)
+        deduplicator.reset()
+        if camera_mode == "orbbec" and pipeline:
+            save_camera_param(pipeline.get_camera_param(), dataset_recorder.folder)
+        print(f"📁 Dataset session: {dataset_recorder.folder}")
+
+
+def finish_dataset_session():
+    global dataset_recorder
+    if dataset_recorder is None:
+        return
+    dataset_recorder.close()
+    print(f"✅ Dataset saved: {dataset_recorder.saved} frames, dropped {dataset_recorder.dropped} "
+          f"(+{dataset_recorder.depth_dropped} without depth), "
+          f"keep ratio {deduplicator.keep_ratio:.0%} -> {dataset_recorder.folder}")
+    show_overlay(f"✅ Saved {dataset_recorder.saved} frames")
+    dataset_recorder = None
+
+
+def dataset_frame_due():
+    """True if the session will take the next frame (before the duplicate check)"""
+    if dataset_recorder is None or (burst_remaining == 0 and not continuous_capture):
+        return False
+    return time.perf_counter() >= next_burst_time
+
+
+def record_dataset_frame(frame, depth, color_timestamp_us, depth_timestamp_us, depth_scale):
+    global burst_remaining, next_burst_time
+    if burst_remaining == 0 and not continuous_capture:
+        return
+    now = time.perf_counter()
+    if now < next_burst_time:
+        return
+    if burst_fps > 0:
+        # ถ้าช้ากว่ากำหนดให้เริ่มนับใหม่จากตอนนี้ แทนการเก็บรัวๆ เพื่อไล่ให้ทัน
+        next_burst_time = max(next_burst_time + 1.0 / burst_fps, now)
+    # burst ต้องได้ครบ N เฟรม จึงกรองภาพซ้ำเฉพาะโหมด continuous
+    if burst_remaining == 0 and dedup_threshold > 0 and deduplicator.is_duplicate(frame):
+        return
+    dataset_recorder.add(frame, depth, color_timestamp_us, depth_timestamp_us,
+                         int(time.time() * 1e6), depth_scale)
+    if burst_remaining > 0:
+        burst_remaining -= 1
+        if burst_remaining == 0 and not continuous_capture:
+            finish_dataset_session()
+
 # ---- DISPLAY FRAME ----
 def update_webcam_frame():
     global capture_flag, webcam
@@ -80,6 +180,12 @@ def update_orbbec_frame():
     if frames is None:
         root.after(10, update_orbbec_frame)
         return
+    # align และ copy depth เฉพาะเฟรมที่จะบันทึก ภาพ preview ใช้แค่ภาพสี
+    recording = dataset_frame_due()
+    if recording and align_filter is not None and frames.get_depth_frame() is not None:
+        aligned = align_filter.process(frames)
+        if aligned is not None:
+            frames = aligned.as_frame_set()
     color_frame = frames.get_color_frame()
     if color_frame is None:
         root.after(10, update_orbbec_frame)
@@ -89,9 +195,39 @@ def update_orbbec_frame():
     height = color_frame.get_height()
     frame = np.frombuffer(data, dtype=np.uint8).reshape((height, width, 3))[:, :, ::-1]
     frame = apply_flip(frame)
-    handle_frame_output(frame)
+
+    depth = None
+    depth_timestamp_us = None
+    depth_scale = None
+    depth_frame = frames.get_depth_frame() if recording else None
+    if depth_frame is not None:
+        depth = np.frombuffer(depth_frame.get_data(), dtype=np.uint16).reshape(
+            (depth_frame.get_height(), depth_frame.get_width()))
+        depth = apply_flip(depth)
+        depth_timestamp_us = depth_frame.get_timestamp_us()
+        depth_scale = depth_frame.get_depth_scale()
+    handle_frame_output(frame, depth, color_frame.get_timestamp_us(), depth_timestamp_us, depth_scale)
     root.after(10, update_orbbec_frame)
 
+
+def start_orbbec_pipeline():
+    global pipeline, align_filter
+    config = OBConfig()
+    pipeline = create_pipeline()  # ORBBEC_VIRTUAL_SOURCE=<session> เล่นภาพที่บันทึกไว้แทนกล้อง
+    profile_list = pipeline.get_stream_profile_list(OBSensorType.COLOR_SENSOR)
+    color_profile = profile_list.get_video_stream_profile(640, 0, OBFormat.RGB, 30)
+    config.enable_stream(color_profile)
+    try:
+        depth_profiles = pipeline.get_stream_profile_list(OBSensorType.DEPTH_SENSOR)
+        config.enable_stream(depth_profiles.get_default_video_stream_profile())
+        pipeline.enable_frame_sync()
+    except (OBError, ValueError) as e:
+        print("Depth stream unavailable:", e)
+    # ภาพที่บันทึกไว้ align มาแล้ว
+    align_filter = None if isinstance(pipeline, VirtualPipeline) else AlignFilter(align_to_stream=OBStreamType.COLOR_STREAM)
+    pipeline.start(config)
+    update_orbbec_frame()
+
 def apply_flip(frame):
     if flip_mode == "horizontal":
         return cv2.flip(frame, 1)
@@ -123,16 +259,23 @@ def show_preview(frame):
 
 
 # ---- HANDLE FRAME OUTPUT ----
-def handle_frame_output(frame):
+def handle_frame_output(frame, depth=None, color_timestamp_us=None, depth_timestamp_us=None, depth_scale=None):
     global capture_flag, overlay_timer
-    
+
+    if dataset_recorder is not None:
+        record_dataset_frame(frame, depth, color_timestamp_us, depth_timestamp_us, depth_scale)
+
     if capture_flag:
         capture_flag = False
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         filename = os.path.join(SAVE_FOLDER, f"image_{timestamp}.jpg")
-        cv2.imwrite(filename, frame)
-        print(f"✅ Captured: {filename}")
-        show_overlay("✅ Saved!")
+        # เขียนไฟล์ใน background thread เพื่อไม่ให้ Tk thread ค้าง
+        if image_writer.submit(filename, frame):
+            print(f"✅ Captured: {filename}")
+            show_overlay("✅ Saved!")
+        else:
+            print(f"⚠️ Writer queue full, dropped: {filename}")
+            show_overlay("⚠️ Dropped (disk busy)")
         show_preview(frame)
 
     rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
@@ -161,12 +304,12 @@ def open_config_window():
         flip_mode = flip_var.get()
         camera_mode = "orbbec" if camera_mode_var.get() == 1 else "webcam"
 
-        config = {
+        config.update({
             "SAVE_FOLDER": SAVE_FOLDER,
             "WEBCAM_INDEX": webcam_index,
             "FLIP_IMAGE": flip_mode,
             "CAMERA_MODE": camera_mode
-        }
+        })
         with open(CONFIG_FILE, "w") as f:
             json.dump(config, f, indent=4)
 
@@ -192,13 +335,7 @@ def open_config_window():
 
         if camera_mode == "orbbec" and orbbec_available:
             try:
-                config = OBConfig()
-                pipeline = Pipeline()
-                profile_list = pipeline.get_stream_profile_list(OBSensorType.COLOR_SENSOR)
-                color_profile = profile_list.get_video_stream_profile(640, 0, OBFormat.RGB, 30)
-                config.enable_stream(color_profile)
-                pipeline.start(config)
-                update_orbbec_frame()
+                start_orbbec_pipeline()
             except Exception as e:
                 messagebox.showerror("Orbbec Error", str(e))
 
@@ -283,14 +420,7 @@ def restart_camera():
 
     elif camera_mode == "orbbec" and orbbec_available:
         try:
-            config = OBConfig()
-            pipeline = Pipeline()
-            profile_list = pipeline.get_stream_profile_list(OBSensorType.COLOR_SENSOR)
-            color_profile = profile_list.get_video_stream_profile(640, 0, OBFormat.RGB, 30)
-            config.enable_stream(color_profile)
-            
-            pipeline.start(config)
-            update_orbbec_frame()
+            start_orbbec_pipeline()
         except Exception as e:
             messagebox.showerror("Orbbec Error", str(e))
     else:
@@ -303,7 +433,8 @@ def open_save_folder():
 
 # ---- GUI ----
 def start_main_gui():
-    global root, camera_label, preview_label, overlay_label
+    global root, camera_label, preview_label, overlay_label, image_writer
+    image_writer = ImageWriter(num_workers=writer_workers, max_queue_size=writer_queue_size, jpeg_quality=jpeg_quality)
     root = Tk()
     root.title("Camera Capture GUI")
     root.geometry("1000x800")
@@ -331,11 +462,16 @@ def start_main_gui():
     Button(button_frame, text="🔁 Flip Mode", command=toggle_flip, **btn_style).grid(row=0, column=1, padx=5)
     Button(button_frame, text="⚙️ Config", command=open_config_window, **btn_style).grid(row=0, column=2, padx=5)
     Button(button_frame, text="📁 Open Folder", command=open_save_folder, **btn_style).grid(row=0, column=3, padx=5)
-    global flip_label,folder_path_label
+    global flip_label,folder_path_label,continuous_label
     flip_label = Label(button_frame, text=f"Flip: {flip_mode}", bg="#e6e6e6")
     flip_label.grid(row=1, column=1)
     folder_path_label = Label(button_frame, text=f"📂 {SAVE_FOLDER}", bg="#e6e6e6")
     folder_path_label.grid(row=1, column=3)
+
+    Button(button_frame, text=f"🎞 Burst x{burst_count}", command=start_burst, **btn_style).grid(row=2, column=0, padx=5, pady=(10, 0))
+    Button(button_frame, text="⏺ Continuous", command=toggle_continuous, **btn_style).grid(row=2, column=1, padx=5, pady=(10, 0))
+    continuous_label = Label(button_frame, text="", fg="red", bg="#e6e6e6")
+    continuous_label.grid(row=3, column=1)
     
 
     # ----------- Preview ล่าสุด -----------
@@ -345,6 +481,9 @@ def start_main_gui():
 
     restart_camera()
     root.mainloop()
+    finish_dataset_session()
+    image_writer.close()
+    print("Writer stats:", image_writer.get_stats())
 
 # ---- MAIN ----
 if __name__ == "__main__":
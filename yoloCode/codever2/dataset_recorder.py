@@ -0,0 +1,73 @@
+# --- บันทึก dataset แบบ burst/continuous: ภาพสี + depth 16-bit คู่กัน พร้อม manifest.csv ---
+import csv
+import os
+from datetime import datetime
+
+MANIFEST_FIELDS = [
+    "index", "color_file", "depth_file",
+    "color_timestamp_us", "depth_timestamp_us", "system_timestamp_us", "depth_scale", "depth_dropped",
+]
+
+
+class DatasetRecorder:
+    """Save numbered color/depth pairs through an ImageWriter and log them in manifest.csv.
+
+    Every session gets its own folder ``<root>/session_<time>`` with ``color/`` (JPEG)
+    and ``depth/`` (16-bit PNG, raw sensor units) sub folders. A pair shares the same
+    zero padded index, so file names never collide no matter how fast frames arrive.
+
+    A pair whose color image the writer drops is skipped and counted in ``dropped``.
+    If only the depth image is dropped the color row is kept (its file is already
+    queued), counted in ``depth_dropped`` and marked in the manifest's depth_dropped
+    column.
+    """
+
+    def __init__(self, root_folder, writer, color_ext=".jpg"):
+        self.writer = writer
+        self.color_ext = color_ext
+        session = datetime.now().strftime("session_%Y%m%d_%H%M%S_%f")
+        self.folder = os.path.join(root_folder, session)
+        self.color_folder = os.path.join(self.folder, "color")
+        self.depth_folder = os.path.join(self.folder, "depth")
+        os.makedirs(self.color_folder, exist_ok=True)
+        os.makedirs(self.depth_folder, exist_ok=True)
+        self.next_index = 0
+        self.saved = 0
+        self.dropped = 0
+        self.depth_dropped = 0
+        self._manifest_file = open(os.path.join(self.folder, "manifest.csv"), "w", newline="")
+        self._manifest = csv.writer(self._manifest_file)
+        self._manifest.writerow(MANIFEST_FIELDS)
+
+    def add(self, color_image, depth_raw=None, color_timestamp_us=None, depth_timestamp_us=None,
+            system_timestamp_us=None, depth_scale=None):
+        """Queue one pair for writing, return its index or None if the writer dropped it"""
+        index = self.next_index
+        name = f"{index:06d}"
+        color_file = os.path.join("color", name + self.color_ext)
+        if not self.writer.submit(os.path.join(self.folder, color_file), color_image):
+            self.dropped += 1
+            return None
+        depth_file = ""
+        depth_dropped = 0
+        if depth_raw is not None:
+            depth_file = os.path.join("depth", name + ".png")
+            if not self.writer.submit(os.path.join(self.folder, depth_file), depth_raw):
+                depth_file = ""
+                depth_dropped = 1
+                self.depth_dropped += 1
+        self._manifest.writerow([
+            index, color_file, depth_file,
+            color_timestamp_us if color_timestamp_us is not None else "",
+            depth_timestamp_us if depth_timestamp_us is not None else "",
+            system_timestamp_us if system_timestamp_us is not None else "",
+            depth_scale if depth_scale is not None else "",
+            depth_dropped,
+        ])
+        self.next_index += 1
+        self.saved += 1
+        return index
+
+    def close(self):
+        if not self._manifest_file.closed:
+            self._manifest_file.close()
@@ -0,0 +1,52 @@
+# --- กรองเฟรมที่แทบเหมือนเดิมออกตอนเก็บ dataset แบบ continuous ---
+import cv2
+import numpy as np
+
+
+class FrameDeduplicator:
+    """Drop frames that are near-duplicates of recently kept frames.
+
+    Each frame is reduced to a small grayscale thumbnail; a frame is a duplicate
+    when its mean absolute difference (0..1) to any of the last ``history`` kept
+    thumbnails is below ``threshold``. The comparison against the whole history
+    is a single NumPy reduction, so the cost per frame stays well under 1 ms.
+    """
+
+    def __init__(self, threshold=0.02, history=16, thumb_size=(32, 24)):
+        self.threshold = threshold
+        self.thumb_size = thumb_size
+        self._thumbs = np.zeros((history, thumb_size[0] * thumb_size[1]), dtype=np.float32)
+        self._count = 0
+        self._next = 0
+        self.seen = 0
+        self.kept = 0
+
+    def _thumbnail(self, image):
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        thumb = cv2.resize(image, self.thumb_size, interpolation=cv2.INTER_AREA)
+        return thumb.reshape(-1).astype(np.float32) * (1.0 / 255.0)
+
+    def is_duplicate(self, image):
+        """Return True if the frame should be skipped; kept frames enter the history"""
+        self.seen += 1
+        thumb = self._thumbnail(image)
+        if self._count:
+            diff = np.abs(self._thumbs[:self._count] - thumb).mean(axis=1)
+            if diff.min() < self.threshold:
+                return True
+        self._thumbs[self._next] = thumb
+        self._next = (self._next + 1) % len(self._thumbs)
+        self._count = min(self._count + 1, len(self._thumbs))
+        self.kept += 1
+        return False
+
+    @property
+    def keep_ratio(self):
+        return self.kept / self.seen if self.seen else 1.0
+
+    def reset(self):
+        self._count = 0
+        self._next = 0
+        self.seen = 0
+        self.kept = 0
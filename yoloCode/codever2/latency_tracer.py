@@ -0,0 +1,139 @@
+# --- วัดเวลาแต่ละขั้นตั้งแต่กล้องถ่ายจนส่งคำสั่งให้หุ่น (p50/p95/p99) ---
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# ขั้นตอนตามลำดับที่เกิดขึ้นใน Main.py
+STAGES = ("callback", "dequeue", "decode", "inference", "depth", "send")
+TOTAL = "total"
+# system timestamp ของ SDK ที่ห่างจากเวลาเครื่องตอน callback เกินนี้ ถือว่าเป็นคนละนาฬิกา
+MAX_CALLBACK_DELAY_US = 1_000_000
+
+
+class Trace:
+    """Timestamps of one frameset as it moves through the pipeline"""
+    __slots__ = ("frame_index", "device_timestamp_us", "system_timestamp_us", "marks")
+
+    def __init__(self, frame_index, device_timestamp_us, system_timestamp_us):
+        self.frame_index = frame_index
+        self.device_timestamp_us = device_timestamp_us
+        self.system_timestamp_us = system_timestamp_us
+        self.marks = []
+
+
+class LatencyTracer:
+    """Collect per-stage latencies into fixed-size rolling windows.
+
+    ``begin`` is called from the SDK callback and ``mark`` after every stage; the
+    hot path only appends ``(stage, time.time_ns())`` to a list. Stage latencies
+    are computed once per frame in ``finish`` and stored in preallocated NumPy
+    ring buffers, so percentiles cost nothing until ``summary`` is asked for.
+    Every stage is measured on the host clock from a ``time.time_ns()`` taken
+    when the callback starts, so ``total`` never mixes clocks. The ``callback``
+    stage, the delay from the SDK receiving the frame
+    (``get_system_timestamp_us``) to the Python callback, is only recorded when
+    that timestamp falls within ``MAX_CALLBACK_DELAY_US`` before the callback;
+    otherwise the SDK is not stamping with the host wall clock and the frame
+    has no callback sample.
+    """
+
+    def __init__(self, window=1024, keep_traces=256, enabled=True):
+        self.enabled = enabled
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {name: np.zeros(window, dtype=np.float64) for name in STAGES + (TOTAL,)}
+        self._counts = dict.fromkeys(self._samples, 0)
+        self._traces = deque(maxlen=keep_traces)
+
+    def begin(self, frames):
+        if not self.enabled or frames is None:
+            return None
+        return self.begin_at(frames.get_index(), frames.get_system_timestamp_us(), frames.get_timestamp_us())
+
+    def begin_at(self, frame_index, system_timestamp_us, device_timestamp_us=0):
+        """Start a trace for a frame that did not come from the SDK, e.g. a replayed file"""
+        if not self.enabled:
+            return None
+        trace = Trace(frame_index, device_timestamp_us, system_timestamp_us)
+        trace.marks.append(("callback", time.time_ns()))
+        return trace
+
+    def mark(self, trace, stage):
+        if trace is not None:
+            trace.marks.append((stage, time.time_ns()))
+
+    @staticmethod
+    def _callback_delay_us(trace):
+        """SDK receive to callback delay in us, None if the SDK timestamp is on another clock"""
+        delay_us = trace.marks[0][1] / 1000 - trace.system_timestamp_us
+        return delay_us if 0 <= delay_us <= MAX_CALLBACK_DELAY_US else None
+
+    def finish(self, trace):
+        if trace is None or not trace.marks:
+            return
+        start_ns = prev_ns = trace.marks[0][1]
+        delay_us = self._callback_delay_us(trace)
+        with self._lock:
+            if delay_us is not None:
+                self._record("callback", delay_us / 1000)
+            for stage, t_ns in trace.marks[1:]:
+                self._record(stage, (t_ns - prev_ns) / 1e6)
+                prev_ns = t_ns
+            self._record(TOTAL, (prev_ns - start_ns) / 1e6)
+            self._traces.append(trace)
+
+    def _record(self, stage, latency_ms):
+        samples = self._samples.get(stage)
+        if samples is None:
+            samples = self._samples[stage] = np.zeros(self.window, dtype=np.float64)
+            self._counts[stage] = 0
+        samples[self._counts[stage] % self.window] = latency_ms
+        self._counts[stage] += 1
+
+    def summary(self):
+        """Return {stage: {count, mean, p50, p95, p99, max}} in milliseconds"""
+        result = {}
+        with self._lock:
+            for stage, samples in self._samples.items():
+                count = self._counts[stage]
+                if count == 0:
+                    continue
+                values = samples[:min(count, self.window)]
+                p50, p95, p99 = np.percentile(values, [50, 95, 99])
+                result[stage] = {
+                    "count": count,
+                    "mean": round(float(values.mean()), 3),
+                    "p50": round(float(p50), 3),
+                    "p95": round(float(p95), 3),
+                    "p99": round(float(p99), 3),
+                    "max": round(float(values.max()), 3),
+                }
+        return result
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=4)
+
+    def export_chrome_trace(self, path):
+        """Write the kept traces in Chrome trace event format (chrome://tracing, Perfetto)"""
+        events = []
+        with self._lock:
+            traces = list(self._traces)
+        for trace in traces:
+            delay_us = self._callback_delay_us(trace)
+            prev_us = trace.marks[0][1] / 1000 - (delay_us or 0)
+            for stage, t_ns in trace.marks:
+                t_us = t_ns / 1000
+                # ช่วง callback ของเฟรมถัดไปซ้อนกับการประมวลผลเฟรมก่อนหน้า จึงแยก thread id
+                events.append({
+                    "name": stage, "ph": "X", "pid": 1, "tid": 1 if stage == "callback" else 2,
+                    "ts": prev_us, "dur": max(t_us - prev_us, 0),
+                    "args": {"frame_index": trace.frame_index,
+                             "device_timestamp_us": trace.device_timestamp_us},
+                })
+                prev_us = t_us
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,180 @@
+# --- วัดเวลาต่อชิ้น: ขยับทีละคำทิศทาง (เดิม) เทียบกับย้ายครั้งเดียวตามคาลิเบรต บนหุ่นจำลอง ---
+import argparse
+import json
+
+import numpy as np
+
+from alignment_engine import AlignmentEngine, MOVE_ABSOLUTE, MOVE_ITERATIVE, default_config
+from calibration import deproject, fit_hand_eye
+from robot_standin import SimulatedRobot
+
+WIDTH, HEIGHT = 640, 480
+INTRINSIC = (600.0, 600.0, WIDTH / 2, HEIGHT / 2)
+WORK_DEPTH = 250.0               # depth ที่ z_rules ถือว่าตรงแล้ว
+CAPTURE_POSE = (0.0, 0.0, 400.0)  # ท่าถ่ายภาพตอนเริ่มแต่ละชิ้น (และตอนคาลิเบรต)
+BOX_HALF = 20
+
+
+class _Box:
+    def __init__(self, xyxy):
+        self.cls = [0]
+        self.xyxy = [xyxy]
+
+
+class _Result:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+class SceneModel:
+    """Stands in for YOLO: returns the box the simulated camera placed on it"""
+    names = {0: "part"}
+
+    def __init__(self):
+        self.box = None
+
+    def __call__(self, img, verbose=False):
+        return [_Result([_Box(self.box)] if self.box else [])]
+
+
+class SimulatedCamera:
+    """Pinhole camera on the tool looking straight down, parts lie on a table at Z ~ 0"""
+
+    def __init__(self, intrinsic=INTRINSIC, size=(WIDTH, HEIGHT)):
+        self.intrinsic = intrinsic
+        self.size = size
+        self.color = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        self.depth = np.zeros((size[1], size[0]), dtype=np.float32)
+
+    def project(self, part, pose):
+        fx, fy, cx, cy = self.intrinsic
+        depth = pose[2] - part[2]
+        return cx + fx * (part[0] - pose[0]) / depth, cy - fy * (part[1] - pose[1]) / depth, depth
+
+    def render(self, part, pose):
+        """Color image, depth image and detection box of ``part`` seen from tool ``pose``"""
+        u, v, depth = self.project(part, pose)
+        self.depth.fill(depth)
+        box = None
+        if 0 <= u < self.size[0] and 0 <= v < self.size[1]:
+            box = (u - BOX_HALF, v - BOX_HALF, u + BOX_HALF, v + BOX_HALF)
+        return self.color, self.depth, box
+
+
+def calibrate(camera, rng, dots=12, pixel_noise=0.3, robot_noise=0.2):
+    """What cal1.py would fit: dots seen from the capture pose against the tool aligned on each dot"""
+    table = np.column_stack([rng.uniform(-150, 150, dots), rng.uniform(-100, 100, dots), np.zeros(dots)])
+    seen = np.array([camera.project(dot, CAPTURE_POSE) for dot in table])
+    pixels = seen[:, :2] + rng.normal(0, pixel_noise, (dots, 2))
+    camera_xyz = deproject(pixels, seen[:, 2], camera.intrinsic)
+    robot_xyz = table + (0.0, 0.0, WORK_DEPTH) + rng.normal(0, robot_noise, (dots, 3))
+    return fit_hand_eye(camera_xyz, robot_xyz, intrinsic=camera.intrinsic, image_size=camera.size, flip=False)
+
+
+def run_cycle(engine, robot, camera, part, clock, fps=30.0, latency=0.05, timeout=30.0):
+    """Align on one part from the capture pose, return its timings in simulated seconds"""
+    robot.home(CAPTURE_POSE)
+    sent = engine.commands_sent
+    dropped = robot.dropped
+    engine.again()
+    t = 0.0
+    frames = 0
+    done = False
+    while t < timeout:
+        color, depth, engine.model.box = camera.render(part, robot.pose_at(t))
+        clock[0] = t + latency  # คำสั่งของเฟรมนี้ถึงหุ่นหลังเวลาประมวลผล
+        engine.process_images(color, depth)
+        frames += 1
+        robot.wait_for(engine.commands_sent)  # หุ่นจำลองต่อกับ engine นี้ตัวเดียว นับคำสั่งตรงกัน
+        if engine.adjust_position:
+            done = True
+            break
+        t += 1.0 / fps
+    end = max(clock[0], robot.busy_until)
+    aligned = np.asarray(part, dtype=np.float64) + (0.0, 0.0, WORK_DEPTH)
+    return {
+        "done": done,
+        "cycle_s": end,
+        "frames": frames,
+        "commands": engine.commands_sent - sent,
+        "dropped": robot.dropped - dropped,
+        "error_mm": float(np.linalg.norm(robot.pose_at(end) - aligned)),
+    }
+
+
+def summarize(cycles):
+    done = [c for c in cycles if c["done"]]
+    summary = {"parts": len(cycles), "failed": len(cycles) - len(done)}
+    if done:
+        cycle_s = np.asarray([c["cycle_s"] for c in done])
+        errors = np.asarray([c["error_mm"] for c in done])
+        summary.update({
+            "cycle_mean_s": round(float(cycle_s.mean()), 3),
+            "cycle_p50_s": round(float(np.percentile(cycle_s, 50)), 3),
+            "cycle_p95_s": round(float(np.percentile(cycle_s, 95)), 3),
+            "frames_mean": round(float(np.mean([c["frames"] for c in done])), 1),
+            "commands_mean": round(float(np.mean([c["commands"] for c in done])), 1),
+            "dropped_words": int(sum(c["dropped"] for c in done)),
+            "error_mean_mm": round(float(errors.mean()), 3),
+            "error_max_mm": round(float(errors.max()), 3),
+        })
+    return summary
+
+
+def run_bench(parts=20, fps=30.0, latency=0.05, speed=200.0, overhead_s=0.15, verify=True, verify_delay=1.0,
+              seed=0):
+    """Run the same parts through both move modes, return the report dict"""
+    rng = np.random.default_rng(seed)
+    camera = SimulatedCamera()
+    calibration = calibrate(camera, rng)
+    part_list = np.column_stack([rng.uniform(-150, 150, parts), rng.uniform(-100, 100, parts),
+                                 rng.uniform(0, 30, parts)])
+    clock = [0.0]
+    report = {"calibration": calibration.summary(), "modes": {}}
+    for mode in (MOVE_ITERATIVE, MOVE_ABSOLUTE):
+        with SimulatedRobot(CAPTURE_POSE, speed, overhead_s, clock=lambda: clock[0]) as robot:
+            config = dict(default_config, IP_ROBOT=robot.host, PORT=robot.port, FLIP_IMAGE=False, MAIN_LABEL="part",
+                          LATENCY_TRACE=False, CALIBRATION_FILE="", VERIFY_MOVE=verify,
+                          VERIFY_DELAY_S=verify_delay)
+            engine = AlignmentEngine(config)
+            engine.calibration = calibration
+            engine.model = SceneModel()
+            engine.clock = lambda: clock[0]
+            engine.set_modes(mode_rz=2, move_mode=mode)
+            if not engine.connect():
+                raise RuntimeError("cannot connect to the simulated robot")
+            try:
+                cycles = [run_cycle(engine, robot, camera, part, clock, fps, latency) for part in part_list]
+            finally:
+                engine.sock.close()
+        report["modes"][mode] = summarize(cycles)
+    iterative = report["modes"][MOVE_ITERATIVE].get("cycle_mean_s")
+    absolute = report["modes"][MOVE_ABSOLUTE].get("cycle_mean_s")
+    if iterative and absolute:
+        report["cycle_reduction_pct"] = round(100.0 * (1.0 - absolute / iterative), 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cycle time per part of direction words and absolute moves")
+    parser.add_argument("--parts", type=int, default=20)
+    parser.add_argument("--fps", type=float, default=30.0, help="camera frame rate")
+    parser.add_argument("--latency", type=float, default=0.05, help="frame to command delay in seconds")
+    parser.add_argument("--speed", type=float, default=200.0, help="robot speed in mm/s")
+    parser.add_argument("--overhead", type=float, default=0.15, help="fixed time of every robot move in seconds")
+    parser.add_argument("--verify", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--verify-delay", type=float, default=1.0, help="same as VERIFY_DELAY_S")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    report = run_bench(args.parts, args.fps, args.latency, args.speed, args.overhead, args.verify,
+                       args.verify_delay, args.seed)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
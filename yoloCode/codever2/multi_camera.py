@@ -0,0 +1,184 @@
+# --- ตรวจจับวัตถุจากกล้องหลายตัวพร้อมกัน: รวมภาพเป็น batch เดียวแล้วเรียก YOLO ครั้งเดียว ---
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+import alignment
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "examples"))
+
+CONFIG_FILE = "config.json"
+
+
+class Detection:
+    """Result of one camera's frame inside a batch"""
+    __slots__ = ("serial", "timestamp_us", "image", "result", "main_obj", "head_obj")
+
+    def __init__(self, serial, timestamp_us, image, result, main_obj, head_obj):
+        self.serial = serial
+        self.timestamp_us = timestamp_us
+        self.image = image
+        self.result = result
+        self.main_obj = main_obj
+        self.head_obj = head_obj
+
+
+class BatchDetector:
+    """Collect the newest image of every camera and detect them in one model call.
+
+    ``submit`` only replaces the camera's pending image, so it is cheap enough for
+    SDK callbacks. ``detect`` waits until every registered camera has an image or
+    ``max_wait_ms`` passed since the first one arrived, keeps the images whose
+    timestamps are within ``tolerance_us`` of the newest one and runs them as a
+    single batch. Images outside the tolerance stay pending for the next batch.
+    """
+
+    def __init__(self, model, main_label="grey", head_label="head", tolerance_us=33000, max_wait_ms=15,
+                 window=1024):
+        self.model = model
+        self.main_label = main_label
+        self.head_label = head_label
+        self.tolerance_us = tolerance_us
+        self.max_wait = max_wait_ms / 1000.0
+        self.serials = []
+        self._pending = {}
+        self._first_arrival = None
+        self._cond = threading.Condition()
+        self.batch_sizes = deque(maxlen=window)
+        self.latencies_ms = deque(maxlen=window)
+        self.skipped = 0
+
+    def register(self, serial):
+        with self._cond:
+            if serial not in self.serials:
+                self.serials.append(serial)
+
+    def submit(self, serial, timestamp_us, image):
+        with self._cond:
+            if serial in self._pending:
+                self.skipped += 1  # เฟรมเก่าที่ยังไม่ได้ตรวจจับถูกแทนด้วยเฟรมใหม่
+            elif not self._pending:
+                self._first_arrival = time.perf_counter()
+            self._pending[serial] = (timestamp_us, image)
+            if len(self._pending) >= len(self.serials):
+                self._cond.notify_all()
+
+    def _take_group(self):
+        newest = max(ts for ts, _ in self._pending.values())
+        group = [(serial, ts, image) for serial, (ts, image) in self._pending.items()
+                 if newest - ts <= self.tolerance_us]
+        for serial, _, _ in group:
+            del self._pending[serial]
+        self._first_arrival = time.perf_counter() if self._pending else None
+        return group
+
+    def detect(self, timeout=1.0):
+        """Run one batch, return {serial: Detection} (empty if nothing arrived before timeout)"""
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while True:
+                now = time.perf_counter()
+                if self._pending and (len(self._pending) >= len(self.serials)
+                                      or now - self._first_arrival >= self.max_wait):
+                    break
+                if now >= deadline:
+                    return {}
+                wait = deadline - now
+                if self._pending:
+                    wait = min(wait, self._first_arrival + self.max_wait - now)
+                self._cond.wait(max(wait, 0.001))
+            group = self._take_group()
+
+        images = [image for _, _, image in group]
+        start = time.perf_counter()
+        results = self.model(images, verbose=False)
+        self.latencies_ms.append((time.perf_counter() - start) * 1000.0)
+        self.batch_sizes.append(len(images))
+
+        labels = (self.main_label, self.head_label)
+        detections = {}
+        for (serial, ts, image), result in zip(group, results):
+            best = alignment.closest_boxes([result], self.model.names, labels, image.shape)
+            detections[serial] = Detection(serial, ts, image, result, best[self.main_label], best[self.head_label])
+        return detections
+
+    def stats(self):
+        if not self.latencies_ms:
+            return {}
+        latencies = np.asarray(self.latencies_ms)
+        sizes = np.asarray(self.batch_sizes)
+        p50, p95 = np.percentile(latencies, [50, 95])
+        return {
+            "batches": len(latencies),
+            "mean_batch_size": round(float(sizes.mean()), 2),
+            "batch_p50_ms": round(float(p50), 2),
+            "batch_p95_ms": round(float(p95), 2),
+            "per_image_ms": round(float(latencies.sum() / sizes.sum()), 2),
+            "skipped": self.skipped,
+        }
+
+
+def main():
+    from pyorbbecsdk import Config, Context, OBSensorType, OBFormat, Pipeline
+    from ultralytics import YOLO
+    from utils import frame_to_bgr_image
+
+    config = {}
+    if os.path.exists(CONFIG_FILE):
+        with open(CONFIG_FILE) as f:
+            config = json.load(f)
+    model = YOLO(config.get("YOLO_MODEL", "Ai_pt_place/grey.pt"))
+    detector = BatchDetector(model, config.get("MAIN_LABEL", "grey"), config.get("HEAD_LABEL", "head"))
+
+    device_list = Context().query_devices()
+    if device_list.get_count() == 0:
+        print("No device connected")
+        return
+    pipelines = []
+    for i in range(device_list.get_count()):
+        device = device_list.get_device_by_index(i)
+        serial = device.get_device_info().get_serial_number()
+        pipeline = Pipeline(device)
+        config_cam = Config()
+        profile_list = pipeline.get_stream_profile_list(OBSensorType.COLOR_SENSOR)
+        config_cam.enable_stream(profile_list.get_video_stream_profile(640, 0, OBFormat.RGB, 30))
+        detector.register(serial)
+
+        def on_frames(frames, serial=serial):
+            color_frame = frames.get_color_frame() if frames else None
+            if color_frame is None:
+                return
+            image = frame_to_bgr_image(color_frame)
+            if image is not None:
+                # เวลาฝั่ง host เทียบข้ามกล้องได้ ส่วน device timestamp ของแต่ละตัวไม่ได้ sync กัน
+                detector.submit(serial, color_frame.get_system_timestamp_us(), image)
+
+        pipeline.start(config_cam, on_frames)
+        pipelines.append(pipeline)
+        print(f"Started {serial}")
+
+    last_report = time.time()
+    try:
+        while True:
+            detections = detector.detect()
+            for serial, detection in detections.items():
+                if detection.main_obj:
+                    print(f"{serial}: {config.get('MAIN_LABEL', 'grey')} at {detection.main_obj[:2]}")
+            if time.time() - last_report >= 5:
+                print("Batch stats:", detector.stats())
+                last_report = time.time()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pipeline in pipelines:
+            pipeline.stop()
+        print("Batch stats:", detector.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# --- ภาพ preview ความละเอียดต่ำผ่าน HTTP (MJPEG) ให้ดูจากเครื่องอื่นได้ ไม่มีคนดู = ไม่ encode ---
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import cv2
+import numpy as np
+
+STREAMS = ("color", "depth")
+BOUNDARY = "frame"
+
+INDEX_HTML = """<!doctype html>
+<html><head><title>Robot preview</title></head>
+<body style="background:#222;color:#eee;font-family:sans-serif">
+<img src="/color.mjpg"> <img src="/depth.mjpg">
+</body></html>
+"""
+
+
+class PreviewServer:
+    """Serve the engine's newest frames as MJPEG at a reduced size and frame rate.
+
+    ``publish`` is called from the processing thread for every FrameResult and
+    only keeps a reference to it; a single encoder thread downscales, draws the
+    detection overlay and JPEG-encodes at most ``fps`` times per second. Every
+    client of a stream gets the same encoded bytes. While nobody is connected
+    ``publish`` returns immediately and the encoder thread sleeps.
+    """
+
+    def __init__(self, host="0.0.0.0", port=8766, width=480, fps=10, quality=70, flip_depth=False):
+        self.width = width
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.quality = quality
+        self.flip_depth = flip_depth
+        self.encoded = 0
+        self._cond = threading.Condition()
+        self._clients = dict.fromkeys(STREAMS, 0)
+        self._watching = 0
+        self._pending = None
+        self._jpeg = dict.fromkeys(STREAMS)
+        self._seq = 0
+        self._running = True
+        self._server = ThreadingHTTPServer((host, port), PreviewHandler)
+        self._server.daemon_threads = True
+        self._server.preview = self
+        self.host, self.port = self._server.server_address[:2]
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name="PreviewHTTP", daemon=True),
+            threading.Thread(target=self._encode_loop, name="PreviewEncoder", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def clients(self):
+        return self._watching
+
+    def publish(self, result):
+        if not self._watching:
+            return
+        with self._cond:
+            self._pending = result
+            self._cond.notify_all()
+
+    def _encode_loop(self):
+        next_time = 0.0
+        while True:
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)  # จำกัด fps แล้วค่อยหยิบเฟรมล่าสุด
+            with self._cond:
+                while self._running and (self._pending is None or not self._watching):
+                    self._cond.wait()
+                if not self._running:
+                    return
+                result, self._pending = self._pending, None
+                wanted = [stream for stream in STREAMS if self._clients[stream]]
+            next_time = time.perf_counter() + self.interval
+            jpegs = {stream: self._encode(stream, result) for stream in wanted}
+            with self._cond:
+                self._jpeg.update(jpegs)
+                self._seq += 1
+                self.encoded += 1
+                self._cond.notify_all()
+
+    def _encode(self, stream, result):
+        if stream == "color":
+            image = self._render_color(result)
+        else:
+            if result.depth is None:
+                return None
+            image = self._render_depth(result.depth)
+        ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return data.tobytes() if ok else None
+
+    def _render_color(self, result):
+        height, width = result.color.shape[:2]
+        scale = min(1.0, self.width / width)
+        size = (int(width * scale), int(height * scale))
+        image = cv2.resize(result.color, size, interpolation=cv2.INTER_AREA)
+        for obj, color in ((result.main_obj, (0, 255, 0)), (result.head_obj, (255, 128, 0))):
+            if obj:
+                cx, cy, x1, y1, x2, y2 = (int(v * scale) for v in obj)
+                cv2.rectangle(image, (x1, y1), (x2, y2), color, 1)
+                cv2.circle(image, (cx, cy), 3, color, -1)
+        if getattr(result, "z", None) is not None:
+            cv2.putText(image, f"X {result.x}  Y {result.y}  Z {result.z}", (5, 15),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
+        return image
+
+    def _render_depth(self, depth):
+        height, width = depth.shape[:2]
+        scale = min(1.0, self.width / width)
+        small = cv2.resize(depth, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_NEAREST)
+        depth_vis = cv2.normalize(small, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+        image = cv2.applyColorMap(depth_vis, cv2.COLORMAP_JET)
+        if self.flip_depth:
+            image = cv2.flip(image, -1)
+        return image
+
+    def _add_client(self, stream, delta):
+        with self._cond:
+            self._clients[stream] += delta
+            self._watching = sum(self._clients.values())
+            self._cond.notify_all()
+
+    def frames(self, stream):
+        """Yield encoded JPEGs of ``stream`` as they are produced, for one client"""
+        self._add_client(stream, 1)
+        try:
+            last_seq = -1
+            while self._running:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._seq != last_seq or not self._running, timeout=5)
+                    last_seq = self._seq
+                    jpeg = self._jpeg[stream]
+                if jpeg is not None:
+                    yield jpeg
+        finally:
+            self._add_client(stream, -1)
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        preview = self.server.preview
+        path = urlparse(self.path).path
+        if path in ("/", "/index.html"):
+            body = INDEX_HTML.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        stream = path.lstrip("/").rsplit(".mjpg", 1)[0]
+        if stream not in STREAMS:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        frames = preview.frames(stream)
+        try:
+            for jpeg in frames:
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                 f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            frames.close()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def from_config(config):
+    """Start a PreviewServer from the PREVIEW_* config keys, or return None if disabled"""
+    if not config.get("PREVIEW_ENABLED", False):
+        return None
+    preview = PreviewServer(config["PREVIEW_HOST"], config["PREVIEW_PORT"], config["PREVIEW_WIDTH"],
+                            config["PREVIEW_FPS"], config["PREVIEW_QUALITY"], config.get("FLIP_IMAGE", True))
+    print(f"Preview on http://{preview.host}:{preview.port}/")
+    return preview
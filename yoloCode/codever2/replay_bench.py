@@ -0,0 +1,192 @@
+# --- วัดความเร็ว loop ตรวจจับ -> depth -> ส่งคำสั่ง แบบไม่มี GUI โดยเล่นภาพที่บันทึกไว้ซ้ำ ---
+import argparse
+import csv
+import glob
+import json
+import os
+import socket
+import threading
+import time
+from queue import Queue
+
+import cv2
+import numpy as np
+
+import alignment
+from latency_tracer import LatencyTracer
+from robot_standin import RobotStandIn
+
+CONFIG_FILE = "config.json"
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def iter_session(folder):
+    """Yield (color_bgr, depth_mm) pairs from a dataset session written by capture.py"""
+    with open(os.path.join(folder, "manifest.csv"), newline="") as f:
+        for row in csv.DictReader(f):
+            color = cv2.imread(os.path.join(folder, row["color_file"]), cv2.IMREAD_COLOR)
+            depth = None
+            if row["depth_file"]:
+                depth = cv2.imread(os.path.join(folder, row["depth_file"]), cv2.IMREAD_UNCHANGED)
+                scale = float(row["depth_scale"]) if row["depth_scale"] else 1.0
+                depth = depth.astype(np.float32) * scale
+            yield color, depth
+
+
+def iter_image_dir(folder, depth_mm):
+    """Yield color images from a folder with a flat depth of ``depth_mm`` (no depth recorded)"""
+    files = sorted(p for p in glob.glob(os.path.join(folder, "*")) if p.lower().endswith(IMAGE_EXTS))
+    depth = None
+    for path in files:
+        color = cv2.imread(path, cv2.IMREAD_COLOR)
+        if color is None:
+            continue
+        if depth is None or depth.shape != color.shape[:2]:
+            depth = np.full(color.shape[:2], depth_mm, dtype=np.float32)
+        yield color, depth
+
+
+def open_source(path, depth_mm):
+    if os.path.exists(os.path.join(path, "manifest.csv")):
+        return iter_session(path)
+    return iter_image_dir(path, depth_mm)
+
+
+def load_frames(path, depth_mm, limit):
+    # โหลดเข้าหน่วยความจำก่อน เพื่อไม่ให้ความเร็วดิสก์ปนกับเวลาของ loop
+    frames = []
+    for color, depth in open_source(path, depth_mm):
+        if color is None or depth is None:
+            continue
+        frames.append((color, depth))
+        if limit and len(frames) >= limit:
+            break
+    return frames
+
+
+def feed(frames, queue, fps, loops, max_queue_size, stats):
+    """Play frames into the queue like the SDK callback does.
+
+    At a fixed ``fps`` the oldest frame is dropped when the loop falls behind, as in
+    ``Main.py``; with ``fps`` 0 the feeder waits for the loop so every frame is timed.
+    """
+    interval = 1.0 / fps if fps > 0 else 0.0
+    next_time = time.perf_counter()
+    index = 0
+    for _ in range(loops):
+        for color, depth in frames:
+            if interval:
+                next_time += interval
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            trace = tracer.begin_at(index, time.time_ns() // 1000)
+            if interval and queue.qsize() >= max_queue_size:
+                queue.get()
+                stats["dropped"] += 1
+            queue.put((color, depth, trace))
+            index += 1
+    queue.put(None)
+
+
+def run(frames, model, sock, args):
+    queue = Queue(maxsize=0 if args.fps > 0 else args.queue_size)
+    stats = {"dropped": 0, "processed": 0, "detected": 0, "sent": 0}
+    feeder = threading.Thread(target=feed, args=(frames, queue, args.fps, args.loops, args.queue_size, stats),
+                              daemon=True)
+    start = time.perf_counter()
+    feeder.start()
+    while True:
+        item = queue.get()
+        if item is None:
+            break
+        color_img, depth_data, trace = item
+        tracer.mark(trace, "dequeue")
+        if args.flip:
+            color_img = cv2.flip(color_img, -1)
+        tracer.mark(trace, "decode")
+
+        main_obj, head_obj = alignment.detect_objects(model, color_img, args.main_label, args.head_label)
+        tracer.mark(trace, "inference")
+        if main_obj:
+            stats["detected"] += 1
+            cx, cy, *_ = main_obj
+            centered_cx, centered_cy = alignment.centered(color_img.shape, cx, cy)
+            distance = alignment.sample_depth(depth_data, cx, cy)
+            tracer.mark(trace, "depth")
+            if args.rz and head_obj:
+                _, centered_hcy = alignment.centered(color_img.shape, head_obj[0], head_obj[1])
+                message = alignment.head_alignment_command(centered_cy, centered_hcy)
+            else:
+                message = alignment.alignment_command(centered_cx, centered_cy, int(distance))
+            sock.sendall(message.encode())
+            tracer.mark(trace, "send")
+            stats["sent"] += 1
+        tracer.finish(trace)
+        stats["processed"] += 1
+    elapsed = time.perf_counter() - start
+    feeder.join()
+    stats["elapsed_s"] = round(elapsed, 3)
+    stats["throughput_fps"] = round(stats["processed"] / elapsed, 2) if elapsed else 0.0
+    return stats
+
+
+def parse_args():
+    config = {}
+    if os.path.exists(CONFIG_FILE):
+        with open(CONFIG_FILE) as f:
+            config = json.load(f)
+    parser = argparse.ArgumentParser(description="Replay recorded frames through the Main.py alignment loop")
+    parser.add_argument("source", help="dataset session folder (with manifest.csv) or a folder of images")
+    parser.add_argument("--model", default=config.get("YOLO_MODEL", "Ai_pt_place/grey.pt"))
+    parser.add_argument("--main-label", default=config.get("MAIN_LABEL", "grey"))
+    parser.add_argument("--head-label", default=config.get("HEAD_LABEL", "head"))
+    parser.add_argument("--flip", action=argparse.BooleanOptionalAction, default=config.get("FLIP_IMAGE", True))
+    parser.add_argument("--rz", action="store_true", help="send rz commands when the head is detected")
+    parser.add_argument("--fps", type=float, default=0, help="feed rate, 0 = as fast as the loop takes them")
+    parser.add_argument("--loops", type=int, default=1, help="play the source this many times")
+    parser.add_argument("--limit", type=int, default=0, help="load at most this many frames")
+    parser.add_argument("--queue-size", type=int, default=5, help="same as MAX_QUEUE_SIZE in Main.py")
+    parser.add_argument("--depth-mm", type=float, default=260, help="flat depth for image folders")
+    parser.add_argument("--warmup", type=int, default=5, help="frames run through the model before timing")
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--chrome-trace", help="write per-frame spans for chrome://tracing")
+    return parser.parse_args()
+
+
+tracer = LatencyTracer()
+
+
+def main():
+    from ultralytics import YOLO
+
+    args = parse_args()
+    frames = load_frames(args.source, args.depth_mm, args.limit)
+    if not frames:
+        print(f"No frames found in {args.source}")
+        return
+    print(f"Loaded {len(frames)} frames from {args.source}")
+    model = YOLO(args.model)
+    for color, _ in frames[:args.warmup]:
+        model(color, verbose=False)
+
+    with RobotStandIn() as robot:
+        sock = socket.create_connection((robot.host, robot.port))
+        try:
+            stats = run(frames, model, sock, args)
+        finally:
+            sock.close()
+        time.sleep(0.1)  # ให้ stand-in อ่านคำสั่งสุดท้ายให้ครบ
+        stats["robot_received"] = dict(robot.counts())
+
+    report = {"source": args.source, "model": args.model, "stats": stats, "latency_ms": tracer.summary()}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+    if args.chrome_trace:
+        tracer.export_chrome_trace(args.chrome_trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# --- หุ่นยนต์จำลองบน TCP (localhost) สำหรับทดสอบ/วัดผลโดยไม่ต้องต่อ DoBot จริง ---
+import re
+import socket
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+MOVE_PATTERN = re.compile(r"move\(([-0-9.,]*)\)")
+
+
+class RobotStandIn:
+    """Accept the robot's TCP connection locally and record every command received.
+
+    Commands are plain ASCII words sent back to back without a delimiter, the same
+    way ``Main.py`` talks to the robot, so the stream is split on the known command
+    vocabulary. Absolute moves ``move(x,y,z)`` are recorded as "move" with their
+    coordinates in ``moves``. ``received`` holds ``(command, clock())`` pairs.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, commands=None, clock=time.perf_counter):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((host, port))
+        self._server.listen(1)
+        self.host, self.port = self._server.getsockname()
+        # คำยาวก่อน เพื่อไม่ให้ "down" ไปจับ "ldown"/"mdown"
+        self._commands = sorted(commands or KNOWN_COMMANDS, key=len, reverse=True)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.received = []
+        self.moves = []
+        self._stopped = False
+        self._thread = threading.Thread(target=self._serve, name="RobotStandIn", daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while not self._stopped:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            with conn:
+                buffer = ""
+                while True:
+                    try:
+                        data = conn.recv(4096)
+                    except OSError:
+                        break
+                    if not data:
+                        break
+                    buffer = self._consume(buffer + data.decode(errors="ignore"))
+
+    def _consume(self, buffer):
+        now = self.clock()
+        while buffer:
+            if buffer.startswith("move("):
+                match = MOVE_PATTERN.match(buffer)
+                if match is None:
+                    if ")" in buffer:
+                        buffer = buffer[1:]  # รูปแบบผิด ทิ้งแล้วหาคำถัดไป
+                        continue
+                    return buffer
+                self.on_command("move", [float(v) for v in match.group(1).split(",")], now)
+                buffer = buffer[match.end():]
+                continue
+            for command in self._commands:
+                if buffer.startswith(command):
+                    self.on_command(command, None, now)
+                    buffer = buffer[len(command):]
+                    break
+            else:
+                if any(command.startswith(buffer) for command in self._commands + ["move("]):
+                    return buffer  # คำสั่งยังมาไม่ครบ รอ recv รอบถัดไป
+                buffer = buffer[1:]
+        return buffer
+
+    def on_command(self, command, target, now):
+        """Called from the server thread for every command, ``target`` is set for "move" """
+        with self._lock:
+            self.received.append((command, now))
+            if target is not None:
+                self.moves.append(target)
+
+    def wait_for(self, count, timeout=2.0):
+        """Wait until ``count`` commands have arrived, return False on timeout"""
+        deadline = time.perf_counter() + timeout
+        while len(self.received) < count:
+            if time.perf_counter() > deadline:
+                return False
+            time.sleep(0.0005)
+        return True
+
+    def counts(self):
+        with self._lock:
+            return Counter(command for command, _ in self.received)
+
+    def close(self):
+        self._stopped = True
+        self._server.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+KNOWN_COMMANDS = [
+    "lright", "mright", "right", "left", "mleft", "lleft",
+    "llow", "mlow", "low", "top", "mtop", "ltop",
+    "ldown", "mdown", "down", "up",
+    "stopx", "stopy", "stopz", "stopc", "rzP", "rzM", "disconnected",
+]
+
+
+# ทิศของคำสั่งในโลกจำลอง: วัตถุอยู่ขวาของภาพ (x > 0) -> "left" -> เครื่องมือเลื่อน +X
+DIRECTIONS = {
+    "left": (1, 0, 0), "right": (-1, 0, 0),
+    "top": (0, 1, 0), "low": (0, -1, 0),
+    "up": (0, 0, 1), "down": (0, 0, -1),
+}
+STEP_SIZES = {"l": 20.0, "m": 5.0, "": 0.5}  # mm ต่อคำสั่ง ตามตัวอักษรนำหน้า
+
+
+class SimulatedRobot(RobotStandIn):
+    """RobotStandIn that also moves a simulated tool, for cycle-time benchmarks.
+
+    Time is whatever ``clock`` returns, so a benchmark can drive it. Each move
+    takes ``overhead_s`` plus the travel at ``speed`` mm/s. Direction words move
+    by ``steps`` for their size prefix and are dropped while the tool is still
+    moving, like a robot script that reads the socket only between moves;
+    absolute ``move(...)`` commands start when the current move ends. The
+    direction of the words is a convention of this simulation, not of the
+    real robot program.
+    """
+
+    def __init__(self, pose=(0.0, 0.0, 0.0), speed=200.0, overhead_s=0.15, steps=None, **kwargs):
+        self.speed = speed
+        self.overhead_s = overhead_s
+        self.steps = dict(steps or STEP_SIZES)
+        self.dropped = 0
+        self._segments = []
+        self._pose = np.asarray(pose, dtype=np.float64)
+        super().__init__(**kwargs)
+
+    def home(self, pose):
+        """Put the tool at ``pose`` without any motion, e.g. the capture pose of the next part"""
+        with self._lock:
+            self._pose = np.asarray(pose, dtype=np.float64)
+            self._segments = []
+
+    @property
+    def busy_until(self):
+        with self._lock:
+            return self._segments[-1][3] if self._segments else float("-inf")
+
+    def pose_at(self, t):
+        """Tool XYZ at time ``t``, interpolated along the queued moves"""
+        with self._lock:
+            pose = self._pose
+            for start_pose, end_pose, t0, t1 in self._segments:
+                if t < t0:
+                    break
+                if t < t1:
+                    return start_pose + (end_pose - start_pose) * (t - t0) / (t1 - t0)
+                pose = end_pose
+            return pose.copy()
+
+    def _word_delta(self, command):
+        for prefix in ("", "l", "m"):
+            if command.startswith(prefix) and command[len(prefix):] in DIRECTIONS:
+                if prefix not in self.steps:
+                    return None
+                return np.asarray(DIRECTIONS[command[len(prefix):]], dtype=np.float64) * self.steps[prefix]
+        return None
+
+    def on_command(self, command, target, now):
+        super().on_command(command, target, now)
+        delta = self._word_delta(command) if target is None else None
+        if target is None and delta is None:
+            return  # stopz, stopc, rz... ไม่ขยับตำแหน่งในแบบจำลอง
+        with self._lock:
+            end_time = self._segments[-1][3] if self._segments else float("-inf")
+            if delta is not None and now < end_time:
+                self.dropped += 1
+                return
+            start_pose = self._segments[-1][1] if self._segments else self._pose
+            if delta is not None:
+                end_pose = start_pose + delta
+            else:
+                end_pose = start_pose.copy()
+                end_pose[:len(target)] = target
+            t0 = max(now, end_time)
+            t1 = t0 + self.overhead_s + float(np.linalg.norm(end_pose - start_pose)) / self.speed
+            # ตัดช่วงที่จบไปแล้วออก เก็บตำแหน่งสุดท้ายไว้แทน
+            while self._segments and self._segments[0][3] <= now:
+                self._pose = self._segments.pop(0)[1]
+            self._segments.append((start_pose, end_pose, t0, t1))
@@ -0,0 +1,133 @@
+# --- รันระบบจัดตำแหน่งแบบไม่มีจอ (headless) สั่งงานผ่าน HTTP บนเครื่อง ---
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "examples"))
+from alignment_engine import AlignmentEngine, CONFIG_FILE, load_config
+from log_bridge import SDKLogBridge, setup_logging
+import preview_server
+
+
+class ControlServer(ThreadingHTTPServer):
+    """Small local HTTP API in front of an AlignmentEngine.
+
+    GET  /status             engine state and the last coordinates
+    GET  /latency            per-stage latency summary
+    POST /connect            connect to the robot
+    POST /disconnect         send "disconnected" and close the robot socket
+    POST /again              align the next object
+    POST /mode?rz=1&repeat=2 change operation modes (rz, z, repeat, move, verify)
+    POST /latency/export     write latency JSON and Chrome trace files
+    POST /shutdown           stop the service
+    """
+    daemon_threads = True
+
+    def __init__(self, address, engine):
+        super().__init__(address, ControlHandler)
+        self.engine = engine
+        self.stop_event = threading.Event()
+
+
+class ControlHandler(BaseHTTPRequestHandler):
+
+    def _reply(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        engine = self.server.engine
+        path = urlparse(self.path).path
+        if path == "/status":
+            self._reply(200, engine.status())
+        elif path == "/latency":
+            self._reply(200, engine.tracer.summary())
+        else:
+            self._reply(404, {"error": f"unknown path {path}"})
+
+    def do_POST(self):
+        engine = self.server.engine
+        url = urlparse(self.path)
+        if url.path == "/connect":
+            self._reply(200, {"ok": engine.connect()})
+        elif url.path == "/disconnect":
+            self._reply(200, {"ok": engine.disconnect()})
+        elif url.path == "/again":
+            ok = engine.again()
+            self._reply(200 if ok else 409, {"ok": ok} if ok else {"ok": False, "error": "robot not connected"})
+        elif url.path == "/mode":
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            try:
+                engine.set_modes(query.get("rz"), query.get("z"), query.get("repeat"),
+                                 query.get("move"), query.get("verify"))
+            except ValueError as e:
+                self._reply(400, {"ok": False, "error": str(e)})
+                return
+            self._reply(200, engine.status())
+        elif url.path == "/latency/export":
+            summary_path, trace_path = engine.export_latency()
+            self._reply(200, {"summary": summary_path, "trace": trace_path})
+        elif url.path == "/shutdown":
+            self._reply(200, {"ok": True})
+            self.server.stop_event.set()
+        else:
+            self._reply(404, {"error": f"unknown path {url.path}"})
+
+    def log_message(self, format, *args):
+        pass  # ไม่ต้องพิมพ์ทุก request ลง console
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the robot alignment without a display")
+    parser.add_argument("--config", default=CONFIG_FILE)
+    parser.add_argument("--connect", action="store_true", help="connect to the robot on start")
+    parser.add_argument("--virtual-source", help="play a recorded session or image folder instead of the camera")
+    parser.add_argument("--virtual-fps", type=float, help="frame rate of --virtual-source, 0 = as fast as possible")
+    args = parser.parse_args()
+
+    log_listener = setup_logging()
+    sdk_logs = SDKLogBridge()
+    sdk_logs.start()
+    config = load_config(args.config)
+    if args.virtual_source:
+        config["VIRTUAL_SOURCE"] = args.virtual_source
+    if args.virtual_fps is not None:
+        config["VIRTUAL_FPS"] = args.virtual_fps
+    engine = AlignmentEngine(config)
+    preview = preview_server.from_config(config)
+    if preview:
+        engine.listeners.append(preview.publish)
+    engine.start()
+    if args.connect:
+        engine.connect()
+
+    server = ControlServer((config["CONTROL_HOST"], config["CONTROL_PORT"]), engine)
+    threading.Thread(target=server.serve_forever, name="ControlServer", daemon=True).start()
+    print(f"Control API on http://{config['CONTROL_HOST']}:{config['CONTROL_PORT']}")
+
+    signal.signal(signal.SIGINT, lambda *_: server.stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: server.stop_event.set())
+    try:
+        while not server.stop_event.wait(0.5):
+            pass
+    finally:
+        server.shutdown()
+        if preview:
+            preview.close()
+        print("Latency summary:", json.dumps(engine.tracer.summary(), indent=2))
+        engine.close()
+        sdk_logs.stop()
+        log_listener.stop()
+
+
+if __name__ == "__main__":
+    main()